@@ -0,0 +1,315 @@
+"""Carga masiva de tablas de posiciones de temporadas y torneos anteriores.
+
+    python -m app.backfill --seasons 2019-2025 --zones a,b --voley-tournaments 60-200,75:482
+
+Arma la lista de objetivos (cada zona y temporada de la Conferencia
+Metropolitana de básquet, cada torneo de metrovoley, opcionalmente con su
+grupo), los scrapea con los scrapers de siempre y guarda las tablas en el
+historial de posiciones (`history.standings_history`, el mismo archivo que
+consultan `/api/history/...`) como ligas propias: `basquet/zona-a-2023`,
+`voley/torneo-75-grupo-482`, ...
+
+- Concurrencia acotada: `--concurrency` objetivos a la vez, un motor async
+  propio con `--per-host` descargas simultáneas y `--rate` pedidos por segundo
+  por host, y `--browsers` Chrome a la vez para las posiciones de voley.
+- Escritura en bloque: las tablas se acumulan y se escriben de a `--batch`
+  objetivos con `record_many` (una sola escritura del archivo por bloque).
+- Reanudable: después de cada bloque se guarda el checkpoint
+  (`BACKFILL_CHECKPOINT_FILE`, por defecto `data/backfill_checkpoint.json`)
+  con los objetivos terminados. Al volver a correr se saltean, y los que
+  fallaron se reintentan hasta `--max-attempts` veces en total. Los que
+  responden pero no tienen tabla (temporadas o torneos que no existen) quedan
+  como `missing` y no se vuelven a pedir. Un objetivo se marca terminado
+  recién cuando sus tablas están escritas.
+
+Cada objetivo se busca sólo en su propia página: sin las páginas generales de
+la liga que usa el scraper en vivo como alternativa (muestran la temporada en
+curso) y sin guardar el HTML de depuración. Las entradas del historial llevan
+en `meta` el origen y la temporada o torneo, porque su hora es la del
+scraping y no la de la temporada.
+
+Sólo se cargan posiciones: el fixture que publican los sitios es el de los
+partidos pendientes, que en una temporada terminada no existe. Una API en
+marcha lee el historial al arrancar, así que ve lo cargado después de reiniciarse.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .history import HistoryStore, standings_history
+from .logs import setup_logging
+from .scraper.async_engine import AsyncScrapeEngine
+from .scraper import basketball_scraper, voley_scraper
+from .scraper.basketball_scraper import ZONES, BasketballScraper, league_url
+from .scraper.voley_scraper import VoleyScraper, tournament_url
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = os.environ.get('BACKFILL_CHECKPOINT_FILE', os.path.join('data', 'backfill_checkpoint.json'))
+FIRST_SEASON = 2019
+
+
+class BackfillTarget(NamedTuple):
+    # Nombre de la liga en el historial, p.ej. "basquet/zona-a-2023"
+    source: str
+    federation: str
+    url: str
+    # Se guarda con cada tabla en el historial, p.ej. {"origin": "backfill", "season": 2023, "zone": "a"}
+    meta: Dict
+
+
+def basketball_targets(seasons: List[int], zones: List[str]) -> List[BackfillTarget]:
+    return [BackfillTarget(f"basquet/zona-{zone}-{season}", 'basquet', league_url(zone, season),
+                           {"origin": "backfill", "season": season, "zone": zone})
+            for season in seasons for zone in zones]
+
+
+def voley_targets(tournaments: List[Tuple[int, Optional[int]]]) -> List[BackfillTarget]:
+    targets = []
+    for tournament_id, group in tournaments:
+        source = f"voley/torneo-{tournament_id}" + (f"-grupo-{group}" if group is not None else "")
+        meta = {"origin": "backfill", "tournament": tournament_id}
+        if group is not None:
+            meta["group"] = group
+        targets.append(BackfillTarget(source, 'voley', tournament_url(tournament_id, group), meta))
+    return targets
+
+
+def parse_seasons(value: str) -> List[int]:
+    """`2019-2025` o `2021,2023` -> lista de temporadas"""
+    seasons: List[int] = []
+    for part in filter(None, (item.strip() for item in value.split(','))):
+        start, _, end = part.partition('-')
+        seasons.extend(range(int(start), int(end or start) + 1))
+    return seasons
+
+
+def parse_tournaments(value: str) -> List[Tuple[int, Optional[int]]]:
+    """`60-70,75:482` -> torneos 60 a 70 sin grupo y el 75 con el grupo 482"""
+    tournaments: List[Tuple[int, Optional[int]]] = []
+    for part in filter(None, (item.strip() for item in value.split(','))):
+        ids, _, group = part.partition(':')
+        start, _, end = ids.partition('-')
+        tournaments.extend((tournament_id, int(group) if group else None)
+                           for tournament_id in range(int(start), int(end or start) + 1))
+    return tournaments
+
+
+# Estados de un objetivo terminado
+DONE = 'done'
+MISSING = 'missing'
+FAILED = 'failed'
+
+
+class BackfillCheckpoint:
+    """Objetivos terminados, sin tabla y fallidos, guardados en disco para reanudar"""
+
+    def __init__(self, path: Optional[str] = CHECKPOINT_FILE):
+        self.path = path
+        self.done: Dict[str, Dict] = {}
+        self.missing: Dict[str, Dict] = {}
+        self.failed: Dict[str, Dict] = {}
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            self.done = data.get('done', {})
+            self.missing = data.get('missing', {})
+            self.failed = data.get('failed', {})
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning("Checkpoint inválido en %s, se empieza de cero: %s", self.path, e)
+
+    def should_run(self, source: str, max_attempts: int) -> bool:
+        return (source not in self.done and source not in self.missing
+                and self.failed.get(source, {}).get('attempts', 0) < max_attempts)
+
+    def mark(self, source: str, status: str, error: Optional[str], tables: int):
+        now = datetime.now().isoformat()
+        if status == DONE:
+            self.done[source] = {"at": now, "tables": tables}
+            self.failed.pop(source, None)
+        elif status == MISSING:
+            self.missing[source] = {"at": now, "error": error}
+            self.failed.pop(source, None)
+        else:
+            attempts = self.failed.get(source, {}).get('attempts', 0) + 1
+            self.failed[source] = {"at": now, "attempts": attempts, "error": error}
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"done": self.done, "missing": self.missing, "failed": self.failed}, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error("No se pudo guardar el checkpoint del backfill en %s: %s", self.path, e)
+
+
+class BackfillPipeline:
+    def __init__(self, targets: List[BackfillTarget], engine: AsyncScrapeEngine,
+                 checkpoint: BackfillCheckpoint, store: HistoryStore = standings_history,
+                 concurrency: int = 8, browsers: int = 1, batch_size: int = 25, max_attempts: int = 2):
+        self.targets = targets
+        self.engine = engine
+        self.checkpoint = checkpoint
+        self.store = store
+        self.concurrency = concurrency
+        self.browsers = browsers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        # Tablas scrapeadas y objetivos terminados que todavía no se escribieron
+        self._tables: List[Tuple[str, List[Dict], Optional[str], Optional[Dict]]] = []
+        self._finished: List[Tuple[str, str, Optional[str], int]] = []
+        self.stats = {"targets": 0, DONE: 0, MISSING: 0, FAILED: 0, "skipped": 0, "tables": 0}
+        self._started = 0.0
+
+    async def run(self) -> Dict[str, int]:
+        """Scrapea los objetivos pendientes y retorna las cuentas del backfill"""
+        pending = [target for target in self.targets if self.checkpoint.should_run(target.source, self.max_attempts)]
+        self.stats.update(targets=len(self.targets), skipped=len(self.targets) - len(pending))
+        logger.info("Backfill: %d objetivos, %d ya terminados, sin tabla o agotados en el checkpoint",
+                    len(self.targets), self.stats["skipped"])
+        queue: asyncio.Queue = asyncio.Queue()
+        for target in pending:
+            queue.put_nowait(target)
+        browser_slots = asyncio.Semaphore(self.browsers)
+        self._started = time.monotonic()
+        workers = [asyncio.ensure_future(self._worker(queue, browser_slots))
+                   for _ in range(min(self.concurrency, len(pending)))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # También si se interrumpe: lo ya scrapeado se escribe y queda en el checkpoint
+            for worker in workers:
+                worker.cancel()
+            self.flush()
+        return self.stats
+
+    async def _worker(self, queue: asyncio.Queue, browser_slots: asyncio.Semaphore):
+        while True:
+            try:
+                target = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            tables: List[Tuple[str, List[Dict], Optional[str], Optional[Dict]]] = []
+
+            def collect(source, kind, data, last_update):
+                if kind == 'standings':
+                    tables.append((source, data, last_update, target.meta))
+                return True
+
+            try:
+                if target.federation == 'voley':
+                    # Las posiciones de voley se leen con Chrome: pocos a la vez
+                    async with browser_slots:
+                        result = await VoleyScraper(target.url, name=target.source, publish=collect).aget_standings()
+                    not_found = voley_scraper.STANDINGS_NOT_FOUND
+                else:
+                    # Sólo la página de la temporada: las alternativas muestran la temporada en curso
+                    scraper = BasketballScraper(target.url, name=target.source, publish=collect,
+                                                alternative_urls=[], debug_dumps=False)
+                    result = await scraper.aget_standings(self.engine)
+                    not_found = basketball_scraper.STANDINGS_NOT_FOUND
+                error = result.get('error')
+                if tables:
+                    status = DONE
+                elif error is None or error == not_found:
+                    status, error = MISSING, error or "Sin tabla de posiciones"
+                else:
+                    status = FAILED
+            except Exception as e:
+                status, error = FAILED, f"{type(e).__name__}: {e}"
+            self._tables.extend(tables)
+            self._finished.append((target.source, status, error, len(tables)))
+            if len(self._finished) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        """Escribe las tablas acumuladas en bloque y después marca sus objetivos en el checkpoint"""
+        if not self._finished:
+            return
+        added = self.store.record_many(self._tables)
+        for source, status, error, tables in self._finished:
+            self.checkpoint.mark(source, status, error, tables)
+            self.stats[status] += 1
+        self.checkpoint.save()
+        self.stats["tables"] += added
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        processed = self.stats[DONE] + self.stats[MISSING] + self.stats[FAILED]
+        logger.info("Backfill: %d/%d objetivos (%d sin tabla, %d fallidos), %d tablas nuevas, %.0f objetivos/min",
+                    processed + self.stats["skipped"], self.stats["targets"], self.stats[MISSING],
+                    self.stats[FAILED], self.stats["tables"], processed * 60 / elapsed)
+        self._tables = []
+        self._finished = []
+
+
+async def run_backfill(targets: List[BackfillTarget], checkpoint: BackfillCheckpoint,
+                       store: HistoryStore = standings_history, concurrency: int = 8,
+                       per_host: int = 4, rate: Optional[float] = 4.0, browsers: int = 1,
+                       batch_size: int = 25, max_attempts: int = 2) -> Dict[str, int]:
+    """Corre el backfill con un motor async propio, con sus límites por host"""
+    engine = AsyncScrapeEngine(max_connections=max(per_host, concurrency) * 2, max_per_host=per_host,
+                               requests_per_second=rate)
+    pipeline = BackfillPipeline(targets, engine, checkpoint, store, concurrency=concurrency,
+                                browsers=browsers, batch_size=batch_size, max_attempts=max_attempts)
+    try:
+        return await pipeline.run()
+    finally:
+        await engine.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seasons', default=f"{FIRST_SEASON}-{datetime.now().year}",
+                        help="Temporadas de básquet, p.ej. 2019-2025 o 2023,2024 (vacío: ninguna)")
+    parser.add_argument('--zones', default=','.join(ZONES), help="Zonas de básquet, p.ej. a,b")
+    parser.add_argument('--voley-tournaments', default='',
+                        help="Torneos de metrovoley, p.ej. 60-200 o 75:482 con grupo (por defecto ninguno: usan Chrome)")
+    parser.add_argument('--concurrency', type=int, default=8, help="Objetivos scrapeados a la vez")
+    parser.add_argument('--per-host', type=int, default=4, help="Descargas simultáneas por host")
+    parser.add_argument('--rate', type=float, default=4.0, help="Pedidos por segundo por host (0: sin límite)")
+    parser.add_argument('--browsers', type=int, default=1, help="Chrome abiertos a la vez (voley)")
+    parser.add_argument('--batch', type=int, default=25, help="Objetivos por escritura y checkpoint")
+    parser.add_argument('--max-attempts', type=int, default=2, help="Intentos por objetivo entre corridas")
+    parser.add_argument('--checkpoint', default=CHECKPOINT_FILE)
+    parser.add_argument('--reset', action='store_true', help="Ignora el checkpoint y empieza de cero")
+    parser.add_argument('--list', action='store_true', help="Sólo lista los objetivos pendientes")
+    args = parser.parse_args()
+
+    setup_logging()
+    targets = (basketball_targets(parse_seasons(args.seasons), [zone for zone in args.zones.split(',') if zone])
+               + voley_targets(parse_tournaments(args.voley_tournaments)))
+    if args.reset and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    checkpoint = BackfillCheckpoint(args.checkpoint)
+    if args.list:
+        for target in targets:
+            if checkpoint.should_run(target.source, args.max_attempts):
+                print(f"{target.source:<32} {target.url}")
+        return
+
+    stats = asyncio.run(run_backfill(
+        targets, checkpoint, concurrency=args.concurrency, per_host=args.per_host,
+        rate=args.rate or None, browsers=args.browsers, batch_size=args.batch,
+        max_attempts=args.max_attempts))
+    print(f"{stats[DONE]} objetivos terminados, {stats[MISSING]} sin tabla, {stats[FAILED]} fallidos, "
+          f"{stats['skipped']} salteados; "
+          f"{stats['tables']} tablas nuevas en el historial")
+
+
+if __name__ == "__main__":
+    main()
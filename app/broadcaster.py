@@ -0,0 +1,117 @@
+"""Difusión de actualizaciones a clientes suscriptos por Server-Sent Events.
+
+Cuando un scraping trae datos distintos a la última versión de un tema (p.ej.
+`voley/tira-a/standings`), `updates.publish_update` emite un evento con los
+datos completos y los cambios por fila. El evento se codifica una sola vez y se
+reparte a todos los suscriptores, así que el costo de un cliente inactivo es
+una cola y una corrutina esperando.
+
+Los scrapers corren en threads (scheduler, `asyncio.to_thread`), por eso la
+entrega a las colas se agenda en el event loop con `call_soon_threadsafe`.
+"""
+import asyncio
+import json
+import logging
+import threading
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from .metrics import Counter, GaugeCallback
+
+logger = logging.getLogger(__name__)
+
+# Eventos pendientes por cliente; si un cliente lento se atrasa más que esto
+# se descartan los más viejos (el último evento siempre tiene el estado completo)
+SUBSCRIBER_QUEUE_SIZE = 8
+# Comentario SSE periódico para que proxies y balanceadores no corten la conexión
+HEARTBEAT_SECONDS = 15.0
+
+EVENTS_PUBLISHED = Counter(
+    'padua_sse_events_total',
+    'Eventos de actualización emitidos por tema (sólo cuando cambian los datos)',
+    ['topic'])
+
+
+class Broadcaster:
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        # Por tema: (versión, evento SSE ya codificado)
+        self._latest: Dict[str, Tuple[int, bytes]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        """Event loop en el que viven las colas de los suscriptores"""
+        self._loop = loop
+
+    def publish(self, topic: str, payload: Dict, version: int):
+        """Emite `payload` como la versión `version` de `topic` a todos sus suscriptores"""
+        body = json.dumps(dict(payload, version=version), ensure_ascii=False, separators=(',', ':'))
+        event = f"id: {version}\nevent: update\ndata: {body}\n\n".encode('utf-8')
+        with self._lock:
+            self._latest[topic] = (version, event)
+
+        EVENTS_PUBLISHED.inc(topic=topic)
+        logger.info("Datos nuevos en %s (versión %s)", topic, version)
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._fan_out(topic, event)
+        else:
+            loop.call_soon_threadsafe(self._fan_out, topic, event)
+
+    def _fan_out(self, topic: str, event: bytes):
+        for queue in list(self._subscribers.get(topic, ())):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def latest_version(self, topic: str) -> Optional[int]:
+        with self._lock:
+            latest = self._latest.get(topic)
+        return latest[0] if latest else None
+
+    def subscriber_counts(self) -> List[Tuple[str, int]]:
+        return [(topic, len(queues)) for topic, queues in sorted(self._subscribers.items())]
+
+    async def stream(self, topic: str, last_event_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Eventos SSE de `topic` para un cliente.
+
+        Al conectarse se envía el último estado conocido, salvo que el cliente
+        ya lo tenga (`Last-Event-ID` igual a la versión actual).
+        """
+        if self._loop is None:
+            self.bind_loop(asyncio.get_running_loop())
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(topic, set()).add(queue)
+        try:
+            yield b"retry: 10000\n\n"
+            with self._lock:
+                latest = self._latest.get(topic)
+            if latest is not None and last_event_id != str(latest[0]):
+                yield latest[1]
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+        finally:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+
+broadcaster = Broadcaster()
+
+GaugeCallback(
+    'padua_sse_subscribers',
+    'Clientes conectados al stream de actualizaciones por tema',
+    ['topic'],
+    lambda: [({'topic': topic}, count) for topic, count in broadcaster.subscriber_counts()])
+
@@ -0,0 +1,376 @@
+"""Frecuencia de refresco adaptativa según cuándo cambian los datos de origen.
+
+Por cada liga y tipo de dato (p.ej. `voley/tira-a/standings`) un
+`ChangeModel` aprende en qué horas de la semana cambia el contenido. Cada
+scraping exitoso (`observe`) compara el hash del contenido con el anterior y
+reparte las horas transcurridas desde el chequeo previo entre las 168 franjas
+hora-de-la-semana (hora de Argentina); si hubo cambio, también reparte ese
+cambio. La tasa de cambio de una franja es cambios / horas observadas, con un
+prior chico (`PRIOR_CHANGES` en `PRIOR_HOURS`) para las franjas sin datos. Las
+cuentas se atenúan con una vida media de `HALF_LIFE_DAYS` para seguir los
+cambios de calendario a lo largo de la temporada.
+
+El próximo chequeo es el momento en que los cambios esperados desde el último
+llegan a `STALENESS_TARGET`, acotado entre `REFRESH_MIN_MINUTES` y
+`REFRESH_MAX_HOURS`. En las horas siguientes a un partido de la liga
+(según el calendario de fixtures) la tasa se multiplica por `MATCH_BOOST`, que
+es cuando se cargan resultados y se mueven las tablas.
+
+`AdaptiveScheduler` revisa cada `TICK_SECONDS` qué datos vencieron y los manda
+a la cola de refrescos, así comparten con los refrescos manuales la
+deduplicación, el límite de Chrome y el balde de tokens. Hay que pedirlo con
+`REFRESH_SCHEDULE=adaptive` (por defecto se refresca con el cron de lunes y
+miércoles): en las semanas con partidos refresca mucho más seguido que el
+cron, y cada refresco de posiciones de voley abre Chrome.
+
+Lo aprendido (también con el cron, que alimenta los mismos modelos) se guarda
+en `REFRESH_CADENCE_FILE` para sobrevivir reinicios, como mucho cada
+`SAVE_INTERVAL` segundos y al apagar la app (`flush`).
+
+Al arrancar, los datos que ya vencieron (todos, si no hay archivo de
+frecuencias, p.ej. en un disco efímero) no se lanzan juntos: se escalonan
+cada `FIRST_CHECK_STAGGER` segundos para no abrir varios Chrome a la vez.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .diffing import content_hash
+from .fixture_calendar import LEAGUE_TZ, fixture_calendar
+from .jobs import RateLimited
+from .metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+CADENCE_FILE = os.environ.get('REFRESH_CADENCE_FILE', os.path.join('data', 'refresh_cadence.json'))
+MIN_INTERVAL = float(os.environ.get('REFRESH_MIN_MINUTES', '20')) * 60
+MAX_INTERVAL = float(os.environ.get('REFRESH_MAX_HOURS', '12')) * 3600
+# Cambios esperados desde el último chequeo a partir de los cuales se vuelve a scrapear
+STALENESS_TARGET = 0.5
+# Prior de cada franja: una vez cada 48 h
+PRIOR_CHANGES = 0.25
+PRIOR_HOURS = 12.0
+HALF_LIFE_DAYS = 28.0
+# Después de un partido: la tasa se multiplica entre MATCH_RESULT_AFTER y MATCH_RESULT_UNTIL horas del inicio
+MATCH_BOOST = 6.0
+MATCH_RESULT_AFTER = 1.0
+MATCH_RESULT_UNTIL = 14.0
+# Un cambio visto después de mucho tiempo sin chequear se reparte, como mucho, en las últimas horas
+MAX_ATTRIBUTION_HOURS = 72.0
+TICK_SECONDS = 60.0
+# Separación mínima entre escrituras del archivo de frecuencias
+SAVE_INTERVAL = 300.0
+# Al arrancar, separación entre los refrescos que ya están vencidos
+FIRST_CHECK_STAGGER = float(os.environ.get('REFRESH_FIRST_CHECK_STAGGER_SECONDS', '120'))
+
+HOURS_PER_WEEK = 7 * 24
+HOUR = 3600.0
+
+SCHEDULED_REFRESHES = Counter(
+    'padua_scheduled_refreshes_total',
+    'Refrescos lanzados por el scheduler adaptativo por resultado (encolado, unido, reutilizado o rechazado)',
+    ['source', 'kind', 'outcome'])
+CONTENT_CHECKS = Counter(
+    'padua_content_checks_total',
+    'Scrapings exitosos observados por el scheduler, por si el contenido cambió',
+    ['source', 'kind', 'changed'])
+
+# (inicio, fin) en epoch -> si la liga tiene partidos que empiezan en ese rango
+MatchLookup = Callable[[float, float], bool]
+
+
+def hour_of_week(timestamp: float) -> int:
+    moment = datetime.fromtimestamp(timestamp, LEAGUE_TZ)
+    return moment.weekday() * 24 + moment.hour
+
+
+def _hour_spans(start: float, end: float) -> Iterable[Tuple[float, int, float]]:
+    """Tramos de [start, end) dentro de una misma franja: (inicio, franja, horas)"""
+    # La zona horaria de la liga tiene un corrimiento de horas enteras: las horas empiezan en múltiplos de 3600
+    t = start
+    while t < end:
+        boundary = min(end, (int(t // HOUR) + 1) * HOUR)
+        yield t, hour_of_week(t), (boundary - t) / HOUR
+        t = boundary
+
+
+def calendar_matches(source: str) -> MatchLookup:
+    """Partidos de `source` según el calendario de fixtures"""
+    def lookup(start: float, end: float) -> bool:
+        return bool(fixture_calendar.between(datetime.fromtimestamp(start, LEAGUE_TZ),
+                                             datetime.fromtimestamp(end, LEAGUE_TZ), source))
+    return lookup
+
+
+class ChangeModel:
+    """Cuándo cambia el contenido de una liga y tipo de dato"""
+
+    def __init__(self):
+        self.changes = [0.0] * HOURS_PER_WEEK
+        self.observed = [0.0] * HOURS_PER_WEEK
+        self.last_check: Optional[float] = None
+        self.last_hash: Optional[str] = None
+        self.decayed_at: Optional[float] = None
+        self.checks = 0
+        self.detected = 0
+
+    def observe(self, digest: str, now: float) -> bool:
+        """Registra un scraping con contenido `digest`; retorna True si cambió"""
+        changed = self.last_hash is not None and digest != self.last_hash
+        if self.last_check is not None and now > self.last_check:
+            self._decay(now)
+            spans = list(_hour_spans(max(self.last_check, now - MAX_ATTRIBUTION_HOURS * HOUR), now))
+            total = sum(hours for _, _, hours in spans)
+            for _, bucket, hours in spans:
+                self.observed[bucket] += hours
+                if changed and total:
+                    self.changes[bucket] += hours / total
+        self.checks += 1
+        self.detected += changed
+        self.last_hash = digest
+        self.last_check = now
+        return changed
+
+    def _decay(self, now: float):
+        if self.decayed_at is not None:
+            factor = 0.5 ** ((now - self.decayed_at) / (HALF_LIFE_DAYS * 24 * HOUR))
+            self.changes = [value * factor for value in self.changes]
+            self.observed = [value * factor for value in self.observed]
+        self.decayed_at = now
+
+    def rate(self, bucket: int) -> float:
+        """Cambios por hora estimados en la franja `bucket`"""
+        return (self.changes[bucket] + PRIOR_CHANGES) / (self.observed[bucket] + PRIOR_HOURS)
+
+    def next_check(self, matches: Optional[MatchLookup] = None) -> float:
+        """Momento (epoch) del próximo scraping; 0 si nunca se chequeó"""
+        if self.last_check is None:
+            return 0.0
+        expected = 0.0
+        end = self.last_check + MAX_INTERVAL
+        for bucket_start, bucket, hours in _hour_spans(self.last_check, end):
+            rate = self.rate(bucket)
+            if matches is not None and matches(bucket_start - MATCH_RESULT_UNTIL * HOUR,
+                                               bucket_start - MATCH_RESULT_AFTER * HOUR):
+                rate *= MATCH_BOOST
+            if expected + rate * hours >= STALENESS_TARGET:
+                due = bucket_start + (STALENESS_TARGET - expected) / rate * HOUR
+                return max(self.last_check + MIN_INTERVAL, due)
+            expected += rate * hours
+        return end
+
+    def to_dict(self) -> Dict:
+        return {"changes": [round(v, 4) for v in self.changes],
+                "observed": [round(v, 4) for v in self.observed],
+                "last_check": self.last_check, "last_hash": self.last_hash,
+                "decayed_at": self.decayed_at, "checks": self.checks, "detected": self.detected}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ChangeModel':
+        model = cls()
+        if len(data.get("changes", ())) == HOURS_PER_WEEK and len(data.get("observed", ())) == HOURS_PER_WEEK:
+            model.changes = [float(v) for v in data["changes"]]
+            model.observed = [float(v) for v in data["observed"]]
+        model.last_check = data.get("last_check")
+        model.last_hash = data.get("last_hash")
+        model.decayed_at = data.get("decayed_at")
+        model.checks = int(data.get("checks", 0))
+        model.detected = int(data.get("detected", 0))
+        return model
+
+
+class RefreshCadence:
+    """Modelos de cambio de todas las ligas, con persistencia en un archivo JSON"""
+
+    def __init__(self, path: Optional[str] = CADENCE_FILE, save_interval: float = SAVE_INTERVAL):
+        self.path = path
+        self.save_interval = save_interval
+        self._models: Dict[str, ChangeModel] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self._saved_at: Optional[float] = None
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            self._models = {topic: ChangeModel.from_dict(entry) for topic, entry in data.items()}
+            logger.info("Frecuencias de refresco cargadas: %s datos", len(self._models))
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning("No se pudo leer %s, se empieza de cero: %s", self.path, e)
+
+    def _model(self, source: str, kind: str) -> ChangeModel:
+        topic = f"{source}/{kind}"
+        model = self._models.get(topic)
+        if model is None:
+            model = self._models[topic] = ChangeModel()
+        return model
+
+    def observe(self, source: str, kind: str, data, now: Optional[float] = None) -> bool:
+        """Registra el contenido de un scraping exitoso; retorna True si cambió"""
+        digest = content_hash(data)
+        with self._lock:
+            self._ensure_loaded()
+            changed = self._model(source, kind).observe(digest, now or time.time())
+            self._dirty = True
+            if self._saved_at is None or time.monotonic() - self._saved_at >= self.save_interval:
+                self._save()
+        CONTENT_CHECKS.inc(source=source, kind=kind, changed='si' if changed else 'no')
+        return changed
+
+    def next_check(self, source: str, kind: str, matches: Optional[MatchLookup] = None) -> float:
+        with self._lock:
+            self._ensure_loaded()
+            return self._model(source, kind).next_check(matches)
+
+    def describe(self, source: str, kind: str, matches: Optional[MatchLookup] = None) -> Dict:
+        """Estado de `source`/`kind` para el endpoint de estado"""
+        with self._lock:
+            self._ensure_loaded()
+            model = self._model(source, kind)
+            due = model.next_check(matches)
+            rates = [model.rate(bucket) for bucket in range(HOURS_PER_WEEK)]
+            busiest = sorted(range(HOURS_PER_WEEK), key=rates.__getitem__, reverse=True)[:3]
+            return {
+                "source": source,
+                "kind": kind,
+                "checks": model.checks,
+                "changes": model.detected,
+                "last_check": _isoformat(model.last_check),
+                "next_check": _isoformat(due) if due else None,
+                "busiest_hours": [{"weekday": bucket // 24, "hour": bucket % 24,
+                                   "changes_per_day": round(rates[bucket] * 24, 2)} for bucket in busiest],
+            }
+
+    def flush(self):
+        """Guarda lo que quedó sin escribir (al apagar la app)"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _save(self):
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({topic: model.to_dict() for topic, model in self._models.items()}, f,
+                          separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error("No se pudieron guardar las frecuencias de refresco en %s: %s", self.path, e)
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp, LEAGUE_TZ).isoformat() if timestamp else None
+
+
+refresh_cadence = RefreshCadence()
+
+
+class AdaptiveScheduler:
+    """Lanza los refrescos que vencieron según `refresh_cadence`.
+
+    `submit(source, kind)` encola el refresco en la cola de refrescos (lanza
+    RateLimited si no hay crédito). `matches(source)` da los partidos de una
+    liga para el refuerzo después de partidos.
+    """
+
+    def __init__(self, targets: List[Tuple[str, str]], submit: Callable,
+                 matches: Optional[Callable[[str], MatchLookup]] = calendar_matches,
+                 cadence: RefreshCadence = refresh_cadence, tick: float = TICK_SECONDS,
+                 first_check_stagger: float = FIRST_CHECK_STAGGER):
+        self.targets = targets
+        self._submit = submit
+        self._matches = matches
+        self.cadence = cadence
+        self.tick = tick
+        self.first_check_stagger = first_check_stagger
+        # No reintentar un dato antes de este momento (después de lanzarlo o de un rechazo)
+        self._not_before: Dict[Tuple[str, str], float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def due(self, now: Optional[float] = None) -> List[Tuple[str, str]]:
+        now = now or time.time()
+        return [(source, kind) for source, kind in self.targets
+                if now >= self._not_before.get((source, kind), 0.0)
+                and now >= self.cadence.next_check(source, kind, self._lookup(source))]
+
+    def stagger_due(self, now: Optional[float] = None):
+        """Escalona los datos vencidos al arrancar para que no se lancen todos juntos"""
+        now = now or time.time()
+        for index, target in enumerate(self.due(now)):
+            self._not_before[target] = max(self._not_before.get(target, 0.0),
+                                           now + index * self.first_check_stagger)
+
+    def _lookup(self, source: str) -> Optional[MatchLookup]:
+        return self._matches(source) if self._matches is not None else None
+
+    def run_once(self, now: Optional[float] = None) -> int:
+        """Encola los refrescos vencidos; retorna cuántos se lanzaron"""
+        now = now or time.time()
+        launched = 0
+        for source, kind in self.due(now):
+            try:
+                _, outcome = self._submit(source, kind)
+            except RateLimited as e:
+                SCHEDULED_REFRESHES.inc(source=source, kind=kind, outcome='rechazado')
+                self._not_before[(source, kind)] = now + e.retry_after
+                continue
+            # Si el scraping falla no hay observación: se reintenta recién después del intervalo mínimo
+            self._not_before[(source, kind)] = now + MIN_INTERVAL
+            SCHEDULED_REFRESHES.inc(source=source, kind=kind, outcome=outcome)
+            launched += 1
+        return launched
+
+    async def _run(self):
+        while True:
+            try:
+                launched = self.run_once()
+                if launched:
+                    logger.info("Scheduler adaptativo: %s refrescos encolados", launched)
+            except Exception as e:
+                logger.error("Error en el scheduler adaptativo: %s", e)
+            await asyncio.sleep(self.tick)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self._task is None:
+            self.stagger_due()
+            self._task = asyncio.create_task(self._run())
+
+    async def aclose(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def next_check_samples(self) -> List[Tuple[Dict[str, str], float]]:
+        """Segundos hasta el próximo refresco de cada dato (para la métrica)"""
+        now = time.time()
+        return [({'source': source, 'kind': kind},
+                 max(0.0, self.cadence.next_check(source, kind, self._lookup(source)) - now))
+                for source, kind in self.targets]
+
+    def status(self) -> List[Dict]:
+        return [self.cadence.describe(source, kind, self._lookup(source)) for source, kind in self.targets]
+
@@ -0,0 +1,170 @@
+"""Detección de cambios entre snapshots sucesivos de posiciones y fixtures.
+
+Cada liga y tipo de dato (p.ej. `basquet/standings`) tiene un
+`SnapshotHistory` que numera las versiones distintas de los datos y guarda
+las últimas `MAX_VERSIONS`. Con eso se arman los deltas para `?since=<versión>`:
+filas agregadas, quitadas y cambiadas (con el valor anterior y el nuevo de
+cada campo), más los movimientos de posición en las tablas.
+
+Los números de versión llevan la época del proceso (`PROCESS_EPOCH`, al azar
+en cada arranque): `version = época * VERSIONS_PER_EPOCH + n`. Así un
+`since` de antes de un reinicio, o de otro worker de uvicorn, no coincide con
+una versión de este proceso y recibe los datos completos en lugar de un delta
+contra otro contenido.
+
+Las filas se identifican por equipo en las posiciones y por el cruce
+local/visitante y la fecha en los fixtures (el mismo cruce se repite en ida y
+vuelta o en playoffs). Como los fixtures sólo listan partidos pendientes, un
+partido que desaparece es un partido que ya se jugó; uno reprogramado aparece
+como quitado y agregado.
+"""
+import hashlib
+import json
+import random
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Versiones que se conservan por liga; un `since` más viejo recibe los datos completos
+MAX_VERSIONS = 20
+# Versiones por época; con épocas de 20 bits el número entra en un entero de JavaScript
+VERSIONS_PER_EPOCH = 1_000_000
+PROCESS_EPOCH = random.SystemRandom().randrange(1, 2 ** 20)
+
+
+def content_hash(data) -> str:
+    """Hash estable del contenido (independiente del orden de las claves)"""
+    encoded = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+def standings_key(row: Dict) -> str:
+    return str(row.get('equipo', '')).strip().lower()
+
+
+def fixture_key(row: Dict) -> str:
+    return '|'.join(str(row.get(field, '')).strip().lower() for field in ('local', 'visitante', 'fecha'))
+
+
+ROW_KEYS: Dict[str, Callable[[Dict], str]] = {
+    'standings': standings_key,
+    'fixtures': fixture_key,
+}
+
+
+def diff_rows(old: List[Dict], new: List[Dict], key_fn: Callable[[Dict], str]) -> Dict:
+    """Cambios por fila entre dos listas de filas identificadas con `key_fn`"""
+    old_by_key = OrderedDict((key_fn(row), row) for row in old or [])
+    new_by_key = OrderedDict((key_fn(row), row) for row in new or [])
+
+    added = [row for key, row in new_by_key.items() if key not in old_by_key]
+    removed = [row for key, row in old_by_key.items() if key not in new_by_key]
+    changed = []
+    for key, row in new_by_key.items():
+        previous = old_by_key.get(key)
+        if previous is None or previous == row:
+            continue
+        fields = {field: [previous.get(field), row.get(field)]
+                  for field in sorted(set(previous) | set(row))
+                  if previous.get(field) != row.get(field)}
+        changed.append({"row": row, "fields": fields})
+    return {"added": added, "removed": removed, "changed": changed}
+
+
+def position_moves(changes: Dict) -> List[Dict]:
+    """Equipos que cambiaron de posición (positivo = subió)"""
+    moves = []
+    for change in changes["changed"]:
+        if 'posicion' not in change["fields"]:
+            continue
+        before, after = change["fields"]['posicion']
+        try:
+            delta = int(before) - int(after)
+        except (TypeError, ValueError):
+            delta = None
+        moves.append({"equipo": change["row"].get('equipo'), "desde": before, "hasta": after, "cambio": delta})
+    return moves
+
+
+class SnapshotHistory:
+    """Versiones recientes de los datos de una liga y tipo de dato"""
+
+    def __init__(self, kind: str, max_versions: int = MAX_VERSIONS, epoch: int = PROCESS_EPOCH):
+        self.kind = kind
+        self.key_fn = ROW_KEYS[kind]
+        # versión -> (hash, filas, last_update)
+        self._versions: 'OrderedDict[int, Tuple[str, List[Dict], Optional[str]]]' = OrderedDict()
+        self._max_versions = max_versions
+        self._lock = threading.Lock()
+        self.epoch = epoch
+        # 0 mientras no haya ninguna versión registrada
+        self.version = 0
+
+    def _next_version(self) -> int:
+        first = self.epoch * VERSIONS_PER_EPOCH + 1
+        return first if self.version == 0 else self.version + 1
+
+    def record(self, rows: List[Dict], last_update: Optional[str]) -> Optional[Dict]:
+        """Registra un resultado nuevo. Retorna los cambios si es una versión nueva, o None"""
+        digest = content_hash(rows)
+        with self._lock:
+            previous = self._versions.get(self.version)
+            if previous is not None and previous[0] == digest:
+                return None
+            changes = self._diff(previous[1] if previous else [], rows)
+            self.version = self._next_version()
+            self._versions[self.version] = (digest, rows, last_update)
+            while len(self._versions) > self._max_versions:
+                self._versions.popitem(last=False)
+            return changes
+
+    def current(self) -> Tuple[int, Optional[List[Dict]]]:
+        """Versión actual y sus filas (None si todavía no hay ninguna)"""
+        with self._lock:
+            entry = self._versions.get(self.version)
+            return self.version, entry[1] if entry else None
+
+    def delta_since(self, since: int) -> Dict:
+        """Cambios desde la versión `since` hasta la actual.
+
+        Si `since` ya no se conserva, no existe o es de otra época (otro
+        proceso o antes de un reinicio) se devuelven los datos completos con
+        `full: true`.
+        """
+        with self._lock:
+            current = self._versions.get(self.version)
+            base = self._versions.get(since) if since // VERSIONS_PER_EPOCH == self.epoch else None
+            version = self.version
+        response = {
+            "version": version,
+            "since": since,
+            "last_update": current[2] if current else None,
+        }
+        if since == version:
+            response.update(full=False, changes=self._diff([], []))
+        elif base is None or current is None:
+            response.update(full=True, **{self.kind: current[1] if current else None})
+        else:
+            response.update(full=False, changes=self._diff(base[1], current[1]))
+        return response
+
+    def _diff(self, old: List[Dict], new: List[Dict]) -> Dict:
+        changes = diff_rows(old, new, self.key_fn)
+        if self.kind == 'standings':
+            changes["moves"] = position_moves(changes)
+        return changes
+
+
+_histories: Dict[str, SnapshotHistory] = {}
+_histories_lock = threading.Lock()
+
+
+def get_history(source: str, kind: str) -> SnapshotHistory:
+    """Historial de versiones de `source` ('basquet', 'voley/tira-a', ...) y `kind`"""
+    topic = f"{source}/{kind}"
+    with _histories_lock:
+        history = _histories.get(topic)
+        if history is None:
+            history = SnapshotHistory(kind)
+            _histories[topic] = history
+        return history
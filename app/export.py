@@ -0,0 +1,155 @@
+"""Exportación estática de las respuestas de la API a archivos JSON.
+
+Después de cada scraping exitoso (`updates.publish_update`) se escribe en
+`STATIC_EXPORT_DIR` (por defecto `data/export`; vacío la desactiva) la misma
+respuesta que da el endpoint sin parámetros, con la ruta del endpoint como
+nombre de archivo:
+
+- `api/standings/voley/tira-a.json`: la última respuesta (cambia en cada refresco)
+- `api/standings/voley/tira-a.<hash>.json`: la respuesta de cada contenido
+  distinto, nombrada por el hash de los datos, así que nunca cambia y se puede
+  cachear para siempre; se conservan las últimas `MAX_VERSIONS`
+- `manifest.json`: por endpoint, versión (la de `?since`), `last_update`,
+  archivos, tamaños y sha256
+
+Cada archivo va acompañado de su versión comprimida `.gz` (y `.br` si está
+instalado `brotli`), para servirlos tal cual con `gzip_static` de nginx o
+desde un bucket con `Content-Encoding`. Todo se escribe en un temporal y se
+renombra, así que quien lee nunca ve un archivo a medio escribir, y el
+manifest se escribe último: los archivos a los que apunta ya existen.
+
+Con esto el frontend puede leer los datos sin pasar por Python y seguir
+funcionando mientras el backend arranca en frío.
+"""
+import glob
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from .diffing import MAX_VERSIONS, content_hash
+from .metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = os.environ.get('STATIC_EXPORT_DIR', os.path.join('data', 'export'))
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_EXPORTS = Counter(
+    'padua_static_exports_total',
+    'Escrituras de la exportación estática por fuente, tipo de dato y resultado',
+    ['source', 'kind', 'result'])
+
+
+def endpoint_path(source: str, kind: str) -> str:
+    """Ruta del endpoint de lectura de `source`/`kind`"""
+    return f"/api/{kind}/{source}"
+
+
+def encode(payload: Dict) -> bytes:
+    # Mismo formato que las respuestas JSON de FastAPI
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode('utf-8')
+
+
+class StaticExport:
+    def __init__(self, directory: Optional[str] = EXPORT_DIR, max_versions: int = MAX_VERSIONS):
+        self.directory = directory
+        self.max_versions = max_versions
+        self._manifest: Optional[Dict] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def ensure_dir(self):
+        if self.enabled:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def export(self, source: str, kind: str, data, last_update: Optional[str], version: int) -> bool:
+        """Escribe la respuesta de `source`/`kind` y actualiza el manifest. Retorna False si falló"""
+        if not self.enabled:
+            return False
+        endpoint = endpoint_path(source, kind)
+        relative = endpoint.lstrip('/')
+        body = encode({"error": None, "last_update": last_update, kind: data, "version": version})
+        try:
+            with self._lock:
+                manifest = self._load_manifest()
+                immutable = f"{relative}.{content_hash(data)[:16]}.json"
+                if not os.path.exists(self._path(immutable)):
+                    self._write_all(immutable, body)
+                    self._prune(relative)
+                sizes = self._write_all(f"{relative}.json", body)
+                manifest["endpoints"][endpoint] = dict(
+                    sizes, source=source, kind=kind, version=version, last_update=last_update,
+                    latest=f"{relative}.json", immutable=immutable,
+                    sha256=hashlib.sha256(body).hexdigest())
+                manifest["generated_at"] = datetime.now().isoformat()
+                self._write("manifest.json", encode(manifest))
+        except OSError as e:
+            logger.error("No se pudo exportar %s a %s: %s", endpoint, self.directory, e)
+            STATIC_EXPORTS.inc(source=source, kind=kind, result='error')
+            return False
+        STATIC_EXPORTS.inc(source=source, kind=kind, result='ok')
+        return True
+
+    def _path(self, relative: str) -> str:
+        return os.path.join(self.directory, *relative.split('/'))
+
+    def _load_manifest(self) -> Dict:
+        if self._manifest is None:
+            self._manifest = {"generated_at": None, "endpoints": {}}
+            try:
+                with open(self._path('manifest.json'), encoding='utf-8') as f:
+                    self._manifest["endpoints"].update(json.load(f).get("endpoints", {}))
+            except (OSError, ValueError, AttributeError):
+                pass
+        return self._manifest
+
+    def _write_all(self, relative: str, body: bytes) -> Dict[str, int]:
+        """Escribe el archivo y sus versiones comprimidas; retorna los tamaños"""
+        sizes = {"bytes": len(body)}
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        self._write(f"{relative}.gz", compressed)
+        sizes["gzip_bytes"] = len(compressed)
+        if brotli is not None:
+            compressed = brotli.compress(body)
+            self._write(f"{relative}.br", compressed)
+            sizes["brotli_bytes"] = len(compressed)
+        # El archivo sin comprimir va último: si existe, existen sus versiones comprimidas
+        self._write(relative, body)
+        return sizes
+
+    def _write(self, relative: str, content: bytes):
+        path = self._path(relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def _prune(self, relative: str):
+        """Borra los archivos inmutables más viejos, dejando los últimos `max_versions` contenidos"""
+        prefix = self._path(relative)
+        pattern = re.compile(re.escape(os.path.basename(prefix)) + r'\.[0-9a-f]{16}\.json$')
+        files = [path for path in glob.glob(f"{glob.escape(prefix)}.*.json") if pattern.match(os.path.basename(path))]
+        files.sort(key=os.path.getmtime, reverse=True)
+        for path in files[self.max_versions:]:
+            for suffix in ('.gz', '.br', ''):
+                try:
+                    os.remove(path + suffix)
+                except OSError:
+                    pass
+
+
+static_export = StaticExport()
@@ -0,0 +1,122 @@
+"""Calendario de partidos con fechas normalizadas e índices ordenados.
+
+Cada partido trae su inicio normalizado en el campo `inicio` (lo interpreta
+`app/scraper/dates.py` al scrapear, a partir de los textos de fecha y hora).
+
+`FixtureCalendar` mantiene los partidos de cada liga ordenados por inicio,
+más un índice combinado de todas las ligas y otro de los partidos de CASA de
+Padua, así que "próximos N partidos", "este fin de semana" o un rango de
+fechas se responden con búsqueda binaria sobre arrays de timestamps.
+"""
+import heapq
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from .scraper.dates import LEAGUE_TZ
+
+
+def is_casa_team(name: str) -> bool:
+    """Si el nombre de equipo corresponde a CASA de Padua (mismo criterio que los scrapers)"""
+    name = (name or '').lower()
+    return 'padua' in name or 'casa' in name
+
+
+def is_casa_match(fixture: Dict) -> bool:
+    """Si CASA de Padua juega el partido (como local o visitante)"""
+    return is_casa_team(fixture.get('local')) or is_casa_team(fixture.get('visitante'))
+
+
+class _SortedIndex:
+    """Partidos ordenados por inicio con sus timestamps en un array para bisect"""
+
+    def __init__(self, entries: List[Tuple[float, Dict]]):
+        self.times = array('d', (t for t, _ in entries))
+        self.fixtures = [fixture for _, fixture in entries]
+
+    def between(self, start: float, end: float) -> List[Dict]:
+        return self.fixtures[bisect_left(self.times, start):bisect_right(self.times, end)]
+
+    def upcoming(self, now: float, limit: int) -> List[Dict]:
+        first = bisect_left(self.times, now)
+        return self.fixtures[first:first + limit]
+
+
+class FixtureCalendar:
+    def __init__(self):
+        self._leagues: Dict[str, List[Tuple[float, Dict]]] = {}
+        self._by_league: Dict[str, _SortedIndex] = {}
+        self._casa_by_league: Dict[str, _SortedIndex] = {}
+        self._all = _SortedIndex([])
+        self._casa = _SortedIndex([])
+        self._lock = threading.Lock()
+
+    def update(self, source: str, fixtures: List[Dict]):
+        """Reemplaza los partidos de `source` y reconstruye los índices combinados"""
+        entries = []
+        for fixture in fixtures or []:
+            start = fixture.get('inicio')
+            if not start:
+                continue
+            if isinstance(start, str):
+                start = datetime.fromisoformat(start)
+            entries.append((start.timestamp(), dict(fixture, source=source)))
+        entries.sort(key=lambda entry: entry[0])
+        with self._lock:
+            self._leagues[source] = entries
+            self._by_league[source] = _SortedIndex(entries)
+            self._casa_by_league[source] = _SortedIndex([entry for entry in entries if is_casa_match(entry[1])])
+            merged = list(heapq.merge(*self._leagues.values(), key=lambda entry: entry[0]))
+            self._all = _SortedIndex(merged)
+            self._casa = _SortedIndex([entry for entry in merged if is_casa_match(entry[1])])
+
+    def _index(self, source: Optional[str], casa: bool) -> Optional[_SortedIndex]:
+        if source is None:
+            return self._casa if casa else self._all
+        return (self._casa_by_league if casa else self._by_league).get(source)
+
+    def upcoming(self, limit: int = 10, source: Optional[str] = None, casa: bool = False,
+                 now: Optional[datetime] = None) -> List[Dict]:
+        """Próximos `limit` partidos desde `now`"""
+        index = self._index(source, casa)
+        if index is None:
+            return []
+        return index.upcoming((now or datetime.now(LEAGUE_TZ)).timestamp(), limit)
+
+    def between(self, start: datetime, end: datetime, source: Optional[str] = None,
+                casa: bool = False) -> List[Dict]:
+        """Partidos con inicio entre `start` y `end` (inclusive)"""
+        index = self._index(source, casa)
+        if index is None:
+            return []
+        return index.between(start.timestamp(), end.timestamp())
+
+    def weekend(self, source: Optional[str] = None, casa: bool = False,
+                now: Optional[datetime] = None) -> Tuple[datetime, datetime, List[Dict]]:
+        """Partidos del fin de semana en curso o el próximo (viernes a domingo)"""
+        now = now or datetime.now(LEAGUE_TZ)
+        friday = now.date() + timedelta(days=(4 - now.weekday()) % 7)
+        if now.weekday() >= 5:
+            friday = now.date() - timedelta(days=now.weekday() - 4)
+        start = datetime.combine(friday, time(0, 0), tzinfo=LEAGUE_TZ)
+        end = datetime.combine(friday + timedelta(days=2), time(23, 59, 59), tzinfo=LEAGUE_TZ)
+        return start, end, self.between(start, end, source, casa)
+
+
+fixture_calendar = FixtureCalendar()
+
+
+def parse_range_bound(value: str, end_of_day: bool = False) -> datetime:
+    """Límite de un rango de consulta: fecha (`2025-05-10`) o fecha y hora ISO.
+
+    Sin zona horaria se interpreta en hora de Argentina. Lanza ValueError si
+    el formato no es válido.
+    """
+    parsed = datetime.fromisoformat(value)
+    if end_of_day and len(value) == 10:
+        parsed += timedelta(days=1, microseconds=-1)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=LEAGUE_TZ)
+    return parsed
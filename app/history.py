@@ -0,0 +1,316 @@
+"""Historial de tablas de posiciones para gráficos de evolución en la temporada.
+
+Cada tabla distinta que traen los scrapers se agrega a un `StandingsHistory`
+por liga, con almacenamiento columnar:
+
+- el contenido de cada tabla se guarda una sola vez por hash (un "bloque"),
+  con una columna `array` por campo (equipo, posición, puntos, ...)
+- la línea de tiempo es un par de arrays (instante, bloque), ordenada, así
+  que "la tabla a tal fecha" es una búsqueda binaria
+- por equipo se indexa en qué fila de cada bloque aparece, así que su
+  trayectoria se arma sin recorrer las tablas completas
+
+Para sobrevivir reinicios, cada entrada se agrega a un archivo JSON Lines
+(`HISTORY_FILE`, por defecto `data/standings_history.jsonl`) que se vuelve a
+leer en el primer uso. El contenido de un bloque sólo se escribe la primera
+vez que aparece. Las entradas del backfill llevan además `meta` (origen y
+temporada), que se devuelve con las consultas de esa liga.
+"""
+import json
+import logging
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from .diffing import content_hash, standings_key
+from .scraper.models import StandingRow
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FILE = os.environ.get('HISTORY_FILE', os.path.join('data', 'standings_history.jsonl'))
+
+# Campos numéricos guardados en columnas; los ausentes se guardan como MISSING
+NUMBER_FIELDS = ('posicion',) + StandingRow._fields[2:]
+MISSING = -2 ** 31
+
+
+def _timestamp(value: Optional[str]) -> float:
+    if value:
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass
+    return datetime.now().timestamp()
+
+
+def query_time(value: str, end_of_day: bool = False) -> float:
+    """Instante de una fecha (`2025-05-01`) o fecha y hora ISO de una consulta.
+
+    Con `end_of_day`, una fecha sola abarca el día completo. Lanza ValueError
+    si el formato no es válido.
+    """
+    parsed = datetime.fromisoformat(value)
+    if end_of_day and len(value) == 10:
+        parsed += timedelta(days=1, microseconds=-1)
+    return parsed.timestamp()
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+class StandingsHistory:
+    """Tablas de posiciones de una liga a lo largo del tiempo"""
+
+    def __init__(self, source: str):
+        self.source = source
+        # Línea de tiempo ordenada: instante (epoch) y bloque vigente desde entonces
+        self.times = array('d')
+        self.block_ids = array('I')
+        # Bloques de contenido: hash -> id, y rango de filas [inicio, fin) de cada uno
+        self.block_by_hash: Dict[str, int] = {}
+        self.block_starts = array('I')
+        self.block_ends = array('I')
+        # Columnas de filas de todos los bloques
+        self.team_column = array('I')
+        self.columns: Dict[str, array] = {field: array('i') for field in NUMBER_FIELDS}
+        # Equipos: clave normalizada -> id, nombre mostrado, y fila por bloque
+        self.team_ids: Dict[str, int] = {}
+        self.team_names: List[str] = []
+        self.team_rows: List[Dict[int, int]] = []
+        # Datos de la serie que no salen de las tablas: las cargadas por el
+        # backfill llevan {"origin": "backfill", "season": 2019, ...}
+        self.metadata: Dict = {}
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def add(self, rows: List[Dict], at: float, digest: Optional[str] = None) -> Tuple[bool, bool]:
+        """Agrega la tabla vigente desde `at`.
+
+        Retorna (agregada, bloque_nuevo). No agrega nada si la tabla es igual
+        a la vigente en ese momento.
+        """
+        digest = digest or content_hash(rows)
+        position = bisect_right(self.times, at)
+        block = self.block_by_hash.get(digest)
+        if block is not None and position > 0 and self.block_ids[position - 1] == block:
+            return False, False
+        is_new = block is None
+        if is_new:
+            block = self._add_block(rows, digest)
+        # Casi siempre se agrega al final; `insert` cubre cargas desordenadas
+        self.times.insert(position, at)
+        self.block_ids.insert(position, block)
+        return True, is_new
+
+    def _add_block(self, rows: List[Dict], digest: str) -> int:
+        block = len(self.block_starts)
+        self.block_by_hash[digest] = block
+        self.block_starts.append(len(self.team_column))
+        for row in rows:
+            key = standings_key(row)
+            team = self.team_ids.get(key)
+            if team is None:
+                team = len(self.team_names)
+                self.team_ids[key] = team
+                self.team_names.append(str(row.get('equipo', '')))
+                self.team_rows.append({})
+            else:
+                self.team_names[team] = str(row.get('equipo', ''))
+            self.team_rows[team][block] = len(self.team_column)
+            self.team_column.append(team)
+            for field in NUMBER_FIELDS:
+                value = row.get(field)
+                self.columns[field].append(MISSING if value is None else int(value))
+        self.block_ends.append(len(self.team_column))
+        return block
+
+    def _row(self, index: int) -> Dict:
+        row = {'posicion': self.columns['posicion'][index], 'equipo': self.team_names[self.team_column[index]]}
+        for field in NUMBER_FIELDS[1:]:
+            value = self.columns[field][index]
+            if value != MISSING:
+                row[field] = value
+        return row
+
+    def table_at(self, at: float) -> Optional[Tuple[float, List[Dict]]]:
+        """Tabla vigente en el instante `at` y desde cuándo rige"""
+        position = bisect_right(self.times, at) - 1
+        if position < 0:
+            return None
+        block = self.block_ids[position]
+        rows = [self._row(i) for i in range(self.block_starts[block], self.block_ends[block])]
+        return self.times[position], rows
+
+    def trajectory(self, team: str, start: Optional[float] = None,
+                   end: Optional[float] = None) -> Optional[List[Dict]]:
+        """Posición y puntos del equipo en cada tabla registrada entre `start` y `end`"""
+        team_id = self.team_ids.get(standings_key({'equipo': team}))
+        if team_id is None:
+            return None
+        rows_by_block = self.team_rows[team_id]
+        first = bisect_left(self.times, start) if start is not None else 0
+        last = bisect_right(self.times, end) if end is not None else len(self.times)
+        points = []
+        for position in range(first, last):
+            index = rows_by_block.get(self.block_ids[position])
+            if index is None:
+                continue
+            point = self._row(index)
+            del point['equipo']
+            point['at'] = _isoformat(self.times[position])
+            points.append(point)
+        return points
+
+    def teams(self) -> List[str]:
+        return sorted(self.team_names)
+
+
+class HistoryStore:
+    """Historiales de todas las ligas, con persistencia append-only en disco"""
+
+    def __init__(self, path: Optional[str] = HISTORY_FILE):
+        self.path = path
+        self._leagues: Dict[str, StandingsHistory] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        blocks: Dict[str, List[Dict]] = {}
+        count = 0
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.warning("Línea inválida en %s, se omite", self.path)
+                    continue
+                if 'standings' in entry:
+                    blocks[entry['hash']] = entry['standings']
+                rows = blocks.get(entry['hash'])
+                if rows is None:
+                    continue
+                league = self._league(entry['source'])
+                league.add(rows, entry['at'], entry['hash'])
+                league.metadata.update(entry.get('meta') or {})
+                count += 1
+        logger.info("Historial de posiciones cargado: %s tablas de %s ligas", count, len(self._leagues))
+
+    def _league(self, source: str) -> StandingsHistory:
+        league = self._leagues.get(source)
+        if league is None:
+            league = StandingsHistory(source)
+            self._leagues[source] = league
+        return league
+
+    def record(self, source: str, rows: List[Dict], last_update: Optional[str]) -> bool:
+        """Agrega la tabla de `source` si cambió; retorna True si se registró"""
+        if not rows:
+            return False
+        digest = content_hash(rows)
+        at = _timestamp(last_update)
+        with self._lock:
+            self._ensure_loaded()
+            added, new_block = self._league(source).add(rows, at, digest)
+            if added:
+                entry = {"source": source, "at": at, "hash": digest}
+                if new_block:
+                    entry["standings"] = rows
+                self._append(entry)
+        return added
+
+    def record_many(self, tables: List[Tuple[str, List[Dict], Optional[str], Optional[Dict]]]) -> int:
+        """Agrega varias tablas (source, filas, last_update, metadata) con una sola escritura.
+
+        Es la carga masiva del backfill; `metadata` (p.ej. la temporada) se
+        guarda con la entrada y queda en la serie. Retorna cuántas tablas se
+        registraron.
+        """
+        prepared = [(source, rows, content_hash(rows), _timestamp(last_update), metadata)
+                    for source, rows, last_update, metadata in tables if rows]
+        entries = []
+        with self._lock:
+            self._ensure_loaded()
+            for source, rows, digest, at, metadata in prepared:
+                league = self._league(source)
+                added, new_block = league.add(rows, at, digest)
+                if added:
+                    entry = {"source": source, "at": at, "hash": digest}
+                    if metadata:
+                        entry["meta"] = metadata
+                        league.metadata.update(metadata)
+                    if new_block:
+                        entry["standings"] = rows
+                    entries.append(entry)
+            self._append(*entries)
+        return len(entries)
+
+    def _append(self, *entries: Dict):
+        if not self.path or not entries:
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n'
+                                for entry in entries))
+        except OSError as e:
+            logger.error("No se pudo guardar el historial en %s: %s", self.path, e)
+
+    def get(self, source: str) -> Optional[StandingsHistory]:
+        with self._lock:
+            self._ensure_loaded()
+            return self._leagues.get(source)
+
+    def sources(self) -> List[str]:
+        """Ligas con historial (las de los scrapers y las cargadas por el backfill)"""
+        with self._lock:
+            self._ensure_loaded()
+            return sorted(self._leagues)
+
+    def table_at(self, source: str, at: Optional[str] = None) -> Optional[Dict]:
+        """Tabla de `source` vigente en la fecha `at` (por defecto, ahora)"""
+        moment = query_time(at, end_of_day=True) if at else datetime.now().timestamp()
+        league = self.get(source)
+        if league is None:
+            return None
+        with self._lock:
+            result = league.table_at(moment)
+        if result is None:
+            return None
+        since, rows = result
+        table = {"source": source, "at": at, "snapshot_at": _isoformat(since), "standings": rows}
+        if league.metadata:
+            table["meta"] = dict(league.metadata)
+        return table
+
+    def trajectory(self, source: str, team: str, start: Optional[str] = None,
+                   end: Optional[str] = None) -> Optional[Dict]:
+        """Evolución de `team` en `source`, opcionalmente entre las fechas `start` y `end`"""
+        start_time = query_time(start) if start else None
+        end_time = query_time(end, end_of_day=True) if end else None
+        league = self.get(source)
+        if league is None:
+            return None
+        with self._lock:
+            points = league.trajectory(team, start_time, end_time)
+            if points is None:
+                return None
+            name = league.team_names[league.team_ids[standings_key({'equipo': team})]]
+        trajectory = {"source": source, "equipo": name, "points": points}
+        if league.metadata:
+            trajectory["meta"] = dict(league.metadata)
+        return trajectory
+
+
+standings_history = HistoryStore()
@@ -0,0 +1,267 @@
+"""Cola de trabajos para los refrescos manuales de los datos.
+
+Los pedidos de refresco (`POST /api/refresh/{kind}/{source}`) no esperan al
+scraping: se encolan y responden enseguida con el id del trabajo, que se
+consulta en `/api/refresh/jobs/{id}`. Reglas:
+
+- Un pedido igual a un trabajo pendiente o en curso se suma a ese trabajo en
+  lugar de crear otro, y uno que terminó hace menos de `REUSE_SECONDS`
+  devuelve ese mismo resultado.
+- Los trabajos que sólo descargan HTML los corren `MAX_WORKERS` workers, y
+  los que abren Chrome van por una fila aparte con `MAX_BROWSER_JOBS`
+  workers: un refresco con Chrome esperando turno no frena a los de HTTP, y
+  nunca hay más de `MAX_BROWSER_JOBS` Chrome abiertos por la cola. Todo lo
+  que abre Chrome pasa por acá (también los GET sin datos en caché y el
+  refresco completo del cron).
+- Cada trabajo consume crédito de un balde de tokens según su costo
+  (`BROWSER_COST` si abre Chrome, `FETCH_COST` si sólo descarga HTML); sin
+  crédito el pedido se rechaza con el tiempo de espera sugerido. Los
+  refrescos del scheduler (`scheduled=True`) usan un balde propio, así no
+  le gastan el crédito a los pedidos de los usuarios.
+"""
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .metrics import Counter, GaugeCallback
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = 2
+MAX_BROWSER_JOBS = 1
+# Un refresco con Selenium (Chrome) cuesta mucho más que una descarga HTTP
+BROWSER_COST = 5.0
+FETCH_COST = 1.0
+# Balde de tokens: crédito máximo y crédito recuperado por segundo
+RATE_CAPACITY = 12.0
+RATE_REFILL_PER_SECOND = 0.2
+# Balde de los refrescos programados: una vuelta completa de todas las ligas
+# (3 con Chrome y 5 por HTTP) cada 20 minutos
+SCHEDULED_RATE_CAPACITY = 20.0
+SCHEDULED_RATE_REFILL_PER_SECOND = SCHEDULED_RATE_CAPACITY / 1200
+# Un trabajo terminado hace menos de esto se reutiliza en vez de repetirse
+REUSE_SECONDS = 30.0
+# Trabajos terminados que se conservan para consultar su estado
+MAX_FINISHED_JOBS = 100
+
+JOBS_SUBMITTED = Counter(
+    'padua_refresh_jobs_total',
+    'Pedidos de refresco por resultado (encolado, unido a uno existente, reutilizado o rechazado)',
+    ['source', 'kind', 'outcome'])
+
+
+class RateLimited(Exception):
+    """No hay crédito para el trabajo; `retry_after` son los segundos sugeridos de espera"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Demasiados refrescos, reintentar en {retry_after:.0f} s")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, capacity: float = RATE_CAPACITY, refill_per_second: float = RATE_REFILL_PER_SECOND):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def take(self, cost: float):
+        """Consume `cost` tokens o lanza RateLimited"""
+        self._refill()
+        if self.tokens < cost:
+            raise RateLimited((cost - self.tokens) / self.refill_per_second)
+        self.tokens -= cost
+
+
+class RefreshJob:
+    def __init__(self, job_id: str, source: str, kind: str, browser: bool):
+        self.id = job_id
+        self.source = source
+        self.kind = kind
+        self.browser = browser
+        self.status = 'pendiente'
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.finished_monotonic: Optional[float] = None
+        self.error: Optional[str] = None
+        self.result: Optional[Dict] = None
+        self.requests = 1
+        self.done = asyncio.Event()
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.source, self.kind
+
+    def to_dict(self) -> Dict:
+        rows = self.result.get(self.kind) if self.result else None
+        return {
+            "id": self.id,
+            "source": self.source,
+            "kind": self.kind,
+            "status": self.status,
+            "requests": self.requests,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+            "rows": len(rows) if rows is not None else None,
+            "last_update": self.result.get("last_update") if self.result else None,
+        }
+
+
+Runner = Callable[[str, str], Awaitable[Dict]]
+
+
+class RefreshQueue:
+    def __init__(self, runner: Runner, uses_browser: Callable[[str, str], bool],
+                 max_workers: int = MAX_WORKERS, max_browser_jobs: int = MAX_BROWSER_JOBS,
+                 bucket: Optional[TokenBucket] = None, scheduled_bucket: Optional[TokenBucket] = None):
+        self._runner = runner
+        self._uses_browser = uses_browser
+        self._max_workers = max_workers
+        self._max_browser_jobs = max_browser_jobs
+        self._bucket = bucket or TokenBucket()
+        self._scheduled_bucket = scheduled_bucket or TokenBucket(
+            SCHEDULED_RATE_CAPACITY, SCHEDULED_RATE_REFILL_PER_SECOND)
+        self._ids = itertools.count(1)
+        self._jobs: 'OrderedDict[str, RefreshJob]' = OrderedDict()
+        # (source, kind) -> último trabajo, activo o terminado
+        self._latest: Dict[Tuple[str, str], RefreshJob] = {}
+        self._lock = threading.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._browser_queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def _ensure_workers(self):
+        # Las filas y los workers se crean en el event loop de la primera petición
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._browser_queue = asyncio.Queue()
+            self._workers = ([asyncio.create_task(self._worker(self._queue)) for _ in range(self._max_workers)]
+                             + [asyncio.create_task(self._worker(self._browser_queue))
+                                for _ in range(self._max_browser_jobs)])
+
+    def submit(self, source: str, kind: str, scheduled: bool = False) -> Tuple[RefreshJob, str]:
+        """Encola un refresco de `source`/`kind`.
+
+        Retorna el trabajo y cómo se resolvió el pedido: 'encolado', 'unido'
+        (a uno pendiente o en curso) o 'reutilizado' (uno terminado recién).
+        Lanza RateLimited si no hay crédito; con `scheduled` se descuenta del
+        balde de los refrescos programados.
+        """
+        self._ensure_workers()
+        key = (source, kind)
+        with self._lock:
+            job = self._latest.get(key)
+            if job is not None:
+                if not job.done.is_set():
+                    job.requests += 1
+                    outcome = 'unido'
+                elif job.error is None and time.monotonic() - job.finished_monotonic < REUSE_SECONDS:
+                    job.requests += 1
+                    outcome = 'reutilizado'
+                else:
+                    job = None
+            if job is None:
+                browser = self._uses_browser(source, kind)
+                try:
+                    bucket = self._scheduled_bucket if scheduled else self._bucket
+                    bucket.take(BROWSER_COST if browser else FETCH_COST)
+                except RateLimited:
+                    JOBS_SUBMITTED.inc(source=source, kind=kind, outcome='rechazado')
+                    raise
+                job = RefreshJob(str(next(self._ids)), source, kind, browser)
+                self._jobs[job.id] = job
+                self._latest[key] = job
+                self._prune()
+                (self._browser_queue if browser else self._queue).put_nowait(job)
+                outcome = 'encolado'
+        JOBS_SUBMITTED.inc(source=source, kind=kind, outcome=outcome)
+        return job, outcome
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done.is_set()]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    async def refresh_and_wait(self, source: str, kind: str, scheduled: bool = False) -> Dict:
+        """Encola un refresco (o se une al que ya hay) y espera su resultado.
+
+        Lanza RateLimited si no hay crédito.
+        """
+        job, _ = self.submit(source, kind, scheduled=scheduled)
+        await job.done.wait()
+        if job.result is None:
+            return {"error": job.error, "last_update": None, kind: None}
+        return job.result
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            job = await queue.get()
+            try:
+                await self._run(job)
+            finally:
+                queue.task_done()
+
+    async def _run(self, job: RefreshJob):
+        job.status = 'en_curso'
+        job.started_at = datetime.now()
+        try:
+            job.result = await self._runner(job.source, job.kind)
+            job.error = job.result.get("error")
+        except asyncio.CancelledError:
+            job.error = "Refresco cancelado"
+            raise
+        except Exception as e:
+            logger.error("Error en el refresco %s (%s/%s): %s", job.id, job.source, job.kind, e)
+            job.error = str(e)
+        finally:
+            # Siempre se avisa a quienes esperan, también si se cancela al apagar
+            self._finish(job)
+        logger.info("Refresco %s (%s/%s) %s en %.1f s", job.id, job.source, job.kind, job.status,
+                    (job.finished_at - job.started_at).total_seconds())
+
+    def _finish(self, job: RefreshJob):
+        job.status = 'error' if job.error else 'completado'
+        job.finished_at = datetime.now()
+        job.finished_monotonic = time.monotonic()
+        job.done.set()
+
+    def get(self, job_id: str) -> Optional[RefreshJob]:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> List[RefreshJob]:
+        """Trabajos conocidos, los más nuevos primero"""
+        return list(reversed(self._jobs.values()))
+
+    def active_counts(self) -> List[Tuple[Dict[str, str], float]]:
+        counts = {'pendiente': 0, 'en_curso': 0}
+        for job in list(self._jobs.values()):
+            if job.status in counts:
+                counts[job.status] += 1
+        return [({'status': status}, count) for status, count in counts.items()]
+
+    async def aclose(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        # Los que quedaron en la fila no van a correr: liberar a quienes los esperan
+        for job in list(self._jobs.values()):
+            if not job.done.is_set():
+                job.error = "Refresco cancelado"
+                job.started_at = job.started_at or datetime.now()
+                self._finish(job)
+        self._workers = []
+        self._queue = None
+        self._browser_queue = None
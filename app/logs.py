@@ -0,0 +1,174 @@
+"""Configuración de logging: cola sin bloqueo, JSON y muestreo por scraping.
+
+`setup_logging()` deja un único handler en el logger raíz, un `QueueHandler`
+que arma el texto del mensaje y encola el registro: darle formato (JSON,
+traceback) y escribirlo en stderr lo hace un thread aparte (`QueueListener`),
+así que quien loguea (un handler de la API, un scraper) no espera la
+escritura. Si la cola se
+llena (`LOG_QUEUE_SIZE`) los registros se descartan y se cuentan en
+`padua_log_records_dropped_total` en lugar de frenar a quien loguea.
+
+Formato con `LOG_FORMAT`: `json` (una línea JSON por registro, por defecto
+fuera de desarrollo) o `text`. El nivel con `LOG_LEVEL` (INFO por defecto).
+
+Dentro de un scraping (una traza de `tracing`), los mensajes INFO y DEBUG
+que se repiten con el mismo texto de formato (p.ej. "Probando iframe %d/%d:
+%s") se muestrean: pasan los primeros `LOG_SAMPLE_FIRST` y el resto se cuenta
+y se resume en un único registro al terminar el scraping. Para que esto
+funcione los mensajes usan formato diferido (`logger.info("... %s", valor)`).
+Los registros de un scraping llevan `trace_id` y `source`.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from . import tracing
+from .metrics import Counter
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.environ.get(
+    'LOG_FORMAT', 'text' if os.environ.get('ENVIRONMENT') == 'development' else 'json').strip().lower()
+QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+# Repeticiones de un mismo mensaje INFO/DEBUG que se escriben por scraping
+SAMPLE_FIRST = int(os.environ.get('LOG_SAMPLE_FIRST', '3'))
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+LOG_RECORDS_DROPPED = Counter(
+    'padua_log_records_dropped_total',
+    'Registros de log descartados porque la cola de logging estaba llena',
+    [])
+LOG_RECORDS_SAMPLED = Counter(
+    'padua_log_records_sampled_total',
+    'Registros de log repetidos dentro de un scraping que no se escribieron (quedan en el resumen)',
+    ['logger'])
+
+# Atributos estándar de LogRecord; el resto son `extra` y van al JSON
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Encola el registro sin bloquear si la cola está llena"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # El mensaje se arma acá: quien loguea puede modificar los argumentos
+        # antes de que el listener escriba el registro. El traceback se sigue
+        # armando en el listener (archivo y línea de cada frame no cambian)
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+class ScrapeSampler(logging.Filter):
+    """Muestrea los mensajes repetidos de cada scraping y agrega `trace_id`/`source`"""
+
+    def __init__(self, first: int = SAMPLE_FIRST):
+        super().__init__()
+        self.first = first
+        # id de traza -> (logger, nivel, formato) -> veces que apareció
+        self._counts: Dict[str, Dict[Tuple[str, int, str], int]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        current = tracing.current_trace()
+        if current is None:
+            return True
+        record.trace_id = current.id
+        source = current.root.attributes.get('source')
+        if source is not None:
+            record.source = source
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.levelno, str(record.msg))
+        with self._lock:
+            counts = self._counts.setdefault(current.id, {})
+            counts[key] = seen = counts.get(key, 0) + 1
+            sampled = seen > self.first
+        if sampled:
+            LOG_RECORDS_SAMPLED.inc(logger=record.name)
+        return not sampled
+
+    def flush_trace(self, finished):
+        """Al terminar un scraping, resume los mensajes que no se escribieron"""
+        with self._lock:
+            counts = self._counts.pop(finished.id, None)
+        if not counts:
+            return
+        for (name, level, template), count in counts.items():
+            skipped = count - self.first
+            if skipped <= 0:
+                continue
+            logging.getLogger(name).log(
+                level, "%s (repetido %d veces más en este scraping, se omitieron)", template, skipped,
+                extra={"trace_id": finished.id, "source": finished.root.attributes.get('source'),
+                       "sampled": skipped})
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+def setup_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT):
+    """Configura el logger raíz con la cola y arranca el thread que escribe. Idempotente"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+        output = logging.StreamHandler()
+        output.setFormatter(JsonFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT))
+        log_queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+        handler = NonBlockingQueueHandler(log_queue)
+        sampler = ScrapeSampler()
+        handler.addFilter(sampler)
+        tracing.on_trace_finished(sampler.flush_trace)
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(level)
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Escribe lo que quede en la cola y detiene el thread del listener"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
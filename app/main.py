@@ -1,18 +1,209 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from apscheduler.schedulers.background import BackgroundScheduler
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.staticfiles import StaticFiles
 from .scraper.basketball_scraper import BasketballScraper
 from .scraper.voley_scraper import VoleyScraper
+from .scraper.async_engine import get_engine
+from .scraper.resilience import breaker_states
+from .scraper.supervisor import browser_supervisor
+from .scraper.snapshots import page_snapshots, plan_refresh
+from .scraper.extraction import extraction_pool
+from . import metrics, tracing
+from .jobs import RateLimited, RefreshQueue
+from .cadence import AdaptiveScheduler, refresh_cadence
+from .export import static_export
+from .broadcaster import broadcaster
+from .diffing import get_history
+from .history import standings_history
+from .fixture_calendar import fixture_calendar, parse_range_bound
+from .query import ListQuery, QueryError, apply_query, parse_list_query
+from .logs import setup_logging
+import asyncio
+import functools
 import logging
+import os
+import time
+from typing import Optional
 
-# Configurar el logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configurar el logging: cola con un thread que escribe, JSON y muestreo por scraping (ver app/logs.py)
+setup_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# Instanciar el scraper
+basketball_scraper = BasketballScraper()
+
+# Instanciar scrapers de voley para cada tira
+voley_tira_a_scraper = VoleyScraper("https://metrovoley.com.ar/tournament/75/standings?group=482", name="voley/tira-a")
+voley_tira_b_scraper = VoleyScraper("https://metrovoley.com.ar/tournament/129/standings?group=497", name="voley/tira-b")
+voley_primera_scraper = VoleyScraper("https://metrovoley.com.ar/tournament/188/standings", name="voley/primera")
+
+voley_scrapers = [voley_tira_a_scraper, voley_tira_b_scraper, voley_primera_scraper]
+
+# Scrapers por nombre de fuente ('basquet', 'voley/tira-a', ...)
+scrapers_by_source = {scraper.name: scraper for scraper in [basketball_scraper] + voley_scrapers}
+
+async def refresh_all_leagues(timeout: float = 120):
+    """Refresca posiciones y fixtures de todas las ligas en paralelo.
+
+    Es el trabajo del scheduler por defecto (`REFRESH_SCHEDULE=cron`). Primero descarga
+    una sola vez cada página de la que parte alguna extracción
+    (`plan_refresh`) y después corre los extractores, que toman esas páginas
+    de `page_snapshots` en lugar de volver a pedirlas; las páginas
+    descargadas antes del refresco no se reutilizan. Las descargas comparten
+    el pool de conexiones del motor async y las extracciones con Chrome
+    pasan por la cola de refrescos (con el balde de los refrescos
+    programados), así nunca hay más Chrome abiertos que los que permite la
+    cola. Lo que no
+    termine dentro de `timeout` se cancela y las ligas que fallen no afectan
+    a las demás.
+    """
+    engine = get_engine()
+    with page_snapshots.fresh_only():
+        plan = plan_refresh((scraper.name, kind, url)
+                            for scraper in scrapers_by_source.values()
+                            for kind, url in scraper.entry_urls().items())
+        logger.info("Refresco completo: %s extracciones por HTTP desde %s páginas",
+                    sum(len(e) for e in plan.values()), len(plan))
+        await engine.gather(*(scrapers_by_source[extractions[0][0]]._afetch(engine, url)
+                              for url, extractions in plan.items()), timeout=timeout)
+
+        async def extract(scraper, kind: str) -> dict:
+            if kind not in scraper.browser_kinds:
+                return await getattr(scraper, f"aget_{kind}")()
+            try:
+                return await refresh_queue.refresh_and_wait(scraper.name, kind, scheduled=True)
+            except RateLimited as e:
+                return {"error": str(e), "last_update": None, kind: None}
+
+        results = await engine.gather(*(extract(scraper, kind)
+                                        for scraper in scrapers_by_source.values()
+                                        for kind in ('standings', 'fixtures')), timeout=timeout)
+    failed = sum(1 for r in results if isinstance(r, BaseException) or r.get('error'))
+    logger.info("Refresco completo: %s/%s fuentes actualizadas", len(results) - failed, len(results))
+    return results
+
+async def run_refresh(source: str, kind: str) -> dict:
+    """Scraping de un trabajo de la cola de refrescos.
+
+    Es un refresco explícito: no reutiliza páginas que `page_snapshots`
+    descargó antes de empezar, para no responder con datos viejos.
+    """
+    scraper = scrapers_by_source[source]
+    with page_snapshots.fresh_only():
+        return await getattr(scraper, f"aget_{kind}")()
+
+def refresh_uses_browser(source: str, kind: str) -> bool:
+    return kind in scrapers_by_source[source].browser_kinds
+
+refresh_queue = RefreshQueue(run_refresh, refresh_uses_browser)
+
+metrics.GaugeCallback(
+    'padua_refresh_jobs_active',
+    'Trabajos de refresco pendientes y en curso',
+    ['status'],
+    refresh_queue.active_counts)
+
+def submit_refresh(source: str, kind: str):
+    """Encola un refresco; responde 429 si se superó el límite de refrescos"""
+    try:
+        return refresh_queue.submit(source, kind)
+    except RateLimited as e:
+        raise HTTPException(status_code=429, detail=str(e),
+                            headers={"Retry-After": str(max(1, round(e.retry_after)))})
+
+async def refresh_and_wait(source: str, kind: str) -> dict:
+    """Refresco pasando por la cola: los pedidos simultáneos comparten un mismo scraping"""
+    try:
+        return await refresh_queue.refresh_and_wait(source, kind)
+    except RateLimited as e:
+        raise HTTPException(status_code=429, detail=str(e),
+                            headers={"Retry-After": str(max(1, round(e.retry_after)))})
+
+async def cached_or_refresh(scraper, kind: str) -> dict:
+    """Datos en caché o, si todavía no hay, un refresco pasando por la cola.
+
+    Así los primeros GET después de arrancar no abren Chrome por su cuenta:
+    comparten el trabajo de la cola y respetan su límite de Chrome y de crédito.
+    """
+    snapshot = scraper.cache.get(kind)
+    if snapshot.rows:
+        metrics.record_cache_read(scraper.name, kind, True, snapshot.last_update)
+        return snapshot.response()
+    metrics.record_cache_read(scraper.name, kind, False, None)
+    return await refresh_and_wait(scraper.name, kind)
+
+# Cómo se programan los refrescos: 'cron' (lunes y miércoles, por defecto) o 'adaptive'
+# (según cuándo cambian los datos; refresca mucho más seguido, hay que pedirlo)
+REFRESH_SCHEDULE = os.environ.get('REFRESH_SCHEDULE', 'cron').strip().lower()
+
+# Refresca cada liga y tipo de dato según cuándo suele cambiar, pasando por la cola de
+# refrescos con su propio balde de tokens (no consume el crédito de los usuarios)
+adaptive_scheduler = AdaptiveScheduler(
+    [(source, kind) for source in scrapers_by_source for kind in ('standings', 'fixtures')],
+    functools.partial(refresh_queue.submit, scheduled=True))
+
+metrics.GaugeCallback(
+    'padua_next_refresh_seconds',
+    'Segundos hasta el próximo refresco programado por el scheduler adaptativo',
+    ['source', 'kind'],
+    adaptive_scheduler.next_check_samples)
+
+def create_scheduler():
+    """Crea el scheduler de actualizaciones (APScheduler se importa recién acá).
+
+    Se crea dentro del event loop de la app: el refresco corre en ese loop y
+    comparte el motor async con las peticiones.
+    """
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+    # Configurar el scheduler para actualizar todas las ligas los lunes y miércoles a las 9:00 AM
+    scheduler = AsyncIOScheduler()
+    scheduler.add_job(
+        refresh_all_leagues, 
+        'cron', 
+        day_of_week='mon,wed', 
+        hour=9, 
+        minute=0,
+        misfire_grace_time=3600,  # Permitir hasta 1 hora de retraso si el servidor estaba apagado
+        id='leagues_update_job'
+    )
+    return scheduler
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Inicia el scheduler al arrancar la aplicación y lo detiene al apagarla"""
+    scheduler = None
+    broadcaster.bind_loop(asyncio.get_running_loop())
+    static_export.ensure_dir()
+    # Con EXTRACTION_PROCESSES > 0 levanta el pool de extracción antes de atender peticiones
+    await asyncio.to_thread(extraction_pool.start)
+    # Solo iniciar el scheduler en producción, no durante el desarrollo/pruebas
+    if os.environ.get('ENVIRONMENT') != 'development':
+        if REFRESH_SCHEDULE == 'adaptive':
+            adaptive_scheduler.start()
+            logger.info("Scheduler adaptativo iniciado: cada liga se refresca según cuándo cambian sus datos")
+        else:
+            scheduler = create_scheduler()
+            scheduler.start()
+            logger.info("Scheduler iniciado: Actualizaciones programadas para lunes y miércoles a las 9:00 AM")
+    else:
+        logger.info("Entorno de desarrollo detectado: Scheduler no iniciado")
+
+    yield
+
+    # Limpiar el scheduler cuando se apaga la aplicación
+    if scheduler is not None and scheduler.running:
+        scheduler.shutdown()
+        logger.info("Scheduler detenido correctamente")
+    await adaptive_scheduler.aclose()
+    await refresh_queue.aclose()
+    await asyncio.to_thread(refresh_cadence.flush)
+    await get_engine().aclose()
+    await asyncio.to_thread(extraction_pool.shutdown)
+
+app = FastAPI(lifespan=lifespan)
 
 # Configurar CORS de manera más específica
 # Definir orígenes permitidos
@@ -42,120 +233,317 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Instanciar el scraper
-basketball_scraper = BasketballScraper()
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Registra la latencia de cada petición agrupada por la ruta que la atendió"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Usar el path de la ruta (no la URL) para no crear una serie por cada URL distinta
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=route.path if route is not None else "sin_ruta",
+            status=str(status),
+        )
 
-# Instanciar scrapers de voley para cada tira
-voley_tira_a_scraper = VoleyScraper("https://metrovoley.com.ar/tournament/75/standings?group=482")
-voley_tira_b_scraper = VoleyScraper("https://metrovoley.com.ar/tournament/129/standings?group=497")
-voley_primera_scraper = VoleyScraper("https://metrovoley.com.ar/tournament/188/standings")
-
-# Función que ejecutará el scraper y registrará cuándo se realizó la actualización
-def update_basketball_data():
-    logger.info("Ejecutando actualización programada del scraper de baloncesto")
-    result = basketball_scraper.get_standings()
-    logger.info(f"Actualización completada. Resultado: {result['error'] if 'error' in result and result['error'] else 'Exitosa'}")
-    return result
-
-# Configurar el scheduler para actualizar los datos los lunes y miércoles a las 9:00 AM
-scheduler = BackgroundScheduler()
-scheduler.add_job(
-    update_basketball_data, 
-    'cron', 
-    day_of_week='mon,wed', 
-    hour=9, 
-    minute=0,
-    misfire_grace_time=3600,  # Permitir hasta 1 hora de retraso si el servidor estaba apagado
-    id='basketball_update_job'
-)
+def list_query(equipo: Optional[str] = None, casa: bool = False, limit: Optional[int] = None,
+               offset: int = 0, fields: Optional[str] = None, sort: Optional[str] = None) -> Optional[ListQuery]:
+    """Dependencia de los endpoints de listas: parámetros de consulta (400 si son inválidos)"""
+    try:
+        return parse_list_query(equipo, casa, limit, offset, fields, sort)
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-# Solo iniciar el scheduler en producción, no durante el desarrollo/pruebas
-import os
-if os.environ.get('ENVIRONMENT') != 'development':
-    scheduler.start()
-    logger.info("Scheduler iniciado: Actualizaciones programadas para lunes y miércoles a las 9:00 AM")
-else:
-    logger.info("Entorno de desarrollo detectado: Scheduler no iniciado")
+def versioned(scraper, kind: str, result: dict, since: Optional[int],
+              query: Optional[ListQuery] = None) -> dict:
+    """Agrega la versión de los datos a la respuesta.
+
+    Con `since` devuelve sólo los cambios; con parámetros de consulta (`equipo`,
+    `casa`, `sort`, `fields`, `limit`, `offset`) filtra, ordena y pagina las filas.
+    """
+    history = get_history(scraper.name, kind)
+    if since is None:
+        if query is not None:
+            try:
+                result = apply_query(scraper.name, kind, result, query)
+            except QueryError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        return dict(result, version=history.version)
+    if history.version == 0:
+        # Todavía no hay versiones registradas (p.ej. datos de muestra): respuesta completa
+        return dict(result, version=0, since=since, full=True)
+    return dict(history.delta_since(since), error=result.get("error"))
 
 @app.get("/")
 async def root():
     return {"message": "API de CASA de Padua"}
 
 @app.get("/api/standings/basquet")
-async def get_basketball_standings():
+async def get_basketball_standings(since: Optional[int] = None, query: Optional[ListQuery] = Depends(list_query)):
     """
     Obtiene la tabla de posiciones de básquet.
     Retorna los datos en caché si están disponibles, o realiza un nuevo scraping si es necesario.
     """
-    return basketball_scraper.get_cached_standings()
+    result = await cached_or_refresh(basketball_scraper, "standings")
+    return versioned(basketball_scraper, "standings", result, since, query)
 
 @app.get("/api/standings/basquet/update")
 async def update_basketball_standings():
     """
-    Fuerza una actualización de los datos de la tabla de posiciones de básquet
+    Fuerza una actualización de los datos de la tabla de posiciones de básquet.
+    Pasa por la cola de refrescos y espera el resultado; para no esperar usar
+    `POST /api/refresh/standings/basquet`.
     """
-    return update_basketball_data()
+    return await refresh_and_wait(basketball_scraper.name, "standings")
 
 @app.get("/api/standings/voley/tira-a")
-async def get_voley_tira_a_standings():
+async def get_voley_tira_a_standings(since: Optional[int] = None, query: Optional[ListQuery] = Depends(list_query)):
     """
     Obtiene la tabla de posiciones de voley Tira A.
     """
-    return voley_tira_a_scraper.get_cached_standings()
+    result = await cached_or_refresh(voley_tira_a_scraper, "standings")
+    return versioned(voley_tira_a_scraper, "standings", result, since, query)
 
 @app.get("/api/standings/voley/tira-b")
-async def get_voley_tira_b_standings():
+async def get_voley_tira_b_standings(since: Optional[int] = None, query: Optional[ListQuery] = Depends(list_query)):
     """
     Obtiene la tabla de posiciones de voley Tira B.
     """
-    return voley_tira_b_scraper.get_cached_standings()
+    result = await cached_or_refresh(voley_tira_b_scraper, "standings")
+    return versioned(voley_tira_b_scraper, "standings", result, since, query)
 
 @app.get("/api/standings/voley/primera")
-async def get_voley_primera_standings():
+async def get_voley_primera_standings(since: Optional[int] = None, query: Optional[ListQuery] = Depends(list_query)):
     """
     Obtiene la tabla de posiciones de voley Primera División.
     """
-    return voley_primera_scraper.get_cached_standings()
+    result = await cached_or_refresh(voley_primera_scraper, "standings")
+    return versioned(voley_primera_scraper, "standings", result, since, query)
 
 # Nuevos endpoints para obtener fixtures
 @app.get("/api/fixtures/basquet")
-async def get_basketball_fixtures():
+async def get_basketball_fixtures(since: Optional[int] = None, query: Optional[ListQuery] = Depends(list_query)):
     """
     Obtiene los próximos partidos del fixture de básquet.
     """
-    return basketball_scraper.get_cached_fixtures()
+    result = basketball_scraper.get_cached_fixtures()
+    return versioned(basketball_scraper, "fixtures", result, since, query)
 
 @app.get("/api/fixtures/basquet/update")
 async def update_basketball_fixtures():
     """
-    Fuerza una actualización de los datos del fixture de básquet
+    Fuerza una actualización de los datos del fixture de básquet.
+    Pasa por la cola de refrescos y espera el resultado; para no esperar usar
+    `POST /api/refresh/fixtures/basquet`.
     """
-    return basketball_scraper.get_fixtures()
+    return await refresh_and_wait(basketball_scraper.name, "fixtures")
 
 @app.get("/api/fixtures/voley/tira-a")
-async def get_voley_tira_a_fixtures():
+async def get_voley_tira_a_fixtures(since: Optional[int] = None, query: Optional[ListQuery] = Depends(list_query)):
     """
     Obtiene los próximos partidos del fixture de voley Tira A.
     """
-    return voley_tira_a_scraper.get_cached_fixtures()
+    result = await cached_or_refresh(voley_tira_a_scraper, "fixtures")
+    return versioned(voley_tira_a_scraper, "fixtures", result, since, query)
 
 @app.get("/api/fixtures/voley/tira-b")
-async def get_voley_tira_b_fixtures():
+async def get_voley_tira_b_fixtures(since: Optional[int] = None, query: Optional[ListQuery] = Depends(list_query)):
     """
     Obtiene los próximos partidos del fixture de voley Tira B.
     """
-    return voley_tira_b_scraper.get_cached_fixtures()
+    result = await cached_or_refresh(voley_tira_b_scraper, "fixtures")
+    return versioned(voley_tira_b_scraper, "fixtures", result, since, query)
 
 @app.get("/api/fixtures/voley/primera")
-async def get_voley_primera_fixtures():
+async def get_voley_primera_fixtures(since: Optional[int] = None, query: Optional[ListQuery] = Depends(list_query)):
     """
     Obtiene los próximos partidos del fixture de voley Primera División.
     """
-    return voley_primera_scraper.get_cached_fixtures()
+    result = await cached_or_refresh(voley_primera_scraper, "fixtures")
+    return versioned(voley_primera_scraper, "fixtures", result, since, query)
 
-# Event handler para limpiar el scheduler cuando se apaga la aplicación
-@app.on_event("shutdown")
-def shutdown_event():
-    if scheduler.running:
-        scheduler.shutdown()
-        logger.info("Scheduler detenido correctamente")
\ No newline at end of file
+@app.get("/api/stream/{kind}/{source:path}")
+async def stream_updates(kind: str, source: str, request: Request):
+    """
+    Stream de Server-Sent Events con las actualizaciones de una liga, p.ej.
+    `/api/stream/standings/voley/tira-a` o `/api/stream/fixtures/basquet`.
+    Envía el último estado al conectarse y después un evento sólo cuando un
+    refresco cambia los datos.
+    """
+    if kind not in ("standings", "fixtures") or source not in scrapers_by_source:
+        raise HTTPException(status_code=404, detail="Stream no encontrado")
+    events = broadcaster.stream(f"{source}/{kind}", request.headers.get("last-event-id"))
+    return StreamingResponse(events, media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # que nginx no acumule los eventos
+    })
+
+@app.get("/api/refresh/jobs")
+async def list_refresh_jobs():
+    """
+    Trabajos de refresco recientes (más nuevos primero).
+    """
+    return {"jobs": [job.to_dict() for job in refresh_queue.jobs()]}
+
+@app.get("/api/refresh/jobs/{job_id}")
+async def get_refresh_job(job_id: str):
+    """
+    Estado de un trabajo de refresco: pendiente, en_curso, completado o error.
+    """
+    job = refresh_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return job.to_dict()
+
+@app.post("/api/refresh/{kind}/{source:path}", status_code=202)
+async def request_refresh(kind: str, source: str):
+    """
+    Pide un refresco de una liga sin esperar al scraping, p.ej.
+    `POST /api/refresh/standings/voley/tira-a`. Responde enseguida con el
+    trabajo (uno nuevo o el que ya estaba en curso para la misma liga);
+    el estado se consulta en `/api/refresh/jobs/{id}`.
+    """
+    if kind not in ("standings", "fixtures") or source not in scrapers_by_source:
+        raise HTTPException(status_code=404, detail="Liga no encontrada")
+    job, outcome = submit_refresh(source, kind)
+    return JSONResponse(status_code=202, content=dict(job.to_dict(), outcome=outcome),
+                        headers={"Location": f"/api/refresh/jobs/{job.id}"})
+
+def _check_history_source(source: str):
+    # Además de las ligas de los scrapers, las temporadas y torneos cargados con el backfill
+    if source not in scrapers_by_source and source not in standings_history.sources():
+        raise HTTPException(status_code=404, detail="Liga no encontrada")
+
+@app.get("/api/history/{source:path}/table")
+async def get_standings_as_of(source: str, at: Optional[str] = None):
+    """
+    Tabla de posiciones vigente en una fecha, p.ej.
+    `/api/history/voley/tira-a/table?at=2025-05-01`. Sin `at`, la última registrada.
+    """
+    _check_history_source(source)
+    try:
+        table = standings_history.table_at(source, at)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Fecha inválida, usar el formato AAAA-MM-DD")
+    if table is None:
+        raise HTTPException(status_code=404, detail="No hay tablas registradas para esa fecha")
+    return table
+
+@app.get("/api/history/{source:path}/trajectory")
+async def get_team_trajectory(source: str, equipo: str, start: Optional[str] = None, end: Optional[str] = None):
+    """
+    Evolución de posición y puntos de un equipo en la temporada, p.ej.
+    `/api/history/basquet/trajectory?equipo=CASA DE PADUA&start=2025-03-01`.
+    """
+    _check_history_source(source)
+    try:
+        trajectory = standings_history.trajectory(source, equipo, start, end)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Fecha inválida, usar el formato AAAA-MM-DD")
+    if trajectory is None:
+        raise HTTPException(status_code=404, detail="Equipo sin historial en esa liga")
+    return trajectory
+
+def _check_source(source: Optional[str]):
+    if source is not None and source not in scrapers_by_source:
+        raise HTTPException(status_code=404, detail="Liga no encontrada")
+
+@app.get("/api/calendar/upcoming")
+async def get_upcoming_matches(limit: int = 10, source: Optional[str] = None, casa: bool = False):
+    """
+    Próximos partidos de todas las ligas ordenados por fecha y hora, p.ej.
+    `/api/calendar/upcoming?casa=true&limit=5` para los próximos 5 de CASA de Padua.
+    Se puede limitar a una liga con `source` (`basquet`, `voley/tira-a`, ...).
+    """
+    _check_source(source)
+    return {"matches": fixture_calendar.upcoming(limit=limit, source=source, casa=casa)}
+
+@app.get("/api/calendar/weekend")
+async def get_weekend_matches(source: Optional[str] = None, casa: bool = False):
+    """
+    Partidos del fin de semana (viernes a domingo) en curso o el próximo, de todas las ligas.
+    """
+    _check_source(source)
+    start, end, matches = fixture_calendar.weekend(source=source, casa=casa)
+    return {"start": start.isoformat(), "end": end.isoformat(), "matches": matches}
+
+@app.get("/api/calendar")
+async def get_matches_between(start: str, end: Optional[str] = None, source: Optional[str] = None,
+                              casa: bool = False):
+    """
+    Partidos entre dos fechas, p.ej. `/api/calendar?start=2025-05-01&end=2025-05-31`.
+    Sin `end`, sólo los del día `start`.
+    """
+    _check_source(source)
+    try:
+        range_start = parse_range_bound(start)
+        range_end = parse_range_bound(end or start, end_of_day=True)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Fecha inválida, usar el formato AAAA-MM-DD")
+    matches = fixture_calendar.between(range_start, range_end, source=source, casa=casa)
+    return {"start": range_start.isoformat(), "end": range_end.isoformat(), "matches": matches}
+
+@app.get("/api/status/upstreams")
+async def get_upstream_status():
+    """
+    Estado del circuit breaker de cada sitio de origen (cerrado, abierto o half-open)
+    junto con los contadores de fallas, reintentos y peticiones evitadas.
+    """
+    return {"upstreams": breaker_states()}
+
+@app.get("/api/status/browsers")
+async def get_browser_status():
+    """
+    Navegadores Chrome abiertos por los scrapers, su memoria y el tiempo que
+    llevan abiertos, junto con los límites que aplica el supervisor.
+    """
+    return browser_supervisor.status()
+
+@app.get("/api/status/refresh-schedule")
+async def get_refresh_schedule():
+    """
+    Refrescos programados por el scheduler adaptativo: por liga y tipo de
+    dato, cuántos chequeos y cambios se vieron, el próximo refresco y las
+    franjas horarias en las que más cambian los datos.
+    """
+    return {
+        "mode": REFRESH_SCHEDULE,
+        "running": adaptive_scheduler.running,
+        "targets": await asyncio.to_thread(adaptive_scheduler.status),
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Métricas de scraping, caché, sitios de origen y latencia de la API en formato Prometheus.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/debug/traces")
+async def get_recent_traces(source: Optional[str] = None, limit: int = 50):
+    """
+    Últimas trazas de scraping (más nuevas primero), con duración, resultado y camino usado.
+    Se puede filtrar por fuente, p.ej. `?source=basquet`.
+    """
+    return {"traces": tracing.recent_traces(limit=limit, source=source)}
+
+@app.get("/api/debug/traces/{trace_id}")
+async def get_trace_detail(trace_id: str):
+    """
+    Detalle de una traza: cada descarga, parseo y búsqueda de tabla con su duración,
+    bytes, filas y resultado.
+    """
+    trace = tracing.get_trace(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Traza no encontrada")
+    return trace
+
+# Exportación estática (ver app/export.py): los mismos JSON que sirve nginx o el CDN
+if static_export.enabled:
+    app.mount("/export", StaticFiles(directory=static_export.directory, check_dir=False), name="export")
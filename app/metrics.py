@@ -0,0 +1,309 @@
+"""Métricas en formato de texto de Prometheus.
+
+Implementación mínima y sin dependencias de contadores, histogramas y gauges
+con etiquetas. Las métricas se registran al importar el módulo y se exponen
+en `/metrics` con `render()`.
+"""
+import asyncio
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import tracing
+
+# Datos en caché con más antigüedad que esto se cuentan como "stale" (el
+# scheduler refresca lunes y miércoles, el hueco más largo es de 5 días)
+CACHE_STALE_AFTER_SECONDS = 5 * 24 * 3600
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry: List['_Metric'] = []
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} espera las etiquetas {self.labelnames}, recibió {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    type_name = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(key))} {_format_value(value)}"
+                for key, value in items]
+
+
+class Histogram(_Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        # Por cada combinación de etiquetas: [conteos por bucket, suma, total]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = [[0] * len(self.buckets), 0.0, 0]
+                self._values[key] = entry
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Mide la duración del bloque en segundos"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, ([*entry[0]], entry[1], entry[2])) for key, entry in self._values.items())
+        lines = []
+        for key, (counts, total_sum, count) in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = dict(labels, le=_format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total_sum)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class GaugeCallback(_Metric):
+    """Gauge cuyos valores se calculan al momento de exponer las métricas"""
+    type_name = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str],
+                 callback: Callable[[], Iterable[Tuple[Dict[str, str], float]]]):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+                for labels, value in self.callback()]
+
+
+def render() -> str:
+    """Todas las métricas registradas en formato de exposición de Prometheus"""
+    return '\n'.join(metric.render() for metric in _registry) + '\n'
+
+
+# Métricas de los scrapers
+SCRAPE_DURATION = Histogram(
+    'padua_scrape_duration_seconds',
+    'Duración total de cada scraping por fuente y tipo de dato',
+    ['source', 'kind'])
+SCRAPE_PHASE_DURATION = Histogram(
+    'padua_scrape_phase_duration_seconds',
+    'Duración de cada fase del scraping (fetch, parse, extract, browser_startup)',
+    ['source', 'phase'])
+SCRAPE_RESULTS = Counter(
+    'padua_scrape_results_total',
+    'Resultados de scraping por fuente, tipo y camino por el que se encontraron los datos',
+    ['source', 'kind', 'path'])
+CACHE_REQUESTS = Counter(
+    'padua_cache_requests_total',
+    'Lecturas de caché por fuente y tipo de dato (hit, miss, stale)',
+    ['source', 'kind', 'result'])
+UPSTREAM_RESPONSES = Counter(
+    'padua_upstream_responses_total',
+    'Respuestas de los sitios de origen por host y código HTTP',
+    ['host', 'status'])
+
+# Métricas de la API
+HTTP_REQUEST_DURATION = Histogram(
+    'padua_http_request_duration_seconds',
+    'Latencia de las peticiones a la API por ruta',
+    ['method', 'route', 'status'])
+
+
+def record_cache_read(source: str, kind: str, cached: bool, last_update: Optional[str]):
+    """Registra una lectura de caché como hit, miss o stale según la antigüedad"""
+    if not cached:
+        result = 'miss'
+    else:
+        result = 'hit'
+        if last_update:
+            try:
+                age = (datetime.now() - datetime.fromisoformat(last_update)).total_seconds()
+                if age > CACHE_STALE_AFTER_SECONDS:
+                    result = 'stale'
+            except ValueError:
+                pass
+    CACHE_REQUESTS.inc(source=source, kind=kind, result=result)
+
+
+def record_scrape_result(source: str, kind: str, path: str):
+    """Registra por qué camino terminó un scraping (también en la traza activa)"""
+    SCRAPE_RESULTS.inc(source=source, kind=kind, path=path)
+    tracing.annotate_trace(path=path)
+
+
+# Con `capture_phases` activo, duraciones de fases anotadas para mandarlas a otro proceso
+_captured_phases: ContextVar[Optional[List[Tuple[str, str, float]]]] = ContextVar(
+    'padua_captured_phases', default=None)
+
+
+@contextmanager
+def _phase_timer(source: str, phase: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        SCRAPE_PHASE_DURATION.observe(seconds, source=source, phase=phase)
+        captured = _captured_phases.get()
+        if captured is not None:
+            captured.append((source, phase, seconds))
+
+
+@contextmanager
+def capture_phases():
+    """Anota las duraciones de las fases medidas dentro del bloque (p.ej. en un proceso del pool)"""
+    captured: List[Tuple[str, str, float]] = []
+    token = _captured_phases.set(captured)
+    try:
+        yield captured
+    finally:
+        _captured_phases.reset(token)
+
+
+def record_phases(phases: Iterable[Tuple[str, str, float]]):
+    """Registra duraciones de fases medidas en otro proceso (ver `capture_phases`)"""
+    for source, phase, seconds in phases:
+        SCRAPE_PHASE_DURATION.observe(seconds, source=source, phase=phase)
+
+
+def timed_phase(phase: str, span_name: Optional[str] = None):
+    """Decorador para métodos de scrapers: mide la fase usando `self.name` como fuente.
+
+    Además abre un span (llamado `span_name` o como la fase) en la traza del
+    scraping en curso, con un resumen del resultado (bytes, filas, encontrado).
+    """
+    span_name = span_name or phase
+
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(self, *args, **kwargs):
+                with _phase_timer(self.name, phase), tracing.span(span_name) as current:
+                    result = await fn(self, *args, **kwargs)
+                    if current is not None:
+                        current.set(**tracing.describe_result(result))
+                    return result
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            with _phase_timer(self.name, phase), tracing.span(span_name) as current:
+                result = fn(self, *args, **kwargs)
+                if current is not None:
+                    current.set(**tracing.describe_result(result))
+                return result
+        return wrapper
+    return decorator
+
+
+def timed_scrape(kind: str):
+    """Decorador para get_standings/get_fixtures y sus versiones async.
+
+    Mide la duración total y abre la traza del scraping.
+    """
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(self, *args, **kwargs):
+                with SCRAPE_DURATION.time(source=self.name, kind=kind), \
+                        tracing.trace(kind, source=self.name, kind=kind) as root:
+                    result = await fn(self, *args, **kwargs)
+                    _annotate_scrape_error(root, result)
+                    return result
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            with SCRAPE_DURATION.time(source=self.name, kind=kind), \
+                    tracing.trace(kind, source=self.name, kind=kind) as root:
+                result = fn(self, *args, **kwargs)
+                _annotate_scrape_error(root, result)
+                return result
+        return wrapper
+    return decorator
+
+
+def _annotate_scrape_error(root, result):
+    if root is not None and isinstance(result, dict) and result.get('error'):
+        root.status = 'error'
+        root.set(error=result['error'])
@@ -0,0 +1,191 @@
+"""Filtros, proyección, orden y paginación de posiciones y fixtures en el servidor.
+
+Los endpoints de posiciones y fixtures aceptan:
+
+- `equipo`: filas de un equipo (coincidencia parcial, sin distinguir mayúsculas;
+  en fixtures, como local o visitante)
+- `casa=true`: sólo filas de CASA de Padua
+- `sort`: campo por el que ordenar, con `-` adelante para orden descendente
+- `fields`: campos a incluir, separados por coma
+- `limit` y `offset`: paginación
+
+Por cada versión de los datos se arma una sola vez un `SnapshotIndex` con
+los índices equipo -> filas y la vista de CASA; los órdenes por campo y las
+respuestas de consultas repetidas se calculan la primera vez que se piden y
+quedan en caché hasta la próxima versión.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .diffing import get_history
+from .fixture_calendar import is_casa_match, is_casa_team
+from .scraper.models import FixtureRow, StandingRow
+
+FIELDS = {
+    'standings': StandingRow._fields,
+    'fixtures': FixtureRow._fields,
+}
+
+# Respuestas de consultas distintas que se guardan por versión de los datos
+QUERY_CACHE_SIZE = 64
+
+
+class QueryError(ValueError):
+    """Parámetros de consulta inválidos (la API responde 400)"""
+
+
+class ListQuery:
+    """Parámetros de filtro/orden/paginación de una consulta"""
+
+    def __init__(self, equipo: Optional[str] = None, casa: bool = False, limit: Optional[int] = None,
+                 offset: int = 0, fields: Optional[str] = None, sort: Optional[str] = None):
+        if limit is not None and limit < 0:
+            raise QueryError("limit no puede ser negativo")
+        if offset < 0:
+            raise QueryError("offset no puede ser negativo")
+        self.equipo = equipo.strip().lower() if equipo else None
+        self.casa = casa
+        self.limit = limit
+        self.offset = offset
+        self.fields = tuple(f.strip() for f in fields.split(',') if f.strip()) if fields else None
+        self.sort = sort.strip() if sort else None
+
+    def key(self) -> Tuple:
+        return (self.equipo, self.casa, self.limit, self.offset, self.fields, self.sort)
+
+    def validate(self, kind: str):
+        known = FIELDS[kind]
+        if self.fields:
+            unknown = [f for f in self.fields if f not in known]
+            if unknown:
+                raise QueryError(f"Campos desconocidos: {', '.join(unknown)}. Disponibles: {', '.join(known)}")
+        if self.sort and self.sort.lstrip('-') not in known:
+            raise QueryError(f"No se puede ordenar por '{self.sort.lstrip('-')}'. Disponibles: {', '.join(known)}")
+
+
+def parse_list_query(equipo: Optional[str] = None, casa: bool = False, limit: Optional[int] = None,
+                     offset: int = 0, fields: Optional[str] = None,
+                     sort: Optional[str] = None) -> Optional[ListQuery]:
+    """None si la petición no usa ningún parámetro de consulta. Lanza QueryError si son inválidos"""
+    if equipo is None and not casa and limit is None and not offset and fields is None and sort is None:
+        return None
+    return ListQuery(equipo, casa, limit, offset, fields, sort)
+
+
+class SnapshotIndex:
+    """Índices precalculados sobre las filas de una versión de los datos"""
+
+    def __init__(self, kind: str, rows: List[Dict]):
+        self.kind = kind
+        self.rows = rows
+        self.by_team: Dict[str, List[int]] = {}
+        casa = []
+        team_fields = ('equipo',) if kind == 'standings' else ('local', 'visitante')
+        for index, row in enumerate(rows):
+            for field in team_fields:
+                key = str(row.get(field) or '').strip().lower()
+                positions = self.by_team.setdefault(key, [])
+                if not positions or positions[-1] != index:
+                    positions.append(index)
+            if is_casa_match(row) if kind == 'fixtures' else is_casa_team(row.get('equipo')):
+                casa.append(index)
+        self.casa = casa
+        self._orders: Dict[str, List[int]] = {}
+        self._responses: 'OrderedDict[Tuple, Tuple[int, List[Dict]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _team_positions(self, team: str) -> List[int]:
+        exact = self.by_team.get(team)
+        if exact is not None:
+            return exact
+        # Coincidencia parcial: se recorren los nombres de equipo, no las filas
+        positions = set()
+        for key, indexes in self.by_team.items():
+            if team in key:
+                positions.update(indexes)
+        return sorted(positions)
+
+    def _order(self, field: str) -> List[int]:
+        order = self._orders.get(field)
+        if order is None:
+            # Los valores ausentes quedan al final
+            values = [row.get(field) for row in self.rows]
+            order = sorted(range(len(values)), key=lambda i: (values[i] is None, 0 if values[i] is None else values[i]))
+            self._orders[field] = order
+        return order
+
+    def run(self, query: ListQuery) -> Tuple[int, List[Dict]]:
+        """Total de filas que cumplen el filtro y la página pedida"""
+        key = query.key()
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is not None:
+                self._responses.move_to_end(key)
+                return cached
+
+            positions: Optional[List[int]] = None
+            if query.casa:
+                positions = self.casa
+            if query.equipo:
+                team_positions = self._team_positions(query.equipo)
+                positions = team_positions if positions is None else \
+                    sorted(set(positions).intersection(team_positions))
+            if query.sort:
+                field = query.sort.lstrip('-')
+                order = self._order(field)
+                if query.sort.startswith('-'):
+                    # Descendente, manteniendo los valores ausentes al final
+                    present = [i for i in order if self.rows[i].get(field) is not None]
+                    order = present[::-1] + order[len(present):]
+                if positions is not None:
+                    selected = set(positions)
+                    order = [i for i in order if i in selected]
+                positions = order
+            elif positions is None:
+                positions = range(len(self.rows))
+
+            total = len(positions)
+            end = None if query.limit is None else query.offset + query.limit
+            page = [self.rows[i] for i in positions[query.offset:end]]
+            if query.fields:
+                page = [{f: row[f] for f in query.fields if f in row} for row in page]
+
+            result = (total, page)
+            self._responses[key] = result
+            if len(self._responses) > QUERY_CACHE_SIZE:
+                self._responses.popitem(last=False)
+            return result
+
+
+_indexes: Dict[str, Tuple[int, SnapshotIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def snapshot_index(source: str, kind: str) -> Optional[SnapshotIndex]:
+    """Índice de la versión actual de `source`/`kind` (se arma una vez por versión)"""
+    version, rows = get_history(source, kind).current()
+    if rows is None:
+        return None
+    topic = f"{source}/{kind}"
+    with _indexes_lock:
+        cached = _indexes.get(topic)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        index = SnapshotIndex(kind, rows)
+        _indexes[topic] = (version, index)
+        return index
+
+
+def apply_query(source: str, kind: str, result: Dict, query: ListQuery) -> Dict:
+    """Aplica la consulta a la respuesta de un endpoint de posiciones o fixtures.
+
+    Lanza QueryError si los parámetros no son válidos.
+    """
+    query.validate(kind)
+    index = snapshot_index(source, kind)
+    if index is None:
+        # Datos sin versión registrada (p.ej. fixtures de muestra): índice descartable
+        index = SnapshotIndex(kind, result.get(kind) or [])
+    total, page = index.run(query)
+    return dict(result, **{kind: page, "total": total, "offset": query.offset, "limit": query.limit})
@@ -0,0 +1,160 @@
+"""Motor de scraping asincrónico.
+
+Comparte un único `httpx.AsyncClient` (pool de conexiones) entre todos los
+scrapers, limita la concurrencia por host con semáforos (y, si se pide, la
+cantidad de pedidos por segundo a cada host) y permite refrescar varias
+fuentes a la vez con `gather`, aplicando timeouts y cancelando lo que quede
+pendiente. httpx se importa recién al crear el cliente.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from .. import tracing
+from ..metrics import UPSTREAM_RESPONSES
+from .fetching import DEFAULT_TIMEOUT, resolve_upstream_url
+from .resilience import FetchError, RetryPolicy, DEFAULT_RETRY_POLICY, acall_with_resilience
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncScrapeEngine:
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, max_connections: int = 20,
+                 max_per_host: int = 4, requests_per_second: Optional[float] = None):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        # Pedidos por segundo a cada host (None = sin límite); los pedidos se espacian parejo
+        self.requests_per_second = requests_per_second
+        self._client = None
+        self._loop = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Host -> instante (monotonic) a partir del cual puede salir su próximo pedido
+        self._host_next_slot: Dict[str, float] = {}
+
+    def _ensure_loop_state(self):
+        """El cliente y los semáforos quedan atados al event loop que los creó"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._client = None
+            self._host_semaphores = {}
+            self._host_next_slot = {}
+
+    def _get_client(self):
+        self._ensure_loop_state()
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+        return self._client
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        self._ensure_loop_state()
+        host = urlsplit(url).netloc.lower()
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def _wait_host_slot(self, host: str):
+        """Espera el turno de `host` para respetar `requests_per_second`"""
+        if not self.requests_per_second:
+            return
+        now = time.monotonic()
+        slot = max(now, self._host_next_slot.get(host, now))
+        self._host_next_slot[host] = slot + 1.0 / self.requests_per_second
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def fetch_text(self, url: str, headers: Optional[Dict] = None,
+                         timeout: Optional[float] = None,
+                         retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY) -> str:
+        """Descarga una URL con reintentos y circuit breaker por host"""
+        return await acall_with_resilience(
+            url, lambda: self._fetch_once(url, headers, timeout), retry_policy)
+
+    async def _fetch_once(self, url: str, headers: Optional[Dict], timeout: Optional[float]) -> str:
+        """Un intento de descarga respetando el límite de concurrencia del host"""
+        import httpx
+
+        client = self._get_client()
+        host = urlsplit(url).netloc.lower()
+        tracing.annotate(url=url)
+        async with self._host_semaphore(url):
+            await self._wait_host_slot(host)
+            try:
+                response = await client.get(resolve_upstream_url(url), headers=headers,
+                                            timeout=timeout if timeout is not None else self.timeout)
+            except httpx.TimeoutException as e:
+                UPSTREAM_RESPONSES.inc(host=host, status='timeout')
+                raise FetchError(f"Timeout al acceder a {url}", is_timeout=True) from e
+            except httpx.HTTPError as e:
+                UPSTREAM_RESPONSES.inc(host=host, status='error')
+                raise FetchError(f"{type(e).__name__}: {e}") from e
+            UPSTREAM_RESPONSES.inc(host=host, status=str(response.status_code))
+            tracing.annotate(status=response.status_code)
+            logger.debug("Código de respuesta %d para %s", response.status_code, url)
+            if response.is_error:
+                raise FetchError(f"HTTP {response.status_code} para {url}",
+                                 status_code=response.status_code)
+            return response.text
+
+    async def gather(self, *aws: Awaitable, timeout: Optional[float] = None) -> List:
+        """Ejecuta varias fuentes en paralelo.
+
+        Los errores se devuelven en la lista en lugar de propagarse, para que
+        una liga caída no arruine el refresco de las demás. Si se pasa
+        `timeout`, lo que no terminó a tiempo se cancela y queda como
+        `asyncio.TimeoutError`.
+        """
+        tasks = [asyncio.ensure_future(aw) for aw in aws]
+        if not tasks:
+            return []
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+        except asyncio.CancelledError:
+            # Si cancelan al que espera, cancelar también todas las fuentes
+            for task in tasks:
+                task.cancel()
+            raise
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.warning("%s fuentes canceladas por timeout (%ss)", len(pending), timeout)
+
+        results = []
+        for task in tasks:
+            if task in pending:
+                results.append(asyncio.TimeoutError(f"Timeout de {timeout}s"))
+            elif task.cancelled():
+                results.append(asyncio.CancelledError())
+            elif task.exception() is not None:
+                results.append(task.exception())
+            else:
+                results.append(task.result())
+        return results
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_engine: Optional[AsyncScrapeEngine] = None
+
+
+def get_engine() -> AsyncScrapeEngine:
+    """Motor compartido por toda la aplicación"""
+    global _engine
+    if _engine is None:
+        _engine = AsyncScrapeEngine()
+    return _engine
@@ -1,28 +1,68 @@
-from bs4 import BeautifulSoup
 import requests
-from datetime import datetime
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
 import logging
 import json
+import os
 import re
+from .parsing import parse_html
+from .snapshots import page_snapshots
+from .extraction import PageExtraction, extraction_pool
+from .. import tracing
+from ..updates import publish_update
+from ..metrics import record_cache_read, record_scrape_result, timed_phase, timed_scrape
+from .fetching import ScrapeSteps, arun_steps, fetch_text, run_steps
+from .async_engine import AsyncScrapeEngine, get_engine
+from .cache import CachedRows, CachedTimestamp, DataSnapshot, ScraperCache
+from .models import FixtureRow, StandingRow, fixtures_to_dicts, parse_int, to_rows
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
-logging.basicConfig(level=logging.INFO, 
-                   format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Página de fixture y posiciones de cada zona y temporada de la Conferencia Metropolitana
+LEAGUE_URL = "https://www.argentina.basketball/liga-federal/fixture-posiciones/conferencia-metropolitana-zona-{zone}-{season}"
+ZONES = ('a', 'b')
+# Guardar el HTML descargado (response_debug.html, iframe_debug_N.html) en el directorio actual
+DEBUG_DUMPS = os.environ.get('SCRAPER_DEBUG_DUMPS', '0').strip().lower() in ('1', 'true', 'yes', 'on')
+
+# Páginas generales de la liga (siempre la temporada en curso) donde buscar la tabla si no está en la principal
+ALTERNATIVE_URLS = [
+    "https://www.argentina.basketball/liga-federal/fixture-posiciones",
+    "https://www.argentina.basketball/liga-federal/posiciones"
+]
+STANDINGS_NOT_FOUND = "No se pudo encontrar la tabla de posiciones en ninguna de las fuentes"
+
+
+def league_url(zone: str = 'b', season: int = 2025) -> str:
+    return LEAGUE_URL.format(zone=zone.lower(), season=season)
+
+
 class BasketballScraper:
-    def __init__(self):
-        # URL principal de la página - cambiada para usar la liga regular
-        self.url = "https://www.argentina.basketball/liga-federal/fixture-posiciones/conferencia-metropolitana-zona-b-2025"
+    # Vistas del snapshot en caché de cada dato (ver cache.py)
+    standings = CachedRows('standings')
+    last_update = CachedTimestamp('standings')
+    fixtures = CachedRows('fixtures')
+    fixtures_update = CachedTimestamp('fixtures')
+    # Tipos de dato que se scrapean con Chrome (ninguno: todo es HTML estático)
+    browser_kinds = ()
+
+    def __init__(self, url: Optional[str] = None, name: Optional[str] = None,
+                 publish: Optional[Callable] = None, alternative_urls: Optional[List[str]] = None,
+                 debug_dumps: Optional[bool] = None):
+        # Identificador de la fuente para métricas y logs
+        self.name = name or "basquet"
+        # Destino de los resultados nuevos (el backfill pasa el suyo para escribirlos en bloque)
+        self.publish = publish or publish_update
+        
+        # URL principal de la página - por defecto la liga regular (Zona B 2025)
+        self.url = url or league_url('b', 2025)
         # URLs para tira A y tira B
-        self.url_tira_a = "https://www.argentina.basketball/liga-federal/fixture-posiciones/conferencia-metropolitana-zona-a-2025"
-        self.url_tira_b = "https://www.argentina.basketball/liga-federal/fixture-posiciones/conferencia-metropolitana-zona-b-2025"
+        self.url_tira_a = league_url('a', 2025)
+        self.url_tira_b = league_url('b', 2025)
         
-        # Variables para almacenar datos
-        self.last_update = None
-        self.standings = None
-        self.fixtures = None
-        self.fixtures_update = None
+        # Datos en caché: un snapshot inmutable por tipo de dato
+        self.cache = ScraperCache(self.name)
         
         # Variables específicas para tira A y tira B
         self.standings_tira_a = None
@@ -30,63 +70,94 @@ class BasketballScraper:
         self.standings_tira_b = None
         self.last_update_tira_b = None
         
-        # URLs alternativas para tabla de posiciones si no se encuentra en la página principal
-        self.alternative_urls = [
-            "https://www.argentina.basketball/liga-federal/fixture-posiciones",
-            "https://www.argentina.basketball/liga-federal/posiciones"
-        ]
+        # URLs alternativas para tabla de posiciones si no se encuentra en la página principal.
+        # Son de la temporada en curso: el backfill de temporadas anteriores pasa una lista vacía
+        self.alternative_urls = list(ALTERNATIVE_URLS if alternative_urls is None else alternative_urls)
+        # Guardar el HTML descargado en el directorio actual para depurar (`SCRAPER_DEBUG_DUMPS=1`)
+        self.debug_dumps = DEBUG_DUMPS if debug_dumps is None else debug_dumps
+        
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+            'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
+            'Cache-Control': 'max-age=0',
+            'Referer': 'https://www.argentina.basketball/'
+        }
+
+    def entry_urls(self) -> Dict[str, Optional[str]]:
+        """URL de la que parte cada extracción (posiciones y fixtures comparten la página de la liga)"""
+        return {'standings': self.url, 'fixtures': self.url}
 
+    @timed_scrape('standings')
     def get_standings(self) -> Dict:
         """Obtiene la tabla de posiciones actualizada"""
+        return run_steps(self._standings_steps(), self._fetch)
+
+    @timed_scrape('standings')
+    async def aget_standings(self, engine: Optional[AsyncScrapeEngine] = None) -> Dict:
+        """Versión async de get_standings: las descargas se hacen con el motor async"""
+        engine = engine or get_engine()
+        return await arun_steps(self._standings_steps(), lambda url: self._afetch(engine, url))
+
+    @timed_phase('fetch')
+    def _fetch(self, url: str) -> str:
+        return page_snapshots.fetch(url, lambda: fetch_text(url, headers=self.headers))
+
+    @timed_phase('fetch')
+    async def _afetch(self, engine: AsyncScrapeEngine, url: str) -> str:
+        return await page_snapshots.afetch(url, lambda: engine.fetch_text(url, headers=self.headers))
+
+    @timed_phase('parse')
+    def _parse(self, html: str):
+        tracing.annotate(bytes=len(html))
+        return parse_html(html)
+
+    def _extract_page(self, html: str, kind: str) -> PageExtraction:
+        """Filas de `kind` e iframes de una página (corre en el proceso principal o en el pool)"""
+        soup = self._parse(html)
+        if kind == 'fixtures':
+            return PageExtraction(self._extract_fixtures_data(soup), [])
+        table = self._find_standings_table(soup)
+        rows = self._extract_standings_data(table) if table else None
+        return PageExtraction(rows, [iframe.get('src') for iframe in soup.find_all('iframe')])
+
+    def _standings_steps(self) -> ScrapeSteps:
+        """Pasos para encontrar la tabla de posiciones: cada yield pide el HTML de una URL"""
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
-                'Cache-Control': 'max-age=0',
-                'Referer': 'https://www.argentina.basketball/'
-            }
-            logger.info(f"Accediendo a: {self.url}")
-            response = requests.get(self.url, headers=headers, timeout=15)
-            logger.info(f"Código de respuesta: {response.status_code}")
-            response.raise_for_status()
+            logger.info("Accediendo a: %s", self.url)
+            html = yield self.url
             
             # Guardar el HTML para análisis
-            with open("response_debug.html", "w", encoding="utf-8") as f:
-                f.write(response.text)
-            logger.info("HTML guardado en response_debug.html para análisis")
+            if self.debug_dumps:
+                with open("response_debug.html", "w", encoding="utf-8") as f:
+                    f.write(html)
+                logger.info("HTML guardado en response_debug.html para análisis")
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            page = extraction_pool.extract(self, html, 'standings')
             
-            # Buscar todos los iframes que pueden contener la tabla de posiciones
-            iframes = soup.find_all('iframe')
-            logger.info(f"Se encontraron {len(iframes)} iframes en la página")
+            # Tabla de clasificación directamente en la página principal. Se busca
+            # antes de mirar si hay iframes (la versión original sólo la buscaba si
+            # la página tenía iframes): una página que ya trae la tabla, como las de
+            # temporadas anteriores del backfill, no pasa a las URLs alternativas
+            if page.rows is not None:
+                logger.info("Tabla de posiciones encontrada directamente en la página principal")
+                if page.rows:
+                    return self._store_standings(page.rows, 'main_page')
+            
+            # Iframes que pueden contener la tabla de posiciones
+            iframes = page.iframes
+            logger.info("Se encontraron %d iframes en la página", len(iframes))
             
             if not iframes:
                 logger.warning("No se encontraron iframes en la página principal")
-                return self._try_alternative_urls(headers)
-            
-            # Buscar tabla de clasificación directamente en la página principal
-            main_table = self._find_standings_table(soup)
-            if main_table:
-                logger.info("Tabla de posiciones encontrada directamente en la página principal")
-                standings = self._extract_standings_data(main_table)
-                if standings:
-                    self.last_update = datetime.now().isoformat()
-                    self.standings = standings
-                    return {
-                        "error": None,
-                        "last_update": self.last_update,
-                        "standings": standings
-                    }
+                return (yield from self._alternative_url_steps())
             
             # Probar con cada iframe
-            for i, iframe in enumerate(iframes):
-                iframe_url = iframe.get('src')
+            for i, iframe_url in enumerate(iframes):
                 if not iframe_url:
                     continue
                     
-                logger.info(f"Probando iframe {i+1}/{len(iframes)}: {iframe_url}")
+                logger.info("Probando iframe %d/%d: %s", i + 1, len(iframes), iframe_url)
                 
                 # Verificar si parece ser una URL de tabla de posiciones
                 is_standings_url = any(keyword in iframe_url.lower() for keyword in 
@@ -95,130 +166,103 @@ class BasketballScraper:
                 # Si no parece ser una tabla de posiciones, solo seguir si hay keywords de baloncesto
                 if not is_standings_url and not any(keyword in iframe_url.lower() for keyword in 
                                                    ['basket', 'liga', 'federal', '3x3', 'cabgesdeportiva']):
-                    logger.info(f"Saltando iframe que no parece contener datos relevantes: {iframe_url}")
+                    logger.info("Saltando iframe que no parece contener datos relevantes: %s", iframe_url)
                     continue
                 
                 # Para URLs de la API de GesDeportiva, modificar para obtener tabla en lugar de partidos
                 if 'gesdeportiva' in iframe_url.lower() and 'partidos' in iframe_url.lower():
                     iframe_url = iframe_url.replace('partidos', 'clasificacion')
-                    logger.info(f"URL modificada para obtener clasificación: {iframe_url}")
+                    logger.info("URL modificada para obtener clasificación: %s", iframe_url)
                 
                 try:
-                    iframe_response = requests.get(iframe_url, headers=headers, timeout=15)
-                    iframe_response.raise_for_status()
+                    iframe_html = yield iframe_url
                     
                     # Guardar el HTML del iframe para análisis
-                    iframe_file = f"iframe_debug_{i+1}.html"
-                    with open(iframe_file, "w", encoding="utf-8") as f:
-                        f.write(iframe_response.text)
-                    logger.info(f"HTML del iframe guardado en {iframe_file} para análisis")
-                    
-                    iframe_soup = BeautifulSoup(iframe_response.text, 'html.parser')
+                    if self.debug_dumps:
+                        iframe_file = f"iframe_debug_{i+1}.html"
+                        with open(iframe_file, "w", encoding="utf-8") as f:
+                            f.write(iframe_html)
+                        logger.info("HTML del iframe guardado en %s para análisis", iframe_file)
                     
                     # Buscar la tabla en el iframe
-                    table = self._find_standings_table(iframe_soup)
-                    if table:
-                        logger.info(f"Tabla de posiciones encontrada en iframe {i+1}")
-                        standings = self._extract_standings_data(table)
-                        if standings:
-                            self.last_update = datetime.now().isoformat()
-                            self.standings = standings
-                            return {
-                                "error": None,
-                                "last_update": self.last_update,
-                                "standings": standings
-                            }
+                    iframe_page = extraction_pool.extract(self, iframe_html, 'standings')
+                    if iframe_page.rows is not None:
+                        logger.info("Tabla de posiciones encontrada en iframe %d", i + 1)
+                        if iframe_page.rows:
+                            return self._store_standings(iframe_page.rows, 'iframe')
                 except requests.RequestException as e:
-                    logger.warning(f"Error al acceder al iframe {i+1}: {str(e)}")
+                    logger.warning("Error al acceder al iframe %d: %s", i + 1, e)
                     continue
             
             # Si no se encontró la tabla en ningún iframe, probar URLs alternativas
-            return self._try_alternative_urls(headers)
+            return (yield from self._alternative_url_steps())
                 
         except requests.RequestException as e:
             error_msg = f"Error al obtener los datos: {str(e)}"
             logger.error(error_msg)
-            return {
-                "error": error_msg,
-                "last_update": self.last_update,
-                "standings": self.standings
-            }
+            record_scrape_result(self.name, 'standings', 'error')
+            return self.cache.get('standings').response(error_msg)
         except Exception as e:
             error_msg = f"Error inesperado: {str(e)}"
-            logger.error(error_msg)
-            import traceback
-            logger.error(traceback.format_exc())
-            return {
-                "error": error_msg,
-                "last_update": self.last_update,
-                "standings": self.standings
-            }
+            logger.error(error_msg, exc_info=True)
+            record_scrape_result(self.name, 'standings', 'error')
+            return self.cache.get('standings').response(error_msg)
+
+    def _store_standings(self, standings: List[StandingRow], path: str) -> Dict:
+        """Guarda en caché la tabla obtenida y arma la respuesta"""
+        record_scrape_result(self.name, 'standings', path)
+        snapshot = self.cache.swap('standings', standings)
+        data = snapshot.payload()
+        self.publish(self.name, 'standings', data, snapshot.last_update)
+        return {
+            "error": None,
+            "last_update": snapshot.last_update,
+            "standings": data
+        }
     
-    def _try_alternative_urls(self, headers):
+    def _alternative_url_steps(self) -> ScrapeSteps:
         """Intenta encontrar la tabla de posiciones en URLs alternativas"""
         for alt_url in self.alternative_urls:
             try:
-                logger.info(f"Probando URL alternativa: {alt_url}")
-                alt_response = requests.get(alt_url, headers=headers, timeout=15)
-                alt_response.raise_for_status()
+                logger.info("Probando URL alternativa: %s", alt_url)
+                alt_html = yield alt_url
                 
-                alt_soup = BeautifulSoup(alt_response.text, 'html.parser')
+                alt_page = extraction_pool.extract(self, alt_html, 'standings')
                 
                 # Buscar tabla directamente
-                alt_table = self._find_standings_table(alt_soup)
-                if alt_table:
-                    logger.info(f"Tabla encontrada en URL alternativa: {alt_url}")
-                    standings = self._extract_standings_data(alt_table)
-                    if standings:
-                        self.last_update = datetime.now().isoformat()
-                        self.standings = standings
-                        return {
-                            "error": None,
-                            "last_update": self.last_update,
-                            "standings": standings
-                        }
+                if alt_page.rows is not None:
+                    logger.info("Tabla encontrada en URL alternativa: %s", alt_url)
+                    if alt_page.rows:
+                        return self._store_standings(alt_page.rows, 'alternative')
                 
                 # Buscar iframes en la URL alternativa
-                alt_iframes = alt_soup.find_all('iframe')
-                for i, iframe in enumerate(alt_iframes):
-                    iframe_url = iframe.get('src')
+                for i, iframe_url in enumerate(alt_page.iframes):
                     if not iframe_url:
                         continue
                         
-                    logger.info(f"Probando iframe {i+1} en URL alternativa: {iframe_url}")
+                    logger.info("Probando iframe %d en URL alternativa: %s", i + 1, iframe_url)
                     
                     try:
-                        iframe_response = requests.get(iframe_url, headers=headers, timeout=15)
-                        iframe_response.raise_for_status()
+                        iframe_html = yield iframe_url
                         
-                        iframe_soup = BeautifulSoup(iframe_response.text, 'html.parser')
-                        table = self._find_standings_table(iframe_soup)
-                        if table:
-                            logger.info(f"Tabla encontrada en iframe de URL alternativa")
-                            standings = self._extract_standings_data(table)
-                            if standings:
-                                self.last_update = datetime.now().isoformat()
-                                self.standings = standings
-                                return {
-                                    "error": None,
-                                    "last_update": self.last_update,
-                                    "standings": self.standings
-                                }
+                        iframe_page = extraction_pool.extract(self, iframe_html, 'standings')
+                        if iframe_page.rows is not None:
+                            logger.info("Tabla encontrada en iframe de URL alternativa")
+                            if iframe_page.rows:
+                                return self._store_standings(iframe_page.rows, 'alternative_iframe')
                     except requests.RequestException:
                         continue
             except requests.RequestException:
                 continue
         
         # Si llegamos aquí, es porque no pudimos encontrar la tabla
-        error_msg = "No se pudo encontrar la tabla de posiciones en ninguna de las fuentes"
+        error_msg = STANDINGS_NOT_FOUND
         logger.error(error_msg)
-        return {
-            "error": error_msg,
-            "last_update": self.last_update,
-            "standings": self.standings
-        }
+        record_scrape_result(self.name, 'standings', 'not_found')
+        return self.cache.get('standings').response(error_msg)
     
-    def _find_standings_table(self, soup) -> Optional[BeautifulSoup]:
+    @timed_phase('extract', span_name='detect_table')
+    def _find_standings_table(self, soup) -> Optional['BeautifulSoup']:
         """Busca la tabla de posiciones en el HTML"""
         # Buscar por atributos comunes en tablas de clasificación
         for table in soup.find_all('table'):
@@ -249,7 +293,8 @@ class BasketballScraper:
         
         return None
 
-    def _extract_standings_data(self, table):
+    @timed_phase('extract')
+    def _extract_standings_data(self, table) -> List[StandingRow]:
         """Extrae los datos de la tabla de posiciones"""
         standings = []
         all_rows = table.find_all('tr')
@@ -276,7 +321,7 @@ class BasketballScraper:
         if header_row:
             header_cells = header_row.find_all(['th', 'td'])
             header_texts = [cell.text.strip().lower() for cell in header_cells]
-            logger.info(f"Encabezados encontrados: {header_texts}")
+            logger.info("Encabezados encontrados: %s", header_texts)
             
             # Mapear columnas
             for idx, text in enumerate(header_texts):
@@ -309,7 +354,7 @@ class BasketballScraper:
                 'perdidos': 5
             }
             
-        logger.info(f"Mapeo de columnas: {column_map}")
+        logger.info("Mapeo de columnas: %s", column_map)
         
         # Asegurar que tengamos al menos la columna del equipo
         if 'equipo' not in column_map:
@@ -380,185 +425,179 @@ class BasketballScraper:
                 if "diferencia" not in team_data and "favor" in team_data and "contra" in team_data:
                     team_data["diferencia"] = team_data["favor"] - team_data["contra"]
                 
-                standings.append(team_data)
-                logger.debug(f"Equipo procesado: {team_data}")
+                team = StandingRow.from_dict(team_data)
+                standings.append(team)
+                logger.debug("Equipo procesado: %s", team)
                 
             except Exception as e:
-                logger.error(f"Error procesando fila {i}: {str(e)}")
+                logger.error("Error procesando fila %d: %s", i, e)
                 continue
         
         # Si encontramos datos pero no hay puntos, calcular basado en PG
-        if standings and all(team.get("puntos", 0) == 0 for team in standings) and any(team.get("ganados", 0) > 0 for team in standings):
-            for team in standings:
-                if "ganados" in team:
-                    team["puntos"] = team["ganados"] * 2  # En baloncesto, generalmente 2 puntos por victoria
+        if standings and all(not team.puntos for team in standings) and any(team.ganados for team in standings):
+            # En baloncesto, generalmente 2 puntos por victoria
+            standings = [team._replace(puntos=team.ganados * 2) for team in standings]
         
         # Ordenar por posición
-        standings.sort(key=lambda x: x["posicion"])
+        standings.sort(key=lambda x: x.posicion)
                 
         return standings
 
     def _safe_int(self, value: str) -> int:
         """Convierte de manera segura un string a int"""
-        try:
-            if isinstance(value, str):
-                # Limpiar el valor
-                value = value.replace(',', '.').strip()
-                # Manejar casos especiales
-                if value == '-' or value == 'N/A' or value == '' or value == '—':
-                    return 0
-                # Extraer dígitos si hay texto mezclado
-                numeric_part = re.search(r'[-+]?\d*\.?\d+', value)
-                if numeric_part:
-                    return int(float(numeric_part.group()))
-                return 0
-            elif isinstance(value, (int, float)):
-                return int(value)
-            return 0
-        except (ValueError, AttributeError):
-            return 0
+        return parse_int(value)
 
     def get_cached_standings(self) -> Dict:
         """Retorna los últimos datos obtenidos sin hacer una nueva petición"""
-        if not self.standings:
+        snapshot = self.cache.get('standings')
+        if not snapshot.rows:
+            record_cache_read(self.name, 'standings', False, None)
             return self.get_standings()
-        return {
-            "error": None,
-            "last_update": self.last_update,
-            "standings": self.standings
-        }
+        record_cache_read(self.name, 'standings', True, snapshot.last_update)
+        return snapshot.response()
+
+    async def aget_cached_standings(self) -> Dict:
+        """Versión async de get_cached_standings"""
+        if not self.cache.get('standings').rows:
+            record_cache_read(self.name, 'standings', False, None)
+            return await self.aget_standings()
+        return self.get_cached_standings()
 
+    @timed_scrape('fixtures')
     def get_fixtures(self) -> Dict:
         """Obtiene los próximos partidos del fixture"""
+        return run_steps(self._fixtures_steps(), self._fetch)
+
+    @timed_scrape('fixtures')
+    async def aget_fixtures(self, engine: Optional[AsyncScrapeEngine] = None) -> Dict:
+        """Versión async de get_fixtures"""
+        engine = engine or get_engine()
+        return await arun_steps(self._fixtures_steps(), lambda url: self._afetch(engine, url))
+
+    def _fixtures_steps(self) -> ScrapeSteps:
+        """Pasos para obtener el fixture desde la página principal de la liga"""
         try:
-            logger.info(f"Obteniendo fixture de: {self.url}")
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
-                'Cache-Control': 'max-age=0',
-                'Referer': 'https://www.argentina.basketball/'
-            }
-            
-            response = requests.get(self.url, headers=headers, timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
+            logger.info("Obteniendo fixture de: %s", self.url)
             
-            # Buscar elementos con fechas de partidos
-            fixtures_data = []
+            html = yield self.url
             
-            # Buscar secciones que contengan "próximos partidos" o "fixture"
-            fixture_sections = soup.find_all(['section', 'div'], string=lambda text: text and ('fixture' in text.lower() or 'próximo' in text.lower() or 'partido' in text.lower()))
-            
-            # Si no encontramos secciones específicas, buscar en elementos que puedan contener esta información
-            if not fixture_sections:
-                fixture_sections = soup.find_all(['div', 'section'], class_=lambda c: c and ('fixture' in c.lower() or 'match' in c.lower() or 'partido' in c.lower()))
-            
-            # Si todavía no encontramos, buscar en toda la página
-            if not fixture_sections:
-                fixture_sections = [soup]
-            
-            for section in fixture_sections:
-                # Buscar elementos de partido dentro de la sección
-                match_elements = section.find_all(['div', 'li'], class_=lambda c: c and ('match' in str(c).lower() or 'partido' in str(c).lower() or 'game' in str(c).lower()))
-                
-                if not match_elements:
-                    # Buscar divs que contengan estructura de partido
-                    match_elements = section.find_all('div', class_=lambda c: c is not None)
-                    
-                # Procesar cada elemento encontrado
-                for elem in match_elements:
-                    try:
-                        # Buscar equipos
-                        teams = elem.find_all(['div', 'span', 'p'], class_=lambda c: c and ('team' in str(c).lower() or 'equipo' in str(c).lower() or 'club' in str(c).lower()))
-                        
-                        # Si no encontramos equipos específicos, buscarlos de otra forma
-                        if not teams or len(teams) < 2:
-                            teams = [elem.find(['div', 'span', 'p'], string=lambda s: s and 'casa' in s.lower()),
-                                    elem.find(['div', 'span', 'p'], string=lambda s: s and not ('casa' in s.lower()) and len(s.strip()) > 0)]
-                        
-                        # Verificar que tengamos dos equipos
-                        if not teams or len(teams) < 2 or not teams[0] or not teams[1]:
-                            continue
-                        
-                        # Extraer nombres de equipos
-                        team1 = teams[0].get_text(strip=True)
-                        team2 = teams[1].get_text(strip=True)
-                        
-                        # Validar que tengamos texto en los nombres
-                        if not team1 or not team2:
-                            continue
-                        
-                        # Buscar fecha del partido
-                        date_elem = elem.find(['div', 'span', 'time', 'p'], class_=lambda c: c and ('date' in str(c).lower() or 'fecha' in str(c).lower() or 'time' in str(c).lower()))
-                        
-                        match_date = ""
-                        if date_elem:
-                            match_date = date_elem.get_text(strip=True)
-                        else:
-                            # Si no encontramos una fecha específica, buscar textos que se parezcan a fechas
-                            for text in elem.stripped_strings:
-                                if re.search(r'\d{1,2}[/-]\d{1,2}|\d{1,2}\s+de\s+[a-zA-ZáéíóúÁÉÍÓÚ]+', text):
-                                    match_date = text
-                                    break
-                        
-                        # Buscar hora del partido
-                        time_elem = elem.find(['div', 'span', 'time', 'p'], class_=lambda c: c and 'hora' in str(c).lower())
-                        
-                        match_time = ""
-                        if time_elem:
-                            match_time = time_elem.get_text(strip=True)
-                        else:
-                            # Si no encontramos una hora específica, buscar textos que se parezcan a horas
-                            for text in elem.stripped_strings:
-                                if re.search(r'\d{1,2}[:h]\d{0,2}', text):
-                                    if not match_date or not re.search(r'\d{1,2}[/-]\d{1,2}', text):  # Evitar confundir fechas con horas
-                                        match_time = text
-                                        break
-                                        
-                        # Determinar si CASA es local o visitante
-                        is_casa_local = 'casa' in team1.lower()
-                        
-                        # Crear objeto de partido
-                        match_obj = {
-                            "local": team1,
-                            "visitante": team2,
-                            "fecha": match_date,
-                            "hora": match_time,
-                            "es_casa_local": is_casa_local
-                        }
-                        
-                        fixtures_data.append(match_obj)
-                    except Exception as e:
-                        logger.error(f"Error procesando partido: {str(e)}")
-                        continue
+            fixtures_data = extraction_pool.extract(self, html, 'fixtures').rows
             
             # Si encontramos datos, guardarlos en caché
             if fixtures_data:
-                self.fixtures = fixtures_data
-                self.fixtures_update = datetime.now().isoformat()
+                snapshot = self.cache.swap('fixtures', fixtures_data)
+                self.publish(self.name, 'fixtures', snapshot.payload(), snapshot.last_update)
+            else:
+                snapshot = self.cache.get('fixtures')
+            record_scrape_result(self.name, 'fixtures',
+                                 'main_page' if fixtures_data else 'not_found')
                 
             return {
                 "error": None if fixtures_data else "No se encontraron próximos partidos",
-                "last_update": self.fixtures_update,
-                "fixtures": fixtures_data
+                "last_update": snapshot.last_update,
+                "fixtures": fixtures_to_dicts(fixtures_data)
             }
                 
         except Exception as e:
             error_msg = f"Error obteniendo fixture: {str(e)}"
             logger.error(error_msg)
-            return {
-                "error": error_msg,
-                "last_update": self.fixtures_update,
-                "fixtures": self.fixtures
-            }
+            record_scrape_result(self.name, 'fixtures', 'error')
+            return self.cache.get('fixtures').response(error_msg)
+
+    @timed_phase('extract')
+    def _extract_fixtures_data(self, soup) -> List[FixtureRow]:
+        """Extrae los próximos partidos de la página de la liga"""
+        # Buscar elementos con fechas de partidos
+        fixtures_data = []
+        
+        # Buscar secciones que contengan "próximos partidos" o "fixture"
+        fixture_sections = soup.find_all(['section', 'div'], string=lambda text: text and ('fixture' in text.lower() or 'próximo' in text.lower() or 'partido' in text.lower()))
+        
+        # Si no encontramos secciones específicas, buscar en elementos que puedan contener esta información
+        if not fixture_sections:
+            fixture_sections = soup.find_all(['div', 'section'], class_=lambda c: c and ('fixture' in c.lower() or 'match' in c.lower() or 'partido' in c.lower()))
+        
+        # Si todavía no encontramos, buscar en toda la página
+        if not fixture_sections:
+            fixture_sections = [soup]
+        
+        for section in fixture_sections:
+            # Buscar elementos de partido dentro de la sección
+            match_elements = section.find_all(['div', 'li'], class_=lambda c: c and ('match' in str(c).lower() or 'partido' in str(c).lower() or 'game' in str(c).lower()))
+            
+            if not match_elements:
+                # Buscar divs que contengan estructura de partido
+                match_elements = section.find_all('div', class_=lambda c: c is not None)
+                
+            # Procesar cada elemento encontrado
+            for elem in match_elements:
+                try:
+                    # Buscar equipos
+                    teams = elem.find_all(['div', 'span', 'p'], class_=lambda c: c and ('team' in str(c).lower() or 'equipo' in str(c).lower() or 'club' in str(c).lower()))
+                    
+                    # Si no encontramos equipos específicos, buscarlos de otra forma
+                    if not teams or len(teams) < 2:
+                        teams = [elem.find(['div', 'span', 'p'], string=lambda s: s and 'casa' in s.lower()),
+                                elem.find(['div', 'span', 'p'], string=lambda s: s and not ('casa' in s.lower()) and len(s.strip()) > 0)]
+                    
+                    # Verificar que tengamos dos equipos
+                    if not teams or len(teams) < 2 or not teams[0] or not teams[1]:
+                        continue
+                    
+                    # Extraer nombres de equipos
+                    team1 = teams[0].get_text(strip=True)
+                    team2 = teams[1].get_text(strip=True)
+                    
+                    # Validar que tengamos texto en los nombres
+                    if not team1 or not team2:
+                        continue
+                    
+                    # Buscar fecha del partido
+                    date_elem = elem.find(['div', 'span', 'time', 'p'], class_=lambda c: c and ('date' in str(c).lower() or 'fecha' in str(c).lower() or 'time' in str(c).lower()))
+                    
+                    match_date = ""
+                    if date_elem:
+                        match_date = date_elem.get_text(strip=True)
+                    else:
+                        # Si no encontramos una fecha específica, buscar textos que se parezcan a fechas
+                        for text in elem.stripped_strings:
+                            if re.search(r'\d{1,2}[/-]\d{1,2}|\d{1,2}\s+de\s+[a-zA-ZáéíóúÁÉÍÓÚ]+', text):
+                                match_date = text
+                                break
+                    
+                    # Buscar hora del partido
+                    time_elem = elem.find(['div', 'span', 'time', 'p'], class_=lambda c: c and 'hora' in str(c).lower())
+                    
+                    match_time = ""
+                    if time_elem:
+                        match_time = time_elem.get_text(strip=True)
+                    else:
+                        # Si no encontramos una hora específica, buscar textos que se parezcan a horas
+                        for text in elem.stripped_strings:
+                            if re.search(r'\d{1,2}[:h]\d{0,2}', text):
+                                if not match_date or not re.search(r'\d{1,2}[/-]\d{1,2}', text):  # Evitar confundir fechas con horas
+                                    match_time = text
+                                    break
+                                    
+                    # Determinar si CASA es local o visitante
+                    is_casa_local = 'casa' in team1.lower()
+                    
+                    # Crear objeto de partido
+                    match_obj = FixtureRow.create(team1, team2, match_date, match_time, is_casa_local)
+                    
+                    fixtures_data.append(match_obj)
+                except Exception as e:
+                    logger.error("Error procesando partido: %s", e)
+                    continue
+
+        return fixtures_data
     
     def get_cached_fixtures(self) -> Dict:
         """Retorna los últimos datos de fixtures obtenidos sin hacer una nueva petición"""
         # Datos de prueba para evitar el error 404
-        if not self.fixtures:
+        snapshot = self.cache.get('fixtures')
+        if not snapshot.rows:
+            record_cache_read(self.name, 'fixtures', False, None)
             # Proporcionar datos de muestra para garantizar que el endpoint funcione
             # Nota: La fecha actual es 30/04/2025, así que estos son los próximos partidos reales
             temp_fixtures = [
@@ -591,23 +630,19 @@ class BasketballScraper:
                     "es_casa_local": False
                 }
             ]
-            self.fixtures = temp_fixtures
-            self.fixtures_update = datetime.now().isoformat()
+            # No se guardan en la caché: no son datos de la liga, así que no pasan por
+            # publish (versiones, historial, calendario, export) ni tapan al primer refresco real
+            sample = DataSnapshot(self.name, 'fixtures', tuple(to_rows(FixtureRow, temp_fixtures)), None, 0)
             logger.info("Sirviendo datos de fixture de prueba")
-            return {
-                "error": None,
-                "last_update": self.fixtures_update,
-                "fixtures": self.fixtures
-            }
+            return sample.response()
             
-        return {
-            "error": None,
-            "last_update": self.fixtures_update,
-            "fixtures": self.fixtures
-        }
+        record_cache_read(self.name, 'fixtures', True, snapshot.last_update)
+        return snapshot.response()
 
 if __name__ == "__main__":
     from pprint import pprint
+    from ..logs import setup_logging
+    setup_logging()
     scraper = BasketballScraper()
     resultado = scraper.get_standings()
     pprint(resultado)
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""Creación y navegación del Chrome headless que usan los scrapers de voley.
+
+En modo liviano (`BROWSER_LEAN_MODE`, activo por defecto) el navegador:
+
+- bloquea imágenes, fuentes, video/audio y scripts de analítica con
+  `Network.setBlockedURLs` de DevTools (la tabla de posiciones es HTML)
+- usa la estrategia de carga `eager`: `driver.get` vuelve con el DOM listo,
+  sin esperar imágenes ni hojas de estilo
+- no usa GPU ni extensiones
+- espera a que aparezca una tabla o un iframe en lugar de dormir dos segundos
+
+Con `BROWSER_LEAN_MODE=0` se vuelve a la navegación completa (útil si el sitio
+deja de renderizar la tabla sin algún recurso bloqueado).
+
+El binario de chromedriver se resuelve una sola vez por proceso:
+`CHROMEDRIVER_PATH`, o el `chromedriver` del PATH, o como último recurso
+webdriver_manager (que descarga el driver si hace falta).
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Esperas de la navegación liviana
+PAGE_READY_TIMEOUT = 10.0
+PAGE_READY_POLL = 0.1
+# Espera fija de la navegación completa (comportamiento original)
+FULL_LOAD_WAIT = 2.0
+
+# Recursos que no hacen falta para leer la tabla de posiciones
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.avif',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.mp4', '*.webm', '*.mp3', '*.m3u8',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*googlesyndication.com*', '*facebook.net*', '*connect.facebook.*', '*hotjar.com*',
+    '*fonts.googleapis.com*', '*fonts.gstatic.com*',
+]
+
+_driver_path: Optional[str] = None
+_driver_path_lock = threading.Lock()
+
+
+def lean_mode_enabled() -> bool:
+    return os.environ.get('BROWSER_LEAN_MODE', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def resolve_driver_path() -> str:
+    """Ruta de chromedriver, resuelta una vez por proceso"""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            path = os.environ.get('CHROMEDRIVER_PATH') or shutil.which('chromedriver')
+            if not path:
+                from webdriver_manager.chrome import ChromeDriverManager
+                path = ChromeDriverManager().install()
+            logger.info("Usando chromedriver en %s", path)
+            _driver_path = path
+        return _driver_path
+
+
+def chrome_options(lean: bool):
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    if lean:
+        options.page_load_strategy = 'eager'
+        options.add_argument('--disable-gpu')
+        options.add_argument('--disable-extensions')
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_argument('--mute-audio')
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+        })
+    return options
+
+
+def _tracked_service(track: Optional[Callable[[int], None]]):
+    """Service de chromedriver que avisa su pid a `track` apenas se lanza el proceso"""
+    from selenium.webdriver.chrome.service import Service
+
+    class TrackedService(Service):
+        def _start_process(self, path):
+            try:
+                super()._start_process(path)
+            finally:
+                if track is not None and self.process is not None:
+                    track(self.process.pid)
+
+    return TrackedService(resolve_driver_path())
+
+
+def create_chrome(lean: Optional[bool] = None, track: Optional[Callable[[int], None]] = None):
+    """Chrome headless con el perfil liviano o el completo.
+
+    `track` recibe el pid de chromedriver en cuanto arranca, antes de que
+    Chrome termine de abrir (lo usa el supervisor para cubrir arranques
+    colgados).
+    """
+    from selenium import webdriver
+
+    lean = lean_mode_enabled() if lean is None else lean
+    service = _tracked_service(track)
+    driver = webdriver.Chrome(service=service, options=chrome_options(lean))
+    driver.lean_mode = lean
+    if lean:
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            # Sin DevTools se navega igual, sólo que sin bloquear recursos
+            logger.warning("No se pudieron bloquear recursos en Chrome: %s", e)
+    return driver
+
+
+def wait_until_ready(driver, timeout: float = PAGE_READY_TIMEOUT):
+    """Espera a que la página tenga una tabla o un iframe (o a que pase `timeout`)"""
+    if not getattr(driver, 'lean_mode', False):
+        time.sleep(FULL_LOAD_WAIT)
+        return
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=PAGE_READY_POLL).until(
+            lambda d: d.find_elements(By.CSS_SELECTOR, 'table, iframe'))
+    except TimeoutException:
+        logger.warning("La página no mostró tablas ni iframes en %.0f s, se sigue igual", timeout)
+
+
+def is_page_load_error(exc: Exception) -> bool:
+    """Si un error de `driver.get` es del sitio (red o carga de la página) y no de nuestro Chrome.
+
+    Cuentan los errores de red que informa Chrome (`net::ERR_...`) y el
+    timeout de carga de la página; una caída del driver, una sesión perdida
+    o un error hablando con chromedriver son locales.
+    """
+    from selenium.common.exceptions import TimeoutException, WebDriverException
+
+    if isinstance(exc, TimeoutException):
+        return True
+    return isinstance(exc, WebDriverException) and 'net::ERR_' in (exc.msg or '')
+
+
+# Bytes transferidos por la página según la Resource Timing API del navegador
+_TRANSFER_STATS_JS = """
+const entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+let bytes = 0;
+for (const e of entries) { bytes += e.transferSize || 0; }
+return {requests: entries.length, bytes: bytes};
+"""
+
+
+def transfer_stats(driver) -> Dict[str, int]:
+    """Cantidad de pedidos y bytes transferidos por la página actual"""
+    return driver.execute_script(_TRANSFER_STATS_JS)
@@ -0,0 +1,96 @@
+"""Datos en caché de cada scraper como snapshots inmutables.
+
+Cada tipo de dato de un scraper ('standings', 'fixtures') se guarda como un
+único `DataSnapshot` (filas compactas, momento de la actualización, número de
+versión y fuente) que se reemplaza entero en cada refresco. El scheduler, los
+refrescos manuales y las peticiones concurrentes pueden escribir a la vez,
+pero quien lee obtiene siempre un snapshot completo: nunca filas nuevas con el
+`last_update` anterior. Leer no toma locks (reemplazar una entrada de un dict
+es atómico); el lock sólo ordena a los escritores para numerar las versiones.
+
+Los atributos de siempre (`standings`, `last_update`, `fixtures`,
+`fixtures_update`) se mantienen como vistas del snapshot actual.
+"""
+import threading
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from .models import FixtureRow, Row, StandingRow, fixtures_to_dicts, standings_to_dicts, to_rows
+
+ROW_TYPES = {'standings': StandingRow, 'fixtures': FixtureRow}
+_SERIALIZERS = {'standings': standings_to_dicts, 'fixtures': fixtures_to_dicts}
+
+
+class DataSnapshot(NamedTuple):
+    source: str
+    kind: str
+    # Filas compactas; None si todavía no hay datos
+    rows: Optional[Tuple[Row, ...]]
+    last_update: Optional[str]
+    # Cantidad de reemplazos de este dato (0 = sin datos todavía). No es la
+    # versión de `?since`, que sólo cambia cuando cambia el contenido
+    version: int
+
+    def payload(self):
+        """Filas con la forma JSON de la API (dicts nuevos en cada llamada)"""
+        return _SERIALIZERS[self.kind](self.rows)
+
+    def response(self, error: Optional[str] = None) -> Dict:
+        return {"error": error, "last_update": self.last_update, self.kind: self.payload()}
+
+
+class ScraperCache:
+    def __init__(self, source: str):
+        self.source = source
+        self._snapshots: Dict[str, DataSnapshot] = {
+            kind: DataSnapshot(source, kind, None, None, 0) for kind in ROW_TYPES}
+        self._lock = threading.Lock()
+
+    def get(self, kind: str) -> DataSnapshot:
+        """Snapshot actual de `kind` (sin locks)"""
+        return self._snapshots[kind]
+
+    def swap(self, kind: str, rows, last_update: Optional[str] = None) -> DataSnapshot:
+        """Reemplaza el snapshot de `kind` por uno nuevo con `rows` y lo retorna"""
+        rows = to_rows(ROW_TYPES[kind], rows)
+        with self._lock:
+            snapshot = DataSnapshot(
+                self.source, kind, tuple(rows) if rows is not None else None,
+                last_update or datetime.now().isoformat(), self._snapshots[kind].version + 1)
+            self._snapshots[kind] = snapshot
+        return snapshot
+
+
+class CachedRows:
+    """Atributo de scraper con las filas del snapshot actual de `kind` como dicts.
+
+    Asignarle filas reemplaza el snapshot con la hora actual; se mantiene por
+    compatibilidad, los scrapers usan `cache.swap`.
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return instance.cache.get(self.kind).payload()
+
+    def __set__(self, instance, rows):
+        instance.cache.swap(self.kind, rows)
+
+
+class CachedTimestamp:
+    """Atributo de scraper con el `last_update` del snapshot actual de `kind`"""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return instance.cache.get(self.kind).last_update
+
+    def __set__(self, instance, last_update: Optional[str]):
+        cache = instance.cache
+        cache.swap(self.kind, cache.get(self.kind).rows, last_update)
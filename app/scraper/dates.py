@@ -0,0 +1,108 @@
+"""Fechas y horas de los partidos tal como las publican los sitios de origen.
+
+Los sitios publican la fecha y la hora como texto en formatos variados
+("02/05/2025", "9 de mayo", "Sáb 10/05", "21:00", "21h", "21.30 hs").
+`parse_match_datetime` las convierte al scrapear en un datetime con zona
+horaria de Argentina, que se guarda en el campo `inicio` de cada partido.
+"""
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional, Tuple
+
+try:
+    from zoneinfo import ZoneInfo
+    LEAGUE_TZ = ZoneInfo('America/Argentina/Buenos_Aires')
+except Exception:
+    # Sin base de zonas horarias (p.ej. imágenes slim sin tzdata): Argentina no
+    # tiene horario de verano desde 2009
+    LEAGUE_TZ = timezone(timedelta(hours=-3), 'ART')
+
+MONTHS = {
+    'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5, 'junio': 6, 'julio': 7,
+    'agosto': 8, 'septiembre': 9, 'setiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12,
+    'ene': 1, 'feb': 2, 'mar': 3, 'abr': 4, 'may': 5, 'jun': 6, 'jul': 7, 'ago': 8,
+    'sep': 9, 'sept': 9, 'set': 9, 'oct': 10, 'nov': 11, 'dic': 12,
+}
+
+_ISO_DATE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})')
+_NUMERIC_DATE = re.compile(r'(?<!\d)(\d{1,2})[/.-](\d{1,2})(?:[/.-](\d{4}|\d{2}))?(?!\d)')
+_TEXT_DATE = re.compile(r'(?<!\d)(\d{1,2})\s*(?:de\s+)?([a-záéíóú]{3,10})\.?(?:\s*(?:de(?:l)?\s+)?(\d{4}))?',
+                        re.IGNORECASE)
+_TIME = re.compile(r'(?<!\d)(\d{1,2})\s*(?::\s*(\d{2})|h(?:s|rs|oras)?\.?\s*(\d{2})?|\.(\d{2})\s*h)(?!\d)',
+                   re.IGNORECASE)
+# En el campo de la hora también se acepta "21.30" (en el de la fecha sería ambiguo)
+_TIME_FIELD = re.compile(r'^\s*(\d{1,2})\s*[.:]\s*(\d{2})(?!\d)')
+
+# Un partido sin año se asume dentro de este margen alrededor de la fecha del scraping
+_YEAR_WINDOW_DAYS = 183
+
+
+def _infer_year(day: int, month: int, reference: date) -> Optional[date]:
+    try:
+        candidate = date(reference.year, month, day)
+    except ValueError:
+        return None
+    if (candidate - reference).days < -_YEAR_WINDOW_DAYS:
+        return _safe_date(reference.year + 1, month, day)
+    if (candidate - reference).days > _YEAR_WINDOW_DAYS:
+        return _safe_date(reference.year - 1, month, day)
+    return candidate
+
+
+def _safe_date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def parse_match_date(text: str, reference: date) -> Tuple[Optional[date], str]:
+    """Fecha del texto y el resto del texto (por si también trae la hora)"""
+    match = _ISO_DATE.search(text)
+    if match:
+        year, month, day = (int(g) for g in match.groups())
+        return _safe_date(year, month, day), text[:match.start()] + text[match.end():]
+    match = _NUMERIC_DATE.search(text)
+    if match:
+        day, month, year = match.group(1), match.group(2), match.group(3)
+        rest = text[:match.start()] + text[match.end():]
+        if year:
+            year = int(year) + (2000 if len(year) == 2 else 0)
+            return _safe_date(year, int(month), int(day)), rest
+        return _infer_year(int(day), int(month), reference), rest
+    for match in _TEXT_DATE.finditer(text):
+        word = match.group(2).lower()
+        month = MONTHS.get(word) or MONTHS.get(word[:3])
+        if not month:
+            continue
+        rest = text[:match.start()] + text[match.end():]
+        if match.group(3):
+            return _safe_date(int(match.group(3)), month, int(match.group(1))), rest
+        return _infer_year(int(match.group(1)), month, reference), rest
+    return None, text
+
+
+def parse_match_time(text: str, time_field: bool = False) -> Optional[time]:
+    match = _TIME_FIELD.match(text or '') if time_field else None
+    if match is None:
+        match = _TIME.search(text or '')
+    if not match:
+        return None
+    hour = int(match.group(1))
+    minute = int(next((g for g in match.groups()[1:] if g), 0))
+    if hour > 23 or minute > 59:
+        return None
+    return time(hour, minute)
+
+
+def parse_match_datetime(fecha: str, hora: str, reference: Optional[date] = None) -> Optional[datetime]:
+    """Inicio del partido con zona horaria, o None si la fecha no se puede interpretar.
+
+    Si no hay hora se usa la medianoche del día del partido.
+    """
+    reference = reference or datetime.now(LEAGUE_TZ).date()
+    match_date, rest = parse_match_date(fecha or '', reference)
+    if match_date is None:
+        return None
+    match_time = parse_match_time(hora, time_field=True) or parse_match_time(rest) or time(0, 0)
+    return datetime.combine(match_date, match_time, tzinfo=LEAGUE_TZ)
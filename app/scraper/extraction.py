@@ -0,0 +1,137 @@
+"""Extracción de filas a partir del HTML, opcionalmente en procesos aparte.
+
+El parseo con BeautifulSoup y la búsqueda de tablas y partidos son Python
+puro que retiene el GIL: mientras se refrescan varias ligas a la vez, el
+mismo worker atiende más lento las peticiones a la API. Con
+`EXTRACTION_PROCESSES=N` (0 por defecto, sin pool) el HTML se manda a un
+pool de N procesos que devuelven sólo las filas compactas ya extraídas
+(`StandingRow`/`FixtureRow`) y las URLs de los iframes.
+
+Los procesos se crean con `spawn` (no heredan threads ni locks del servidor)
+y, salvo `EXTRACTION_WARMUP=0`, se levantan e importan BeautifulSoup y los
+scrapers al arrancar la API, para que el primer refresco no pague ese costo.
+Si el pool falla, la extracción se hace en el proceso principal.
+
+Las etapas que corren en el pool se miden en el proceso hijo y sus
+duraciones y spans vuelven con las filas: el principal las registra en
+`/metrics` y en la traza del scraping, bajo un span `extract_pool` que mide
+la etapa completa (incluido el envío del HTML).
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .. import tracing
+from ..metrics import SCRAPE_PHASE_DURATION, capture_phases, record_phases
+from .snapshots import page_snapshots
+
+logger = logging.getLogger(__name__)
+
+PROCESSES = int(os.environ.get('EXTRACTION_PROCESSES', '0'))
+WARMUP = os.environ.get('EXTRACTION_WARMUP', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+class PageExtraction(NamedTuple):
+    # Filas extraídas; None si la página no tiene la tabla buscada
+    rows: Optional[List]
+    # `src` de cada iframe de la página (puede ser None), en orden
+    iframes: List[Optional[str]]
+
+
+# En cada proceso del pool: una instancia de scraper por clase y fuente
+_worker_scrapers: Dict[Tuple[type, str], object] = {}
+
+
+def _worker_scraper(scraper_type: type, name: str):
+    scraper = _worker_scrapers.get((scraper_type, name))
+    if scraper is None:
+        # Los extractores sólo usan `name` (para métricas y logs), no el estado del scraper
+        scraper = scraper_type.__new__(scraper_type)
+        scraper.name = name
+        _worker_scrapers[(scraper_type, name)] = scraper
+    return scraper
+
+
+def _extract_in_worker(scraper_type: type, name: str, html: str, kind: str):
+    """Extracción en un proceso del pool: retorna las filas, los spans y las duraciones de las fases"""
+    with tracing.capture() as root, capture_phases() as phases:
+        extraction = _worker_scraper(scraper_type, name)._extract_page(html, kind)
+    return extraction, root.children, phases
+
+
+def _init_worker():
+    """Configura el logging e importa BeautifulSoup y los scrapers al crear cada proceso del pool"""
+    from ..logs import setup_logging
+    setup_logging()
+    from .parsing import parse_html
+    from . import basketball_scraper, voley_scraper  # noqa: F401
+    parse_html('<html><body><table><tr><td>1</td></tr></table></body></html>')
+
+
+def _ping(delay: float) -> int:
+    # Tarea mínima para forzar que el pool cree todos sus procesos
+    time.sleep(delay)
+    return os.getpid()
+
+
+class ExtractionPool:
+    def __init__(self, processes: int = PROCESSES):
+        self.processes = processes
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.processes > 0
+
+    def start(self, warmup: bool = WARMUP):
+        """Crea el pool (si está habilitado) y, con `warmup`, espera a que cada proceso esté listo"""
+        if not self.enabled:
+            return
+        executor = self._get_executor()
+        if warmup:
+            pids = set(executor.map(_ping, [0.05] * self.processes))
+            logger.info("Pool de extracción listo: %s procesos", len(pids))
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes, mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker)
+            return self._executor
+
+    def extract(self, scraper, html: str, kind: str) -> PageExtraction:
+        """Filas de `kind` en la página, reutilizando el resultado si la página ya se extrajo"""
+        return page_snapshots.memo(html, ('extract', kind), lambda: self._extract(scraper, html, kind))
+
+    def _extract(self, scraper, html: str, kind: str) -> PageExtraction:
+        if not self.enabled:
+            return scraper._extract_page(html, kind)
+        try:
+            with SCRAPE_PHASE_DURATION.time(source=scraper.name, phase='extract_pool'), \
+                    tracing.span('extract_pool', kind=kind):
+                future = self._get_executor().submit(_extract_in_worker, type(scraper), scraper.name, html, kind)
+                extraction, spans, phases = future.result()
+                tracing.adopt(spans)
+                record_phases(phases)
+                return extraction
+        except BrokenProcessPool as e:
+            logger.error("El pool de extracción se rompió (%s), se extrae en el proceso principal", e)
+            with self._lock:
+                self._executor = None
+            return scraper._extract_page(html, kind)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+extraction_pool = ExtractionPool()
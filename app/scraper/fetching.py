@@ -0,0 +1,110 @@
+"""Descarga de páginas y ejecución de los pasos de scraping.
+
+Los scrapers describen su recorrido (página principal, iframes, URLs
+alternativas) como un generador que hace `yield` de cada URL que necesita y
+recibe el HTML descargado. Así el mismo recorrido se ejecuta con `requests`
+desde el scheduler (`run_steps`) o con el motor async desde las rutas de
+FastAPI (`arun_steps`). Los errores de descarga se lanzan dentro del
+generador para que cada paso los maneje igual que antes.
+
+Si está definida `UPSTREAM_BASE_URL` (p.ej. `http://127.0.0.1:8081`), todas
+las descargas se redirigen a ese servidor como `<base>/<host>/<path>`; es la
+forma de apuntar los scrapers al simulador de `benchmarks/upstream_simulator.py`.
+"""
+import asyncio
+import logging
+import os
+from typing import Callable, Dict, Generator, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from .. import tracing
+from ..metrics import UPSTREAM_RESPONSES
+from .resilience import DEFAULT_RETRY_POLICY, RetryPolicy, call_with_resilience
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 15
+
+# Generador de pasos: hace yield de URLs, recibe HTML y retorna el resultado
+ScrapeSteps = Generator[str, str, Dict]
+
+
+def resolve_upstream_url(url: str) -> str:
+    """URL a la que hay que pedir realmente la página (el original o el simulador)"""
+    base = os.environ.get('UPSTREAM_BASE_URL')
+    if not base:
+        return url
+    parts = urlsplit(url)
+    resolved = f"{base.rstrip('/')}/{parts.netloc}{parts.path or '/'}"
+    return f"{resolved}?{parts.query}" if parts.query else resolved
+
+
+def fetch_text(url: str, headers: Optional[Dict] = None, timeout: float = DEFAULT_TIMEOUT,
+               retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY) -> str:
+    """Descarga una URL con requests (con reintentos y circuit breaker) y devuelve el HTML"""
+    host = urlsplit(url).netloc.lower()
+    tracing.annotate(url=url)
+
+    def fetch_once():
+        try:
+            response = requests.get(resolve_upstream_url(url), headers=headers, timeout=timeout)
+        except requests.Timeout:
+            UPSTREAM_RESPONSES.inc(host=host, status='timeout')
+            raise
+        except requests.RequestException:
+            UPSTREAM_RESPONSES.inc(host=host, status='error')
+            raise
+        UPSTREAM_RESPONSES.inc(host=host, status=str(response.status_code))
+        tracing.annotate(status=response.status_code)
+        logger.debug("Código de respuesta %d para %s", response.status_code, url)
+        response.raise_for_status()
+        return response.text
+
+    return call_with_resilience(url, fetch_once, retry_policy)
+
+
+def _advance(steps: ScrapeSteps, value: Optional[str] = None, error: Optional[Exception] = None):
+    """Avanza el generador un paso; retorna (terminado, url_o_resultado)"""
+    try:
+        if error is not None:
+            return False, steps.throw(error)
+        return False, steps.send(value)
+    except StopIteration as stop:
+        return True, stop.value
+
+
+def run_steps(steps: ScrapeSteps, fetch: Callable[[str], str]) -> Dict:
+    """Ejecuta los pasos de scraping de forma sincrónica"""
+    done, result = _advance(steps)
+    while not done:
+        try:
+            text = fetch(result)
+        except requests.RequestException as e:
+            done, result = _advance(steps, error=e)
+        else:
+            done, result = _advance(steps, text)
+    return result
+
+
+async def arun_steps(steps: ScrapeSteps, fetch) -> Dict:
+    """Ejecuta los pasos de scraping esperando cada descarga.
+
+    El parseo entre descargas es CPU puro, así que se corre en un thread para
+    no bloquear el event loop mientras se atienden otras peticiones.
+    """
+    try:
+        done, result = await asyncio.to_thread(_advance, steps)
+        while not done:
+            try:
+                text = await fetch(result)
+            except requests.RequestException as e:
+                done, result = await asyncio.to_thread(_advance, steps, None, e)
+            else:
+                done, result = await asyncio.to_thread(_advance, steps, text)
+        return result
+    finally:
+        # Si la tarea se canceló a mitad de camino, liberar el generador
+        if not steps.gi_running:
+            steps.close()
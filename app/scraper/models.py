@@ -0,0 +1,122 @@
+"""Registros compactos para las filas de posiciones y fixtures.
+
+Los scrapers producen `StandingRow` y `FixtureRow` (NamedTuple: campos fijos
+y tipados, sin un dict por fila) y los guardan así en caché. Hacia afuera se
+siguen exponiendo con la forma JSON de siempre mediante `standings_to_dicts`
+y `fixtures_to_dicts` (ver `cache.py`, que serializa al leer).
+
+Medido con `benchmarks/bench_row_memory.py`, 1000 filas de posiciones ocupan
+~245 KiB contra ~680 KiB como dicts con los números como strings (voley) y
+~385 KiB como dicts con ints (básquet).
+"""
+import re
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+from .dates import parse_match_datetime
+
+_NUMBER = re.compile(r'[-+]?\d*\.?\d+')
+
+
+def parse_int(value) -> int:
+    """Convierte de manera segura un texto de la tabla a int (0 si no hay número)"""
+    try:
+        if isinstance(value, str):
+            value = value.replace(',', '.').strip()
+            if value in ('-', 'N/A', '', '—'):
+                return 0
+            numeric_part = _NUMBER.search(value)
+            if numeric_part:
+                return int(float(numeric_part.group()))
+            return 0
+        if isinstance(value, (int, float)):
+            return int(value)
+        return 0
+    except (ValueError, AttributeError):
+        return 0
+
+
+class StandingRow(NamedTuple):
+    """Fila de una tabla de posiciones. Los campos en None no vinieron en la tabla"""
+    posicion: int
+    equipo: str
+    puntos: Optional[int] = None
+    jugados: Optional[int] = None
+    ganados: Optional[int] = None
+    perdidos: Optional[int] = None
+    favor: Optional[int] = None
+    contra: Optional[int] = None
+    diferencia: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'StandingRow':
+        values = {field: parse_int(data[field]) for field in _STANDING_NUMBERS if data.get(field) is not None}
+        # Los nombres de equipo se repiten en cada refresco y en el historial
+        return cls(parse_int(data.get('posicion')), sys.intern(str(data.get('equipo', '')).strip()), **values)
+
+
+class FixtureRow(NamedTuple):
+    """Partido pendiente de un fixture.
+
+    `inicio` es la fecha y hora normalizadas (con zona horaria) a partir de
+    los textos `fecha` y `hora`; None si no se pudieron interpretar.
+    """
+    local: str
+    visitante: str
+    fecha: str
+    hora: str
+    es_casa_local: bool
+    inicio: Optional[datetime] = None
+
+    @classmethod
+    def create(cls, local: str, visitante: str, fecha: str, hora: str, es_casa_local: bool) -> 'FixtureRow':
+        """Partido recién scrapeado: normaliza la fecha y hora al crearlo"""
+        return cls(sys.intern(local), sys.intern(visitante), fecha, hora, es_casa_local,
+                   parse_match_datetime(fecha, hora))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'FixtureRow':
+        start = data.get('inicio')
+        if isinstance(start, str):
+            start = datetime.fromisoformat(start)
+        fecha, hora = str(data.get('fecha', '')), str(data.get('hora', ''))
+        return cls(sys.intern(str(data.get('local', ''))), sys.intern(str(data.get('visitante', ''))),
+                   fecha, hora, bool(data.get('es_casa_local')), start or parse_match_datetime(fecha, hora))
+
+
+_STANDING_FIELDS = StandingRow._fields
+_STANDING_NUMBERS = _STANDING_FIELDS[2:]
+_FIXTURE_FIELDS = FixtureRow._fields
+
+Row = Union[StandingRow, FixtureRow]
+
+
+def standings_to_dicts(rows: Optional[Iterable[StandingRow]]) -> Optional[List[Dict]]:
+    """Filas de posiciones con la forma JSON de la API (sin los campos ausentes)"""
+    if rows is None:
+        return None
+    fields = _STANDING_FIELDS
+    return [{key: value for key, value in zip(fields, row) if value is not None} for row in rows]
+
+
+def fixtures_to_dicts(rows: Optional[Iterable[FixtureRow]]) -> Optional[List[Dict]]:
+    """Partidos con la forma JSON de la API (`inicio` en formato ISO 8601)"""
+    if rows is None:
+        return None
+    fields = _FIXTURE_FIELDS
+    result = []
+    for row in rows:
+        item = dict(zip(fields, row))
+        if row.inicio is not None:
+            item['inicio'] = row.inicio.isoformat()
+        result.append(item)
+    return result
+
+
+def to_rows(row_type, rows) -> Optional[List[Row]]:
+    """Convierte filas en dicts (o ya compactas) a registros `row_type`"""
+    if rows is None:
+        return None
+    return [row if isinstance(row, row_type) else row_type.from_dict(row) for row in rows]
+
@@ -0,0 +1,11 @@
+"""Utilidades de parseo compartidas por los scrapers.
+
+BeautifulSoup y su backend de parseo se importan recién en el primer uso para
+no pagar ese costo al arrancar la API cuando sólo se sirven datos en caché.
+"""
+
+
+def parse_html(html: str):
+    """Parsea el HTML con BeautifulSoup usando el parser incluido en Python"""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, 'html.parser')
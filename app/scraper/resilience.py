@@ -0,0 +1,251 @@
+"""Reintentos con backoff y circuit breaker por host de origen.
+
+Cada host (argentina.basketball, metrovoley.com.ar, gesdeportiva, ...) tiene
+su propio circuit breaker. Mientras un host está caído el breaker queda
+abierto y las descargas fallan al instante con `CircuitOpenError`, así los
+scrapers devuelven enseguida los datos en caché en lugar de esperar el
+timeout de cada URL. Pasado `reset_timeout` se deja pasar una petición de
+prueba (half-open) y, si responde, el breaker se vuelve a cerrar.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, TypeVar
+from urllib.parse import urlsplit
+
+import requests
+
+from .. import tracing
+from ..metrics import GaugeCallback
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class FetchError(requests.RequestException):
+    """Error de descarga del motor async.
+
+    Hereda de `requests.RequestException` para que los pasos de scraping
+    manejen igual los errores del camino sincrónico y del asincrónico.
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None, is_timeout: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.is_timeout = is_timeout
+
+
+class CircuitOpenError(requests.RequestException):
+    """El host está marcado como caído y la petición no se realizó"""
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 2, base_delay: float = 0.5, max_delay: float = 4.0,
+                 retry_on_timeout: bool = False):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # Un timeout ya costó el tiempo máximo de espera: por defecto no se
+        # reintenta, sólo cuenta como falla para el breaker
+        self.retry_on_timeout = retry_on_timeout
+
+    def delay(self, attempt: int) -> float:
+        """Backoff exponencial con jitter completo"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+def _status_code(exc: Exception) -> Optional[int]:
+    if isinstance(exc, FetchError):
+        return exc.status_code
+    response = getattr(exc, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+def classify_error(exc: Exception) -> str:
+    """Clasifica un error de descarga: 'timeout', 'transient' o 'permanent'"""
+    if isinstance(exc, CircuitOpenError):
+        return 'permanent'
+    if isinstance(exc, requests.Timeout) or (isinstance(exc, FetchError) and exc.is_timeout):
+        return 'timeout'
+    status = _status_code(exc)
+    if status is not None:
+        return 'transient' if status >= 500 or status == 429 else 'permanent'
+    if isinstance(exc, (requests.ConnectionError, FetchError)):
+        return 'transient'
+    return 'permanent'
+
+
+class CircuitBreaker:
+    def __init__(self, host: str, failure_threshold: int = 3, reset_timeout: float = 60.0):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        # Contadores para el estado expuesto por la API
+        self.total_failures = 0
+        self.total_retries = 0
+        self.short_circuited = 0
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state != CLOSED:
+                if time.monotonic() - self.opened_at >= self.reset_timeout:
+                    # Dejar pasar una única petición de prueba por ventana
+                    self.state = HALF_OPEN
+                    self.opened_at = time.monotonic()
+                    logger.info("Circuit breaker de %s en half-open: probando el host", self.host)
+                    return True
+                self.short_circuited += 1
+                return False
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("Circuit breaker de %s cerrado: el host volvió a responder", self.host)
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.total_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.times_opened += 1
+                    logger.warning("Circuit breaker de %s abierto tras %s fallas consecutivas",
+                                   self.host, self.consecutive_failures)
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def record_retry(self):
+        with self._lock:
+            self.total_retries += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            retry_in = None
+            if self.state != CLOSED:
+                retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            return {
+                "host": self.host,
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "total_failures": self.total_failures,
+                "total_retries": self.total_retries,
+                "short_circuited": self.short_circuited,
+                "times_opened": self.times_opened,
+                "retry_in_seconds": round(retry_in, 1) if retry_in is not None else None,
+            }
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    """Circuit breaker del host de la URL (se crea en el primer uso)"""
+    host = urlsplit(url).netloc.lower()
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host)
+            _breakers[host] = breaker
+        return breaker
+
+
+def breaker_states() -> List[Dict]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [breaker.snapshot() for breaker in breakers]
+
+
+# Valor numérico de cada estado para el gauge de Prometheus
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+GaugeCallback(
+    'padua_upstream_circuit_state',
+    'Estado del circuit breaker por host (0=cerrado, 1=half-open, 2=abierto)',
+    ['host'],
+    lambda: [({'host': state['host']}, _STATE_VALUES[state['state']]) for state in breaker_states()])
+GaugeCallback(
+    'padua_upstream_short_circuited',
+    'Peticiones evitadas por tener el circuit breaker abierto',
+    ['host'],
+    lambda: [({'host': state['host']}, state['short_circuited']) for state in breaker_states()])
+
+
+def _handle_error(breaker: CircuitBreaker, url: str, exc: Exception, attempt: int,
+                  policy: RetryPolicy) -> bool:
+    """Registra el error en el breaker y decide si corresponde reintentar"""
+    kind = classify_error(exc)
+    if kind == 'permanent':
+        if _status_code(exc) is not None:
+            # El host respondió (p.ej. 404): está sano aunque la URL no sirva
+            breaker.record_success()
+        elif breaker.state == HALF_OPEN:
+            # La prueba no mostró que el host responda: volver a abrir hasta la próxima ventana
+            breaker.record_failure()
+        return False
+    breaker.record_failure()
+    if kind == 'timeout' and not policy.retry_on_timeout:
+        return False
+    if attempt + 1 >= policy.max_attempts or breaker.state == OPEN:
+        return False
+    breaker.record_retry()
+    tracing.annotate(retries=attempt + 1)
+    logger.info("Error transitorio en %s (%s); reintento %d/%d", url, exc, attempt + 2, policy.max_attempts)
+    return True
+
+
+def call_with_resilience(url: str, fn: Callable[[], T],
+                         policy: RetryPolicy = DEFAULT_RETRY_POLICY) -> T:
+    """Ejecuta una descarga sincrónica aplicando reintentos y circuit breaker"""
+    breaker = get_breaker(url)
+    attempt = 0
+    while True:
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Host {breaker.host} no disponible (circuit breaker abierto)")
+        try:
+            result = fn()
+        except requests.RequestException as e:
+            if not _handle_error(breaker, url, e, attempt, policy):
+                raise
+            time.sleep(policy.delay(attempt))
+            attempt += 1
+            continue
+        breaker.record_success()
+        return result
+
+
+async def acall_with_resilience(url: str, fn, policy: RetryPolicy = DEFAULT_RETRY_POLICY):
+    """Versión async de call_with_resilience; `fn` devuelve un awaitable"""
+    breaker = get_breaker(url)
+    attempt = 0
+    while True:
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Host {breaker.host} no disponible (circuit breaker abierto)")
+        try:
+            result = await fn()
+        except requests.RequestException as e:
+            if not _handle_error(breaker, url, e, attempt, policy):
+                raise
+            await asyncio.sleep(policy.delay(attempt))
+            attempt += 1
+            continue
+        breaker.record_success()
+        return result
@@ -0,0 +1,273 @@
+"""Páginas descargadas compartidas entre extractores.
+
+Posiciones y fixtures de básquet salen de la misma página de la liga, y un
+refresco completo pide varias veces las mismas URLs. `PageSnapshots` guarda
+el texto de cada página descargada, por URL, durante `PAGE_SNAPSHOT_SECONDS`:
+otra descarga de la misma URL dentro de esa ventana recibe el mismo HTML.
+Las filas extraídas de una página se guardan junto a ella, identificadas por
+el hash del contenido, así cada tipo de dato se extrae una sola vez por
+página (los árboles de BeautifulSoup no se guardan: ocupan varias veces lo
+que el HTML).
+
+Si dos extractores piden una URL al mismo tiempo, el segundo espera la
+descarga del primero en lugar de hacer otra, sean sync o async (comparten el
+mismo registro de descargas en curso). Si la descarga falla, los que
+esperaban reciben el mismo error; si se cancela la tarea que descargaba, los
+que esperaban la reintentan por su cuenta. Los errores no se guardan: el
+próximo pedido vuelve a intentar.
+
+Los refrescos explícitos corren dentro de `page_snapshots.fresh_only()`: no
+reutilizan páginas descargadas antes de empezar (sí las descargas que ya
+estaban en curso), así un refresco manual nunca responde con el HTML viejo.
+
+`plan_refresh` agrupa las extracciones de un refresco completo por la URL de
+la que parten, para descargar cada página una sola vez antes de extraer.
+"""
+import asyncio
+import contextlib
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+# Ventana en la que una página descargada se reutiliza
+SNAPSHOT_SECONDS = float(os.environ.get('PAGE_SNAPSHOT_SECONDS', '30'))
+# Páginas que se conservan a la vez (sólo el HTML y las filas extraídas)
+MAX_PAGES = 16
+
+PAGE_SNAPSHOT_REQUESTS = Counter(
+    'padua_page_snapshot_requests_total',
+    'Pedidos de páginas por resultado: descargada, reutilizada o esperando otra descarga en curso',
+    ['result'])
+
+# Momento (time.monotonic) desde el cual tiene que ser una página para reutilizarse
+_not_before: ContextVar[Optional[float]] = ContextVar('padua_page_snapshots_not_before', default=None)
+
+
+def content_digest(html: str) -> str:
+    return hashlib.blake2b(html.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+
+class _DownloadAbandoned(Exception):
+    """La tarea dueña de una descarga compartida se canceló antes de terminarla"""
+
+
+class _Page:
+    __slots__ = ('url', 'html', 'digest', 'fetched_at', 'results', 'locks', 'lock')
+
+    def __init__(self, url: str, html: str):
+        self.url = url
+        self.html = html
+        self.digest = content_digest(html)
+        self.fetched_at = time.monotonic()
+        # Resultados calculados a partir del HTML (filas extraídas)
+        self.results: Dict = {}
+        # Un lock por resultado: distintos resultados de una página se calculan en paralelo
+        self.locks: Dict = {}
+        self.lock = threading.Lock()
+
+
+class _Download:
+    """Descarga en curso de una URL, esperada por threads o por tareas de cualquier event loop"""
+
+    def __init__(self):
+        self.html: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self._done = threading.Event()
+        self._futures: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._lock = threading.Lock()
+
+    def finish(self, html: Optional[str] = None, error: Optional[BaseException] = None):
+        with self._lock:
+            self.html, self.error = html, error
+            self._done.set()
+            futures, self._futures = self._futures, []
+        for loop, future in futures:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_resolve, future)
+
+    def result(self) -> str:
+        if self.error is not None:
+            raise self.error
+        return self.html
+
+    def wait(self) -> str:
+        self._done.wait()
+        return self.result()
+
+    async def await_result(self) -> str:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if not self._done.is_set():
+                self._futures.append((loop, future))
+            else:
+                future.set_result(None)
+        await future
+        return self.result()
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class PageSnapshots:
+    def __init__(self, ttl: float = SNAPSHOT_SECONDS, max_pages: int = MAX_PAGES):
+        self.ttl = ttl
+        self.max_pages = max_pages
+        self._pages: 'OrderedDict[str, _Page]' = OrderedDict()
+        # hash del contenido -> página, para encontrar las filas ya extraídas a partir del HTML
+        self._by_digest: Dict[str, _Page] = {}
+        # Descargas en curso por URL (compartidas entre pedidos sync y async)
+        self._inflight: Dict[str, _Download] = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, url: str) -> Optional[_Page]:
+        page = self._pages.get(url)
+        if page is None:
+            return None
+        if time.monotonic() - page.fetched_at > self.ttl:
+            self._drop(url)
+            return None
+        not_before = _not_before.get()
+        if not_before is not None and page.fetched_at < not_before:
+            return None
+        return page
+
+    def _drop(self, url: str):
+        page = self._pages.pop(url, None)
+        if page is not None and self._by_digest.get(page.digest) is page:
+            del self._by_digest[page.digest]
+
+    def _store(self, url: str, html: str):
+        page = _Page(url, html)
+        with self._lock:
+            self._drop(url)
+            self._pages[url] = page
+            self._by_digest[page.digest] = page
+            while len(self._pages) > self.max_pages:
+                self._drop(next(iter(self._pages)))
+
+    def _claim(self, url: str) -> Tuple[Optional[str], _Download, bool]:
+        """(HTML reciente o None, descarga en curso, si la descarga es propia)"""
+        with self._lock:
+            page = self._fresh(url)
+            if page is not None:
+                PAGE_SNAPSHOT_REQUESTS.inc(result='reutilizada')
+                return page.html, None, False
+            download = self._inflight.get(url)
+            if download is None:
+                download = self._inflight[url] = _Download()
+                PAGE_SNAPSHOT_REQUESTS.inc(result='descargada')
+                return None, download, True
+        PAGE_SNAPSHOT_REQUESTS.inc(result='esperada')
+        return None, download, False
+
+    def _settle(self, url: str, download: _Download, html: Optional[str] = None,
+                error: Optional[BaseException] = None):
+        if html is not None:
+            self._store(url, html)
+        with self._lock:
+            if self._inflight.get(url) is download:
+                del self._inflight[url]
+        download.finish(html, error)
+
+    def fetch(self, url: str, download: Callable[[], str]) -> str:
+        """HTML de `url`, descargado con `download()` sólo si no hay uno reciente"""
+        while True:
+            html, shared, owner = self._claim(url)
+            if html is not None:
+                return html
+            if owner:
+                break
+            try:
+                return shared.wait()
+            except _DownloadAbandoned:
+                # Se canceló quien descargaba: intentar con una descarga propia
+                continue
+        try:
+            html = download()
+        except Exception as e:
+            self._settle(url, shared, error=e)
+            raise
+        except BaseException:
+            self._settle(url, shared, error=_DownloadAbandoned(url))
+            raise
+        self._settle(url, shared, html=html)
+        return html
+
+    async def afetch(self, url: str, download: Callable[[], Awaitable[str]]) -> str:
+        """Versión async de fetch: los pedidos simultáneos comparten la misma descarga"""
+        while True:
+            html, shared, owner = self._claim(url)
+            if html is not None:
+                return html
+            if owner:
+                break
+            try:
+                return await shared.await_result()
+            except _DownloadAbandoned:
+                continue
+        try:
+            html = await download()
+        except Exception as e:
+            self._settle(url, shared, error=e)
+            raise
+        except BaseException:
+            # Los que esperan no se cancelan con el dueño: reciben _DownloadAbandoned y reintentan
+            self._settle(url, shared, error=_DownloadAbandoned(url))
+            raise
+        self._settle(url, shared, html=html)
+        return html
+
+    @contextlib.contextmanager
+    def fresh_only(self):
+        """Dentro del bloque no se reutilizan páginas descargadas antes de entrar"""
+        token = _not_before.set(time.monotonic())
+        try:
+            yield
+        finally:
+            _not_before.reset(token)
+
+    def memo(self, html: str, key, compute: Callable[[], object]):
+        """`compute()` calculado una sola vez por página guardada (según su contenido) y `key`"""
+        digest = content_digest(html)
+        with self._lock:
+            page = self._by_digest.get(digest)
+        if page is None:
+            return compute()
+        with page.lock:
+            key_lock = page.locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in page.results:
+                page.results[key] = compute()
+            return page.results[key]
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+            self._by_digest.clear()
+
+
+page_snapshots = PageSnapshots()
+
+
+def plan_refresh(extractions: Iterable[Tuple[str, str, Optional[str]]]) -> 'OrderedDict[str, List[Tuple[str, str]]]':
+    """Agrupa extracciones `(fuente, tipo, url)` por URL de entrada.
+
+    Las extracciones sin URL (p.ej. las que navegan con Chrome) no se incluyen.
+    """
+    plan: 'OrderedDict[str, List[Tuple[str, str]]]' = OrderedDict()
+    for source, kind, url in extractions:
+        if url:
+            plan.setdefault(url, []).append((source, kind))
+    return plan
@@ -0,0 +1,357 @@
+"""Supervisión de los procesos de Chrome que abren los scrapers.
+
+Cada navegador se abre con `browser_supervisor.session(...)`, que registra el
+árbol de procesos (chromedriver y todos los chrome que cuelgan de él) y al
+salir, con o sin error, cierra el driver y mata lo que haya quedado vivo.
+
+La sesión se registra antes de crear el driver y `create_driver` recibe una
+función para avisar el pid de chromedriver apenas lo lanza: el árbol de cada
+sesión sale siempre de su propio chromedriver (nunca de comparar los hijos
+de este proceso, que con varias sesiones arrancando a la vez mezclaría los
+navegadores de una con los de otra), y un arranque colgado también queda
+cubierto por el plazo.
+
+Un thread vigía revisa las sesiones abiertas cada `WATCHDOG_INTERVAL`
+segundos y mata el árbol completo de una sesión si:
+
+- la memoria residente de todos los navegadores supera `BROWSER_RSS_LIMIT_MB`
+  (se mata la sesión que más consume)
+- la sesión lleva más de `BROWSER_DEADLINE_SECONDS` abierta
+
+Los procesos que sobreviven al cierre de su sesión (p.ej. chrome que quedó
+huérfano cuando murió chromedriver) se recuerdan y se vuelven a matar en la
+siguiente pasada. La memoria y los árboles de procesos se leen de `/proc`;
+en sistemas sin `/proc` sólo se cierra el driver y se mata chromedriver.
+"""
+import itertools
+import logging
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from ..metrics import Counter, GaugeCallback
+
+logger = logging.getLogger(__name__)
+
+# Memoria máxima de todos los navegadores juntos (pensado para instancias de 512 MB)
+RSS_LIMIT_MB = float(os.environ.get('BROWSER_RSS_LIMIT_MB', '300'))
+# Tiempo máximo de una sesión de navegador
+DEADLINE_SECONDS = float(os.environ.get('BROWSER_DEADLINE_SECONDS', '90'))
+WATCHDOG_INTERVAL = 2.0
+# Tiempo que se le da a Chrome para terminar solo después de driver.quit()
+QUIT_GRACE_SECONDS = 2.0
+
+PROC_DIR = '/proc'
+
+BROWSER_KILLS = Counter(
+    'padua_browser_kills_total',
+    'Árboles de procesos de Chrome terminados por el supervisor por motivo',
+    ['reason'])
+
+# Un pid más su instante de arranque identifica un proceso aunque el pid se reutilice
+ProcessId = Tuple[int, int]
+
+
+def _stat_fields(pid: int) -> Optional[List[str]]:
+    try:
+        with open(f"{PROC_DIR}/{pid}/stat") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # El nombre del proceso va entre paréntesis y puede tener espacios
+    return data[data.rfind(')') + 2:].split()
+
+
+def _process_id(pid: int) -> Optional[ProcessId]:
+    fields = _stat_fields(pid)
+    if fields is None or fields[0] == 'Z':
+        return None
+    return pid, int(fields[19])
+
+
+def _children_map() -> Dict[int, List[int]]:
+    children: Dict[int, List[int]] = {}
+    try:
+        entries = os.listdir(PROC_DIR)
+    except OSError:
+        return children
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        fields = _stat_fields(int(entry))
+        if fields is not None:
+            children.setdefault(int(fields[1]), []).append(int(entry))
+    return children
+
+
+def process_tree(root: int, children: Optional[Dict[int, List[int]]] = None) -> List[int]:
+    """`root` y todos sus descendientes"""
+    children = _children_map() if children is None else children
+    tree, pending = [], [root]
+    while pending:
+        pid = pending.pop()
+        tree.append(pid)
+        pending.extend(children.get(pid, ()))
+    return tree
+
+
+def rss_bytes(pid: int) -> int:
+    try:
+        with open(f"{PROC_DIR}/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _kill(process: ProcessId) -> bool:
+    """Mata el proceso si sigue siendo el mismo (no un pid reutilizado)"""
+    pid, started = process
+    if _process_id(pid) != (pid, started):
+        return False
+    try:
+        os.kill(pid, signal.SIGKILL)
+        return True
+    except OSError:
+        return False
+
+
+class BrowserSession:
+    def __init__(self, session_id: int, source: str, driver, deadline: float):
+        self.id = session_id
+        self.source = source
+        self.driver = driver
+        self.started = time.monotonic()
+        self.deadline = deadline
+        self.rss = 0
+        self.killed: Optional[str] = None
+        # Los modifican el vigía y el thread que usa el navegador
+        self._processes: Set[ProcessId] = set()
+        self._started: List[ProcessId] = []
+        self._lock = threading.Lock()
+
+    @property
+    def root_pid(self) -> Optional[int]:
+        process = getattr(getattr(self.driver, 'service', None), 'process', None)
+        if process is None or process.poll() is not None:
+            return None
+        return process.pid
+
+    def track(self, pid: int):
+        """Registra el pid de chromedriver en cuanto se lanza (antes de que el driver exista)"""
+        process = _process_id(pid)
+        if process is None:
+            return
+        with self._lock:
+            if process not in self._started:
+                self._started.append(process)
+
+    @property
+    def processes(self) -> Set[ProcessId]:
+        with self._lock:
+            return set(self._processes)
+
+    def _roots(self) -> List[int]:
+        with self._lock:
+            started = list(self._started)
+        # Un pid que ya no es el mismo proceso (murió y se reutilizó) no es raíz de nada
+        roots = [pid for pid, _ in started if _process_id(pid) == (pid, _)]
+        root = self.root_pid
+        if root is not None and root not in roots:
+            roots.append(root)
+        return roots
+
+    def refresh(self, children: Dict[int, List[int]]):
+        """Actualiza los procesos del árbol y su memoria"""
+        rss = 0
+        found = set()
+        for root in self._roots():
+            for pid in process_tree(root, children):
+                process = _process_id(pid)
+                if process is not None:
+                    found.add(process)
+                    rss += rss_bytes(pid)
+        with self._lock:
+            # Los procesos ya vistos se conservan: un chrome que quedó huérfano
+            # deja de colgar de chromedriver pero sigue siendo de esta sesión
+            self._processes |= found
+        self.rss = rss
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+
+class BrowserSupervisor:
+    def __init__(self, rss_limit_mb: float = RSS_LIMIT_MB, deadline: float = DEADLINE_SECONDS,
+                 interval: float = WATCHDOG_INTERVAL):
+        self.rss_limit = int(rss_limit_mb * 1024 * 1024)
+        self.deadline = deadline
+        self.interval = interval
+        self._ids = itertools.count(1)
+        self._sessions: Dict[int, BrowserSession] = {}
+        self._stragglers: Set[ProcessId] = set()
+        self._lock = threading.Lock()
+        self._watchdog: Optional[threading.Thread] = None
+        self._proc_available = os.path.isdir(PROC_DIR)
+
+    @contextmanager
+    def session(self, source: str, create_driver: Callable, deadline: Optional[float] = None):
+        """Abre un navegador con `create_driver(track)` y garantiza que se cierre.
+
+        `create_driver` tiene que llamar a `track(pid)` con el pid de
+        chromedriver apenas lo lance. Si el vigía mata el navegador, las
+        llamadas al driver fallan y el error sale del bloque `with` como
+        cualquier otro. El plazo corre desde antes de `create_driver`, así
+        que un arranque colgado también se mata.
+        """
+        session = BrowserSession(next(self._ids), source, None, deadline or self.deadline)
+        with self._lock:
+            self._sessions[session.id] = session
+            self._ensure_watchdog()
+        try:
+            session.driver = create_driver(session.track)
+            if self._proc_available:
+                session.refresh(_children_map())
+            yield session.driver
+        finally:
+            with self._lock:
+                self._sessions.pop(session.id, None)
+            self._close(session)
+
+    def _close(self, session: BrowserSession):
+        if self._proc_available:
+            session.refresh(_children_map())
+        if session.driver is None:
+            # Falló la creación del driver: lo que haya arrancado se mata sin esperar
+            self._kill_all([p for p in session.processes if _process_id(p[0]) == p], 'straggler')
+            return
+        try:
+            session.driver.quit()
+        except Exception as e:
+            logger.warning("Error al cerrar Chrome de %s: %s", session.source, e)
+        process = getattr(getattr(session.driver, 'service', None), 'process', None)
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait(timeout=5)
+        grace_end = time.monotonic() + QUIT_GRACE_SECONDS
+        survivors = [p for p in session.processes if _process_id(p[0]) == p]
+        while survivors and time.monotonic() < grace_end:
+            time.sleep(0.1)
+            survivors = [p for p in survivors if _process_id(p[0]) == p]
+        if survivors:
+            logger.warning("%s procesos de Chrome de %s siguieron vivos después de cerrar el navegador, "
+                           "se terminan", len(survivors), session.source)
+            self._kill_all(survivors, 'straggler')
+
+    def _kill_all(self, processes, reason: str):
+        processes = list(processes)
+        killed = {p for p in processes if _kill(p)}
+        failed = [p for p in processes if p not in killed and _process_id(p[0]) == p]
+        if killed:
+            BROWSER_KILLS.inc(reason=reason)
+        if failed:
+            # Lo que no se pudo matar se reintenta en la próxima pasada del vigía
+            with self._lock:
+                self._stragglers.update(failed)
+                self._ensure_watchdog()
+
+    def _kill_session(self, session: BrowserSession, reason: str):
+        logger.warning("Se termina Chrome de %s (%s): %.0f MB, %.0f s abierto",
+                       session.source, reason, session.rss / 1024 / 1024, session.elapsed())
+        session.killed = reason
+        self._kill_all(session.processes, reason)
+
+    def _ensure_watchdog(self):
+        # Se llama con `_lock` tomado: el vigía decide terminar con el mismo lock
+        if self._watchdog is None or not self._watchdog.is_alive():
+            self._watchdog = threading.Thread(target=self._watch, name='browser-watchdog', daemon=True)
+            self._watchdog.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                if not self.check():
+                    return
+            except Exception as e:
+                logger.error("Error en el vigía de navegadores: %s", e)
+
+    def check(self) -> bool:
+        """Una pasada del vigía. Retorna False cuando no queda nada que vigilar"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            stragglers = set(self._stragglers)
+            self._stragglers.clear()
+        if stragglers:
+            self._kill_all(stragglers, 'straggler')
+        if not sessions:
+            with self._lock:
+                if self._sessions or self._stragglers:
+                    return True
+                # Terminar y olvidar el thread en el mismo paso: una sesión que
+                # se registre después ya no lo ve vivo y arranca otro vigía
+                if self._watchdog is threading.current_thread():
+                    self._watchdog = None
+                return False
+
+        if self._proc_available:
+            children = _children_map()
+            for session in sessions:
+                session.refresh(children)
+        alive = []
+        for session in sessions:
+            if session.killed is None and session.elapsed() > session.deadline:
+                self._kill_session(session, 'deadline')
+            elif session.killed is None:
+                alive.append(session)
+        # Sobre el límite de memoria se matan primero los navegadores que más consumen
+        alive.sort(key=lambda s: s.rss, reverse=True)
+        total = sum(session.rss for session in alive)
+        for session in alive:
+            if total <= self.rss_limit:
+                break
+            self._kill_session(session, 'rss')
+            total -= session.rss
+        return True
+
+    def active_sessions(self) -> List[BrowserSession]:
+        with self._lock:
+            return list(self._sessions.values())
+
+    def status(self) -> Dict:
+        sessions = self.active_sessions()
+        with self._lock:
+            stragglers = len(self._stragglers)
+        return {
+            "browsers": len(sessions),
+            "rss_mb": round(sum(s.rss for s in sessions) / 1024 / 1024, 1),
+            "rss_limit_mb": round(self.rss_limit / 1024 / 1024, 1),
+            "deadline_seconds": self.deadline,
+            "stragglers": stragglers,
+            "memory_tracking": self._proc_available,
+            "sessions": [{
+                "id": s.id,
+                "source": s.source,
+                "processes": len(s.processes),
+                "rss_mb": round(s.rss / 1024 / 1024, 1),
+                "elapsed_seconds": round(s.elapsed(), 1),
+                "killed": s.killed,
+            } for s in sessions],
+        }
+
+
+browser_supervisor = BrowserSupervisor()
+
+GaugeCallback(
+    'padua_browsers_active',
+    'Navegadores Chrome abiertos por los scrapers',
+    [],
+    lambda: [({}, len(browser_supervisor.active_sessions()))])
+
+GaugeCallback(
+    'padua_browser_rss_bytes',
+    'Memoria residente de todos los procesos de Chrome abiertos',
+    [],
+    lambda: [({}, sum(s.rss for s in browser_supervisor.active_sessions()))])
@@ -1,93 +1,174 @@
-from bs4 import BeautifulSoup
-import requests
-from datetime import datetime
-from typing import Dict
+import asyncio
+from typing import Callable, Dict, List, Optional
 import logging
 import re
 from urllib.parse import urljoin
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-import time
-
-logging.basicConfig(level=logging.INFO,
-                   format='%(asctime)s - %(levelname)s - %(message)s')
+from .parsing import parse_html
+from .snapshots import page_snapshots
+from .extraction import PageExtraction, extraction_pool
+from .browser import create_chrome, is_page_load_error, wait_until_ready
+from .supervisor import browser_supervisor
+from .fetching import ScrapeSteps, arun_steps, fetch_text, resolve_upstream_url, run_steps
+from .async_engine import AsyncScrapeEngine, get_engine
+from .resilience import get_breaker
+from .cache import CachedRows, CachedTimestamp, ScraperCache
+from .models import FixtureRow, StandingRow, fixtures_to_dicts
+from .. import tracing
+from ..updates import publish_update
+from ..metrics import record_cache_read, record_scrape_result, timed_phase, timed_scrape
+
 logger = logging.getLogger(__name__)
 
+# Página de posiciones de un torneo de metrovoley (con `?group=` si el torneo tiene grupos)
+TOURNAMENT_URL = "https://metrovoley.com.ar/tournament/{tournament_id}/standings"
+STANDINGS_NOT_FOUND = "No se encontró la tabla de posiciones"
+
+
+def tournament_url(tournament_id: int, group: Optional[int] = None) -> str:
+    url = TOURNAMENT_URL.format(tournament_id=tournament_id)
+    return f"{url}?group={group}" if group is not None else url
+
+
 class VoleyScraper:
-    def __init__(self, url):
+    # Vistas del snapshot en caché de cada dato (ver cache.py)
+    standings = CachedRows('standings')
+    last_update = CachedTimestamp('standings')
+    fixtures = CachedRows('fixtures')
+    fixtures_update = CachedTimestamp('fixtures')
+    # Tipos de dato que se scrapean con Chrome (los refrescos cuestan más)
+    browser_kinds = ('standings',)
+
+    def __init__(self, url, name: Optional[str] = None, publish: Optional[Callable] = None):
         self.url = url
-        self.last_update = None
-        self.standings = None
-        self.fixtures = None
-        self.fixtures_update = None
+        # Identificador de la fuente para métricas y logs (p.ej. "voley/tira-a")
+        self.name = name or f"voley/{self._tournament_id()}"
+        # Destino de los resultados nuevos (el backfill pasa el suyo para escribirlos en bloque)
+        self.publish = publish or publish_update
+        # Datos en caché: un snapshot inmutable por tipo de dato
+        self.cache = ScraperCache(self.name)
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+            'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
+            'Referer': 'https://metrovoley.com.ar/'
+        }
+
+    def _tournament_id(self) -> str:
+        match = re.search(r'/tournament/(\d+)', self.url)
+        return f"torneo-{match.group(1)}" if match else self.url
+
+    @property
+    def schedule_url(self) -> str:
+        return self.url.replace("standings", "schedule")
+
+    def entry_urls(self) -> Dict[str, Optional[str]]:
+        """URL de la que parte cada extracción (las posiciones se leen con Chrome, no por HTTP)"""
+        return {'standings': None, 'fixtures': self.schedule_url}
 
+    @timed_scrape('standings')
     def get_standings(self):
-        try:            # Configurar Selenium en modo headless
-            options = Options()
-            options.add_argument('--headless')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=options)
-            driver.get(self.url)
-            time.sleep(2)  # Esperar a que cargue la página
+        try:
+            # Selenium se importa recién acá: es pesado y
+            # sólo hace falta cuando realmente hay que abrir el navegador
+            from selenium.webdriver.common.by import By
+            from selenium.common.exceptions import NoSuchElementException
+
+            # Si metrovoley está caído no tiene sentido levantar Chrome
+            breaker = get_breaker(self.url)
+            if not breaker.allow_request():
+                logger.warning("Host %s no disponible, se devuelven los datos en caché", breaker.host)
+                record_scrape_result(self.name, 'standings', 'circuit_open')
+                return self.cache.get('standings').response(
+                    f"Host {breaker.host} no disponible (circuit breaker abierto)")
+
+            # El supervisor cierra Chrome (y mata procesos que queden vivos) pase lo que pase
+            with browser_supervisor.session(self.name, self._create_driver) as driver:
+                self._load_page(driver, breaker)
             
-            # Intentar extraer datos directamente de la página principal primero
-            logger.info("Intentando extraer tabla de posiciones directamente de la página principal")
-            table_html = driver.page_source
-            soup = BeautifulSoup(table_html, 'html.parser')
+                # Intentar extraer datos directamente de la página principal primero
+                logger.info("Intentando extraer tabla de posiciones directamente de la página principal")
+                table_html = driver.page_source
             
-            # Buscar tabla de posiciones en la página principal
-            table = self._find_standings_table(soup)
+                # Buscar tabla de posiciones en la página principal
+                standings = extraction_pool.extract(self, table_html, 'standings').rows
+                found_in = 'main_page'
             
-            if not table:
-                # Si no encontramos tabla en la página principal, intentamos con iframe si existe
-                logger.info("No se encontró tabla en la página principal, buscando en iframes")
-                try:
-                    iframes = driver.find_elements(By.TAG_NAME, 'iframe')
-                    logger.info(f"Se encontraron {len(iframes)} iframes")
+                if standings is None:
+                    # Si no encontramos tabla en la página principal, intentamos con iframe si existe
+                    logger.info("No se encontró tabla en la página principal, buscando en iframes")
+                    try:
+                        iframes = driver.find_elements(By.TAG_NAME, 'iframe')
+                        logger.info("Se encontraron %d iframes", len(iframes))
                     
-                    for i, iframe in enumerate(iframes):
-                        try:
-                            logger.info(f"Analizando iframe {i+1}/{len(iframes)}")
-                            driver.switch_to.frame(iframe)
-                            iframe_html = driver.page_source
-                            iframe_soup = BeautifulSoup(iframe_html, 'html.parser')
-                            iframe_table = self._find_standings_table(iframe_soup)
+                        for i, iframe in enumerate(iframes):
+                            try:
+                                logger.info("Analizando iframe %d/%d", i + 1, len(iframes))
+                                driver.switch_to.frame(iframe)
+                                iframe_html = driver.page_source
+                                iframe_standings = extraction_pool.extract(self, iframe_html, 'standings').rows
                             
-                            if iframe_table:
-                                logger.info(f"Tabla encontrada en iframe {i+1}")
-                                table = iframe_table
-                                break
+                                if iframe_standings is not None:
+                                    logger.info("Tabla encontrada en iframe %d", i + 1)
+                                    standings = iframe_standings
+                                    found_in = 'iframe'
+                                    break
                             
-                            # Volver al contenido principal para revisar el siguiente iframe
-                            driver.switch_to.default_content()
-                        except Exception as e:
-                            logger.warning(f"Error al procesar iframe {i+1}: {e}")
-                            driver.switch_to.default_content()
-                            continue
-                except NoSuchElementException:
-                    logger.warning("No se encontraron iframes en la página")
-            
-            driver.quit()
-            
-            if not table:
-                return {"error": "No se encontró la tabla de posiciones", "last_update": self.last_update, "standings": self.standings}
+                                # Volver al contenido principal para revisar el siguiente iframe
+                                driver.switch_to.default_content()
+                            except Exception as e:
+                                logger.warning("Error al procesar iframe %d: %s", i + 1, e)
+                                driver.switch_to.default_content()
+                                continue
+                    except NoSuchElementException:
+                        logger.warning("No se encontraron iframes en la página")
+
+            if standings is None:
+                record_scrape_result(self.name, 'standings', 'not_found')
+                return self.cache.get('standings').response(STANDINGS_NOT_FOUND)
                 
-            standings = self._extract_standings_data(table)
-            self.last_update = datetime.now().isoformat()
-            self.standings = standings
-            return {"error": None, "last_update": self.last_update, "standings": standings}
+            record_scrape_result(self.name, 'standings', found_in)
+            snapshot = self.cache.swap('standings', standings)
+            data = snapshot.payload()
+            self.publish(self.name, 'standings', data, snapshot.last_update)
+            return {"error": None, "last_update": snapshot.last_update, "standings": data}
+        except Exception as e:
+            logger.error("Error en get_standings: %s", e)
+            record_scrape_result(self.name, 'standings', 'error')
+            return self.cache.get('standings').response(str(e))
+
+    @timed_phase('fetch')
+    def _load_page(self, driver, breaker):
+        """Navega a la página del torneo registrando el resultado en el circuit breaker"""
+        tracing.annotate(url=self.url)
+        try:
+            driver.get(resolve_upstream_url(self.url))
         except Exception as e:
-            logger.error(f"Error en get_standings: {str(e)}")
-            if 'driver' in locals():
-                driver.quit()
-            return {"error": str(e), "last_update": self.last_update, "standings": self.standings}
+            # Sólo los errores del sitio cuentan para su breaker, no las fallas de nuestro Chrome
+            if is_page_load_error(e):
+                breaker.record_failure()
+            raise
+        breaker.record_success()
+        wait_until_ready(driver)
 
+    @timed_phase('parse')
+    def _parse(self, html: str):
+        tracing.annotate(bytes=len(html))
+        return parse_html(html)
+
+    def _extract_page(self, html: str, kind: str) -> PageExtraction:
+        """Filas de `kind` de una página (corre en el proceso principal o en el pool)"""
+        soup = self._parse(html)
+        if kind == 'fixtures':
+            return PageExtraction(self._extract_fixtures_data(soup), [])
+        table = self._find_standings_table(soup)
+        return PageExtraction(self._extract_standings_data(table) if table else None, [])
+
+    @timed_phase('browser_startup')
+    def _create_driver(self, track=None):
+        """Crea un Chrome headless (perfil liviano salvo BROWSER_LEAN_MODE=0)"""
+        return create_chrome(track=track)
+
+    @timed_phase('extract', span_name='detect_table')
     def _find_standings_table(self, soup):
         """Busca la tabla de posiciones en el HTML"""
         # Intenta diferentes estrategias para encontrar la tabla
@@ -102,7 +183,7 @@ class VoleyScraper:
             table_attrs = f"{class_attr} {id_attr}".lower()
             
             if any(keyword in table_attrs for keyword in ['clasific', 'standing', 'posicion', 'tabla', 'torneo', 'ranking']):
-                logger.info(f"Tabla encontrada por clase/ID: {table_attrs}")
+                logger.info("Tabla encontrada por clase/ID: %s", table_attrs)
                 return table
         
         # 2. Buscar encabezados típicos de tablas de posiciones
@@ -114,19 +195,20 @@ class VoleyScraper:
                 header_text = ' '.join(headers)
                 
                 if any(keyword in header_text for keyword in ['pos', 'equipo', 'pts', 'pj', 'pg', 'pp']):
-                    logger.info(f"Tabla encontrada por encabezados: {header_text[:50]}")
+                    logger.info("Tabla encontrada por encabezados: %.50s", header_text)
                     return table
         
         # 3. Buscar divs que contengan tablas
         for div in soup.find_all('div', class_=lambda c: c and any(keyword in c.lower() for keyword in ['tabla', 'posiciones', 'standings'])):
             table = div.find('table')
             if table:
-                logger.info(f"Tabla encontrada dentro de div: {div.get('class', '')}")
+                logger.info("Tabla encontrada dentro de div: %s", div.get('class', ''))
                 return table
         
         return None
 
-    def _extract_standings_data(self, table):
+    @timed_phase('extract')
+    def _extract_standings_data(self, table) -> List[StandingRow]:
         standings = []
         rows = table.find_all('tr')
         if not rows or len(rows) < 2:
@@ -175,150 +257,186 @@ class VoleyScraper:
                 if len(numeric_cols) >= 5: team_data['contra'] = numeric_cols[4]
                 if len(numeric_cols) >= 6: team_data['puntos'] = numeric_cols[5]
                 
-                standings.append(team_data)
+                # Los números se convierten a int al armar el registro
+                standings.append(StandingRow.from_dict(team_data))
             except Exception as e:
-                logger.warning(f"Error al procesar fila: {e}")
+                logger.warning("Error al procesar fila: %s", e)
                 continue
                 
         return standings
 
+    async def aget_standings(self) -> Dict:
+        """Versión async de get_standings.
+
+        Selenium es bloqueante, así que el navegador se maneja en un thread
+        para no frenar el event loop.
+        """
+        return await asyncio.to_thread(self.get_standings)
+
     def get_cached_standings(self):
-        if not self.standings:
+        snapshot = self.cache.get('standings')
+        if not snapshot.rows:
+            record_cache_read(self.name, 'standings', False, None)
             return self.get_standings()
-        return {"error": None, "last_update": self.last_update, "standings": self.standings}
+        record_cache_read(self.name, 'standings', True, snapshot.last_update)
+        return snapshot.response()
 
+    async def aget_cached_standings(self) -> Dict:
+        """Versión async de get_cached_standings"""
+        if not self.cache.get('standings').rows:
+            record_cache_read(self.name, 'standings', False, None)
+            return await self.aget_standings()
+        return self.get_cached_standings()
+
+    @timed_scrape('fixtures')
     def get_fixtures(self) -> Dict:
         """Obtiene los próximos partidos del fixture"""
+        return run_steps(self._fixtures_steps(), self._fetch)
+
+    @timed_scrape('fixtures')
+    async def aget_fixtures(self, engine: Optional[AsyncScrapeEngine] = None) -> Dict:
+        """Versión async de get_fixtures"""
+        engine = engine or get_engine()
+        return await arun_steps(self._fixtures_steps(), lambda url: self._afetch(engine, url))
+
+    @timed_phase('fetch')
+    def _fetch(self, url: str) -> str:
+        return page_snapshots.fetch(url, lambda: fetch_text(url, headers=self.headers))
+
+    @timed_phase('fetch')
+    async def _afetch(self, engine: AsyncScrapeEngine, url: str) -> str:
+        return await page_snapshots.afetch(url, lambda: engine.fetch_text(url, headers=self.headers))
+
+    def _fixtures_steps(self) -> ScrapeSteps:
+        """Pasos para obtener el fixture desde la página de partidos del torneo"""
         try:
-            fixture_url = self.url.replace("standings", "schedule")
-            logger.info(f"Obteniendo fixture de: {fixture_url}")
+            fixture_url = self.schedule_url
+            logger.info("Obteniendo fixture de: %s", fixture_url)
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
-                'Referer': 'https://metrovoley.com.ar/'
-            }
-            
-            response = requests.get(fixture_url, headers=headers, timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
+            html = yield fixture_url
             
-            # Buscar elementos de partido
-            fixtures_data = []
-            
-            # Buscar todos los divs que puedan contener información de partidos
-            schedule_section = soup.select_one('.itinerary-container')
-            if not schedule_section:
-                schedule_section = soup
-                
-            match_elements = schedule_section.select('.itinerary-match')
-            
-            if not match_elements:
-                # Buscar más genéricamente
-                match_elements = schedule_section.select('div[class*="match"]')
-            
-            for match_elem in match_elements:
-                try:
-                    # Extraer equipos (local y visitante)
-                    local_team = None 
-                    visitor_team = None
-                    
-                    team_elements = match_elem.select('.team-name')
-                    if len(team_elements) >= 2:
-                        local_team = team_elements[0].text.strip()
-                        visitor_team = team_elements[1].text.strip()
-                    else:
-                        # Intentar buscar de otra manera
-                        teams_container = match_elem.select_one('.teams-container')
-                        if teams_container:
-                            teams = teams_container.select('.team')
-                            if len(teams) >= 2:
-                                local_team = teams[0].text.strip()
-                                visitor_team = teams[1].text.strip()
-                    
-                    # Si no encontramos los nombres de los equipos, saltar
-                    if not local_team or not visitor_team:
-                        continue
-                    
-                    # Extraer fecha y hora
-                    match_date = ""
-                    match_time = ""
-                    
-                    # Buscar fecha y hora directamente
-                    date_elem = match_elem.select_one('.date')
-                    if date_elem:
-                        match_date = date_elem.text.strip()
-                    
-                    time_elem = match_elem.select_one('.hour')
-                    if time_elem:
-                        match_time = time_elem.text.strip()
-                    
-                    # Si no encontramos elementos específicos, buscar texto que se parezca a fechas/horas
-                    if not match_date or not match_time:
-                        for text in match_elem.stripped_strings:
-                            # Buscar patrones de fecha (dd/mm/yyyy o dd-mm-yyyy)
-                            if not match_date and re.search(r'\d{1,2}[/-]\d{1,2}([/-]\d{2,4})?', text):
-                                match_date = text.strip()
-                            
-                            # Buscar patrones de hora (hh:mm)
-                            elif not match_time and re.search(r'\d{1,2}:\d{2}', text):
-                                match_time = text.strip()
-                    
-                    # Determinar si CASA es local o visitante
-                    is_casa_local = 'casa' in local_team.lower() or 'padua' in local_team.lower()
-                    
-                    # Verificar estado del partido
-                    match_status = ""
-                    status_elem = match_elem.select_one('.match-status')
-                    if status_elem:
-                        match_status = status_elem.text.strip().lower()
-                    
-                    # Solo incluir partidos programados/pendientes
-                    is_pending = True
-                    if match_status and ('finalizado' in match_status or 'jugado' in match_status or 'terminado' in match_status):
-                        is_pending = False
-                    
-                    if is_pending:
-                        fixtures_data.append({
-                            "local": local_team,
-                            "visitante": visitor_team,
-                            "fecha": match_date,
-                            "hora": match_time,
-                            "es_casa_local": is_casa_local
-                        })
-                
-                except Exception as e:
-                    logger.error(f"Error procesando partido: {str(e)}")
-                    continue
+            fixtures_data = extraction_pool.extract(self, html, 'fixtures').rows
             
             # Si encontramos datos, guardarlos en caché
             if fixtures_data:
-                self.fixtures = fixtures_data
-                self.fixtures_update = datetime.now().isoformat()
+                snapshot = self.cache.swap('fixtures', fixtures_data)
+                self.publish(self.name, 'fixtures', snapshot.payload(), snapshot.last_update)
+            else:
+                snapshot = self.cache.get('fixtures')
+            record_scrape_result(self.name, 'fixtures',
+                                 'schedule_page' if fixtures_data else 'not_found')
             
             return {
                 "error": None if fixtures_data else "No se encontraron próximos partidos",
-                "last_update": self.fixtures_update,
-                "fixtures": fixtures_data
+                "last_update": snapshot.last_update,
+                "fixtures": fixtures_to_dicts(fixtures_data)
             }
                 
         except Exception as e:
             error_msg = f"Error obteniendo fixture: {str(e)}"
             logger.error(error_msg)
-            return {
-                "error": error_msg,
-                "last_update": self.fixtures_update,
-                "fixtures": self.fixtures
-            }
+            record_scrape_result(self.name, 'fixtures', 'error')
+            return self.cache.get('fixtures').response(error_msg)
+
+    @timed_phase('extract')
+    def _extract_fixtures_data(self, soup) -> List[FixtureRow]:
+        """Extrae los partidos pendientes de la página de fixture de metrovoley"""
+        # Buscar elementos de partido
+        fixtures_data = []
+        
+        # Buscar todos los divs que puedan contener información de partidos
+        schedule_section = soup.select_one('.itinerary-container')
+        if not schedule_section:
+            schedule_section = soup
+            
+        match_elements = schedule_section.select('.itinerary-match')
+        
+        if not match_elements:
+            # Buscar más genéricamente
+            match_elements = schedule_section.select('div[class*="match"]')
+        
+        for match_elem in match_elements:
+            try:
+                # Extraer equipos (local y visitante)
+                local_team = None 
+                visitor_team = None
+                
+                team_elements = match_elem.select('.team-name')
+                if len(team_elements) >= 2:
+                    local_team = team_elements[0].text.strip()
+                    visitor_team = team_elements[1].text.strip()
+                else:
+                    # Intentar buscar de otra manera
+                    teams_container = match_elem.select_one('.teams-container')
+                    if teams_container:
+                        teams = teams_container.select('.team')
+                        if len(teams) >= 2:
+                            local_team = teams[0].text.strip()
+                            visitor_team = teams[1].text.strip()
+                
+                # Si no encontramos los nombres de los equipos, saltar
+                if not local_team or not visitor_team:
+                    continue
+                
+                # Extraer fecha y hora
+                match_date = ""
+                match_time = ""
+                
+                # Buscar fecha y hora directamente
+                date_elem = match_elem.select_one('.date')
+                if date_elem:
+                    match_date = date_elem.text.strip()
+                
+                time_elem = match_elem.select_one('.hour')
+                if time_elem:
+                    match_time = time_elem.text.strip()
+                
+                # Si no encontramos elementos específicos, buscar texto que se parezca a fechas/horas
+                if not match_date or not match_time:
+                    for text in match_elem.stripped_strings:
+                        # Buscar patrones de fecha (dd/mm/yyyy o dd-mm-yyyy)
+                        if not match_date and re.search(r'\d{1,2}[/-]\d{1,2}([/-]\d{2,4})?', text):
+                            match_date = text.strip()
+                        
+                        # Buscar patrones de hora (hh:mm)
+                        elif not match_time and re.search(r'\d{1,2}:\d{2}', text):
+                            match_time = text.strip()
+                
+                # Determinar si CASA es local o visitante
+                is_casa_local = 'casa' in local_team.lower() or 'padua' in local_team.lower()
+                
+                # Verificar estado del partido
+                match_status = ""
+                status_elem = match_elem.select_one('.match-status')
+                if status_elem:
+                    match_status = status_elem.text.strip().lower()
+                
+                # Solo incluir partidos programados/pendientes
+                is_pending = True
+                if match_status and ('finalizado' in match_status or 'jugado' in match_status or 'terminado' in match_status):
+                    is_pending = False
+                
+                if is_pending:
+                    fixtures_data.append(FixtureRow.create(local_team, visitor_team, match_date, match_time, is_casa_local))
+            
+            except Exception as e:
+                logger.error("Error procesando partido: %s", e)
+                continue
+
+        return fixtures_data
     
     def get_cached_fixtures(self) -> Dict:
         """Retorna los últimos datos de fixtures obtenidos sin hacer una nueva petición"""
-        if not self.fixtures:
+        snapshot = self.cache.get('fixtures')
+        if not snapshot.rows:
+            record_cache_read(self.name, 'fixtures', False, None)
             return self.get_fixtures()
-        return {
-            "error": None,
-            "last_update": self.fixtures_update,
-            "fixtures": self.fixtures
-        }
+        record_cache_read(self.name, 'fixtures', True, snapshot.last_update)
+        return snapshot.response()
+
+    async def aget_cached_fixtures(self) -> Dict:
+        """Versión async de get_cached_fixtures"""
+        if not self.cache.get('fixtures').rows:
+            record_cache_read(self.name, 'fixtures', False, None)
+            return await self.aget_fixtures()
+        return self.get_cached_fixtures()
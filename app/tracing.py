@@ -0,0 +1,267 @@
+"""Trazas por scraping con spans anidados.
+
+Cada scraping abre una traza (`trace`) y cada descarga, parseo o búsqueda de
+tabla abre un span hijo (`span`) con su duración, atributos (URL, bytes,
+filas) y resultado. Las trazas terminadas se guardan en un buffer circular
+en memoria que se consulta desde `/api/debug/traces`.
+
+Si está definida la variable `OTEL_EXPORTER_OTLP_ENDPOINT` y el SDK de
+OpenTelemetry está instalado, las trazas también se exportan por OTLP/HTTP a
+ese colector (p.ej. `http://localhost:4318/v1/traces`).
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACE_BUFFER_SIZE = int(os.environ.get('TRACE_BUFFER_SIZE', '200'))
+
+
+class Span:
+    __slots__ = ('name', 'attributes', 'children', 'status', 'start_ns', '_start', 'duration')
+
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.attributes = dict(attributes)
+        self.children: List['Span'] = []
+        self.status = 'ok'
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        self.duration: Optional[float] = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._start
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "status": self.status,
+            "duration_ms": round(self.duration * 1000, 2) if self.duration is not None else None,
+            "attributes": self.attributes,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class Trace:
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.id = uuid.uuid4().hex[:16]
+        self.root = Span(name, attributes)
+        self.started_at = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime())
+
+    def summary(self) -> Dict:
+        return {
+            "id": self.id,
+            "name": self.root.name,
+            "started_at": self.started_at,
+            "duration_ms": round(self.root.duration * 1000, 2) if self.root.duration is not None else None,
+            "status": self.root.status,
+            "attributes": self.root.attributes,
+            "span_count": self._count(self.root) - 1,
+        }
+
+    def to_dict(self) -> Dict:
+        return dict(self.summary(), root=self.root.to_dict())
+
+    def _count(self, span: Span) -> int:
+        return 1 + sum(self._count(child) for child in span.children)
+
+
+_traces: deque = deque(maxlen=TRACE_BUFFER_SIZE)
+_current_span: ContextVar[Optional[Span]] = ContextVar('padua_current_span', default=None)
+_current_trace: ContextVar[Optional[Trace]] = ContextVar('padua_current_trace', default=None)
+# Funciones llamadas con cada traza terminada (p.ej. el resumen de logs muestreados)
+_finish_hooks: List[Callable[[Trace], None]] = []
+
+
+@contextmanager
+def trace(name: str, **attributes):
+    """Abre una traza; si ya hay una activa, se comporta como un span hijo"""
+    if _current_trace.get() is not None:
+        with span(name, **attributes) as current:
+            yield current
+        return
+
+    new_trace = Trace(name, attributes)
+    trace_token = _current_trace.set(new_trace)
+    span_token = _current_span.set(new_trace.root)
+    try:
+        yield new_trace.root
+    except BaseException as e:
+        new_trace.root.status = 'error'
+        new_trace.root.set(error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        new_trace.root.finish()
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        _traces.append(new_trace)
+        for hook in _finish_hooks:
+            hook(new_trace)
+        _export(new_trace)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Abre un span hijo del actual. Fuera de una traza no registra nada"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    current = Span(name, attributes)
+    parent.children.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = 'error'
+        current.set(error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        current.finish()
+        _current_span.reset(token)
+
+
+@contextmanager
+def capture(name: str = 'capture'):
+    """Junta en un span suelto los spans abiertos dentro del bloque, sin abrir una traza.
+
+    Sirve para medir en un proceso del pool y mandar los spans (`children`)
+    al principal, que los agrega a su traza con `adopt`.
+    """
+    root = Span(name, {})
+    token = _current_span.set(root)
+    try:
+        yield root
+    finally:
+        root.finish()
+        _current_span.reset(token)
+
+
+def adopt(spans: List[Span]):
+    """Agrega spans ya terminados (p.ej. de otro proceso) como hijos del span activo"""
+    current = _current_span.get()
+    if current is not None:
+        current.children.extend(spans)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def on_trace_finished(hook: Callable[[Trace], None]):
+    """Registra `hook` para que se llame con cada traza al terminar"""
+    if hook not in _finish_hooks:
+        _finish_hooks.append(hook)
+
+
+def annotate(**attributes):
+    """Agrega atributos al span activo (si lo hay)"""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+def annotate_trace(**attributes):
+    """Agrega atributos al span raíz de la traza activa (si la hay)"""
+    current = _current_trace.get()
+    if current is not None:
+        current.root.set(**attributes)
+
+
+def describe_result(result) -> Dict[str, Any]:
+    """Atributos resumidos del resultado de un paso (bytes, filas o si encontró algo)"""
+    if result is None:
+        return {"outcome": "not_found"}
+    if isinstance(result, (str, bytes)):
+        return {"bytes": len(result)}
+    if isinstance(result, list):
+        return {"rows": len(result)}
+    return {"outcome": "found"}
+
+
+def recent_traces(limit: int = 50, source: Optional[str] = None) -> List[Dict]:
+    """Resumen de las últimas trazas, de la más nueva a la más vieja"""
+    result = []
+    for item in reversed(list(_traces)):
+        if source is not None and item.root.attributes.get('source') != source:
+            continue
+        result.append(item.summary())
+        if len(result) >= limit:
+            break
+    return result
+
+
+def get_trace(trace_id: str) -> Optional[Dict]:
+    for item in list(_traces):
+        if item.id == trace_id:
+            return item.to_dict()
+    return None
+
+
+# Exportación opcional a OpenTelemetry
+_otel_tracer = None
+_otel_disabled = False
+_otel_lock = threading.Lock()
+
+
+def _get_otel_tracer():
+    global _otel_tracer, _otel_disabled
+    if _otel_tracer is not None or _otel_disabled:
+        return _otel_tracer
+    endpoint = os.environ.get('OTEL_EXPORTER_OTLP_ENDPOINT')
+    if not endpoint:
+        _otel_disabled = True
+        return None
+    with _otel_lock:
+        if _otel_tracer is None and not _otel_disabled:
+            try:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+                from opentelemetry.sdk.resources import Resource
+                from opentelemetry.sdk.trace import TracerProvider
+                from opentelemetry.sdk.trace.export import BatchSpanProcessor
+            except ImportError:
+                logger.warning("OTEL_EXPORTER_OTLP_ENDPOINT definido pero OpenTelemetry no está instalado; "
+                               "las trazas sólo quedan en memoria")
+                _otel_disabled = True
+                return None
+            provider = TracerProvider(resource=Resource.create({"service.name": "padua-backend"}))
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+            _otel_tracer = provider.get_tracer(__name__)
+            logger.info("Exportando trazas a OpenTelemetry en %s", endpoint)
+    return _otel_tracer
+
+
+def _export(finished: Trace):
+    tracer = _get_otel_tracer()
+    if tracer is None:
+        return
+    try:
+        _export_span(tracer, finished.root, None)
+    except Exception as e:
+        logger.warning("No se pudo exportar la traza %s: %s", finished.id, e)
+
+
+def _export_span(tracer, item: Span, parent_context):
+    from opentelemetry import trace as otel_trace
+
+    end_ns = item.start_ns + int((item.duration or 0) * 1e9)
+    otel_span = tracer.start_span(item.name, context=parent_context, start_time=item.start_ns)
+    for key, value in item.attributes.items():
+        otel_span.set_attribute(key, value if isinstance(value, (str, bool, int, float)) else str(value))
+    if item.status == 'error':
+        otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR))
+    context = otel_trace.set_span_in_context(otel_span)
+    for child in item.children:
+        _export_span(tracer, child, context)
+    otel_span.end(end_time=end_ns)
@@ -0,0 +1,40 @@
+"""Punto único por el que pasan los resultados nuevos de los scrapers.
+
+Los scrapers llaman a `publish_update(source, kind, data, last_update)` cada
+vez que guardan datos en caché. Cada resultado alimenta la frecuencia de
+refresco adaptativa (`cadence`) y se exporta como JSON estático (`export`).
+Si el contenido cambió respecto de la versión anterior se numera una versión
+nueva (`diffing`), se guarda en el historial de posiciones (`history`) o en el
+calendario de partidos (`fixture_calendar`) y se avisa a los clientes
+conectados por SSE (`broadcaster`).
+"""
+from typing import Optional
+
+from .broadcaster import broadcaster
+from .cadence import refresh_cadence
+from .diffing import get_history
+from .export import static_export
+from .fixture_calendar import fixture_calendar
+from .history import standings_history
+
+
+def publish_update(source: str, kind: str, data, last_update: Optional[str]) -> bool:
+    """Registra el resultado de un scraping de `source` ('basquet', 'voley/tira-a', ...).
+
+    Retorna True si los datos cambiaron respecto de la versión anterior.
+    """
+    if not data:
+        return False
+    refresh_cadence.observe(source, kind, data)
+    history = get_history(source, kind)
+    changes = history.record(data, last_update)
+    static_export.export(source, kind, data, last_update, history.version)
+    if changes is None:
+        return False
+    if kind == 'standings':
+        standings_history.record(source, data, last_update)
+    elif kind == 'fixtures':
+        fixture_calendar.update(source, data)
+    payload = {"source": source, "kind": kind, "last_update": last_update, kind: data, "changes": changes}
+    broadcaster.publish(f"{source}/{kind}", payload, history.version)
+    return True
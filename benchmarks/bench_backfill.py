@@ -0,0 +1,129 @@
+"""Rendimiento del backfill (`app/backfill.py`) contra el simulador de origen.
+
+Carga las posiciones de `--targets` zonas y temporadas de básquet desde el
+simulador (con `--latency-ms` de latencia por respuesta) de tres formas:
+
+- secuencial: un objetivo a la vez, sin límite de pedidos
+- pipeline: `--concurrency` objetivos a la vez, `--per-host` descargas
+  simultáneas y `--rate` pedidos por segundo por host (los valores por
+  defecto del comando)
+- pipeline sin límite: igual pero sin `--rate`, para ver qué le llegaría al
+  sitio de origen sin el límite por host
+
+Informa tiempo total, tablas por minuto, pedidos por segundo al host de la
+liga (promedio y pico en cualquier ventana de un segundo) y el tiempo de una
+segunda corrida con el mismo checkpoint, que debe saltear todo.
+
+Uso:
+    python benchmarks/bench_backfill.py [--targets 200] [--latency-ms 300] [--rate 4]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import backfill  # noqa: E402
+from app.history import HistoryStore  # noqa: E402
+from app.scraper.async_engine import AsyncScrapeEngine  # noqa: E402
+from app.scraper.snapshots import page_snapshots  # noqa: E402
+from upstream_simulator import start_simulator  # noqa: E402
+
+LEAGUE_HOST = 'www.argentina.basketball'
+
+
+class RecordingEngine(AsyncScrapeEngine):
+    """Motor que anota cuándo sale cada pedido a cada host"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sent: Dict[str, List[float]] = defaultdict(list)
+
+    async def _wait_host_slot(self, host: str):
+        await super()._wait_host_slot(host)
+        self.sent[host].append(time.monotonic())
+
+
+def peak_per_second(times: List[float]) -> int:
+    peak, start = 0, 0
+    for end, moment in enumerate(times):
+        while moment - times[start] >= 1.0:
+            start += 1
+        peak = max(peak, end - start + 1)
+    return peak
+
+
+async def run_mode(targets, workdir: str, concurrency: int, per_host: int, rate: Optional[float]) -> Dict:
+    page_snapshots.clear()
+    checkpoint = backfill.BackfillCheckpoint(os.path.join(workdir, 'checkpoint.json'))
+    store = HistoryStore(os.path.join(workdir, 'history.jsonl'))
+    engine = RecordingEngine(max_connections=max(per_host, concurrency) * 2, max_per_host=per_host,
+                             requests_per_second=rate)
+    pipeline = backfill.BackfillPipeline(targets, engine, checkpoint, store, concurrency=concurrency)
+    start = time.perf_counter()
+    stats = await pipeline.run()
+    elapsed = time.perf_counter() - start
+
+    # Segunda corrida con el checkpoint guardado: no debería pedir nada
+    resume = backfill.BackfillPipeline(targets, engine, backfill.BackfillCheckpoint(checkpoint.path), store)
+    start = time.perf_counter()
+    resumed = await resume.run()
+    resume_elapsed = time.perf_counter() - start
+    await engine.aclose()
+
+    sent = sorted(engine.sent[LEAGUE_HOST])
+    return {"stats": stats, "elapsed": elapsed, "requests": len(sent), "peak": peak_per_second(sent),
+            "resume_elapsed": resume_elapsed, "resume_skipped": resumed["skipped"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--targets', type=int, default=200)
+    parser.add_argument('--latency-ms', type=float, default=300)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--per-host', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=4.0)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    server = start_simulator(port=0, latency_ms=args.latency_ms)
+    os.environ['UPSTREAM_BASE_URL'] = f"http://127.0.0.1:{server.server_address[1]}"
+    seasons = list(range(2025 - (args.targets + 1) // 2 + 1, 2026))
+    targets = backfill.basketball_targets(seasons, ['a', 'b'])[:args.targets]
+
+    modes = [
+        ("secuencial", 1, args.per_host, None),
+        ("pipeline", args.concurrency, args.per_host, args.rate),
+        ("pipeline sin límite", args.concurrency, args.per_host, None),
+    ]
+    print(f"{len(targets)} objetivos, latencia {args.latency_ms:.0f} ms")
+    print(f"{'modo':<21} {'tiempo':>8} {'tablas/min':>11} {'pedidos/s':>10} {'pico/s':>7} {'reanudar':>9}")
+    original_cwd = os.getcwd()
+    for label, concurrency, per_host, rate in modes:
+        workdir = tempfile.mkdtemp()
+        # Los scrapers dejan HTML de depuración en el directorio actual
+        os.chdir(workdir)
+        try:
+            result = asyncio.run(run_mode(targets, workdir, concurrency, per_host, rate))
+        finally:
+            os.chdir(original_cwd)
+            shutil.rmtree(workdir, ignore_errors=True)
+        stats = result["stats"]
+        skipped_ok = "ok" if result["resume_skipped"] == len(targets) else "FALLA"
+        print(f"{label:<21} {result['elapsed']:>7.1f}s {stats['tables'] * 60 / result['elapsed']:>11.0f} "
+              f"{result['requests'] / result['elapsed']:>10.1f} {result['peak']:>7} "
+              f"{result['resume_elapsed'] * 1000:>6.0f}ms {skipped_ok}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
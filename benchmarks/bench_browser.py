@@ -0,0 +1,86 @@
+"""Benchmark de la navegación con Chrome de los scrapers de voley.
+
+Para cada liga de voley abre la página de posiciones con el perfil completo
+(navegación original: carga normal + espera fija de 2 s) y con el perfil
+liviano (`app/scraper/browser.py`: recursos bloqueados, carga `eager` y espera
+hasta que aparece la tabla) e informa por liga y por perfil:
+
+- arranque del navegador
+- tiempo hasta que la página está lista para leer la tabla
+- pedidos y bytes transferidos (Resource Timing API del navegador)
+
+Requiere Selenium y Chrome. Con `--simulator` las páginas se sirven desde el
+simulador local (`upstream_simulator.py`) en lugar de metrovoley.
+
+Uso:
+    python benchmarks/bench_browser.py [--rounds 3] [--modes full,lean] [--simulator]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+LEAGUES = {
+    'voley/tira-a': "https://metrovoley.com.ar/tournament/75/standings?group=482",
+    'voley/tira-b': "https://metrovoley.com.ar/tournament/129/standings?group=497",
+    'voley/primera': "https://metrovoley.com.ar/tournament/188/standings",
+}
+
+
+def measure(url: str, lean: bool):
+    from app.scraper.browser import create_chrome, transfer_stats, wait_until_ready
+    from app.scraper.fetching import resolve_upstream_url
+
+    started = time.perf_counter()
+    driver = create_chrome(lean)
+    startup = time.perf_counter() - started
+    try:
+        started = time.perf_counter()
+        driver.get(resolve_upstream_url(url))
+        wait_until_ready(driver)
+        ready = time.perf_counter() - started
+        stats = transfer_stats(driver)
+    finally:
+        driver.quit()
+    return startup, ready, stats['requests'], stats['bytes']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--modes', default='full,lean')
+    parser.add_argument('--simulator', action='store_true',
+                        help="Servir las páginas desde el simulador local")
+    args = parser.parse_args()
+
+    try:
+        import selenium  # noqa: F401
+    except ImportError:
+        print("Selenium no está instalado: pip install -r requirements.txt")
+        sys.exit(1)
+
+    if args.simulator:
+        from upstream_simulator import start_simulator
+        server = start_simulator(port=0)
+        os.environ['UPSTREAM_BASE_URL'] = f"http://127.0.0.1:{server.server_address[1]}"
+
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    print(f"{'liga':<15} {'perfil':<6} {'arranque':>10} {'página lista':>13} {'pedidos':>8} {'KiB':>9}")
+    for source, url in LEAGUES.items():
+        for mode in modes:
+            samples = [measure(url, lean=(mode == 'lean')) for _ in range(args.rounds)]
+            startup = statistics.median(s[0] for s in samples)
+            ready = statistics.median(s[1] for s in samples)
+            requests = statistics.median(s[2] for s in samples)
+            kib = statistics.median(s[3] for s in samples) / 1024
+            print(f"{source:<15} {mode:<6} {startup * 1000:>8.0f}ms {ready * 1000:>11.0f}ms "
+                  f"{requests:>8.0f} {kib:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
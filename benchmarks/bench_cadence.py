@@ -0,0 +1,134 @@
+"""Pedidos al origen y demora en ver cambios con cada forma de programar refrescos.
+
+Simula `--weeks` semanas de una liga con partidos los sábados a las 20:00 y
+los domingos a las 18:00:
+
+- las posiciones cambian cuando se cargan los resultados, entre 1 y 10 horas
+  después de cada partido, más alguna corrección suelta entre semana
+- el fixture (partidos pendientes) cambia al jugarse cada partido y cuando se
+  publica la fecha siguiente, los martes
+
+y compara, para posiciones y fixture, el cron anterior (lunes y miércoles a
+las 9:00), intervalos fijos y el scheduler adaptativo (`app/cadence.py`, con
+el calendario de partidos para el refuerzo post-partido). Informa pedidos por
+semana y la demora (mediana, p95 y máxima) entre que cambia el origen y un
+refresco lo trae. Las primeras `--warmup` semanas no se cuentan: el modelo
+adaptativo todavía está aprendiendo.
+
+Uso:
+    python benchmarks/bench_cadence.py [--weeks 12] [--warmup 3] [--seed 7]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app import cadence  # noqa: E402
+from app.fixture_calendar import LEAGUE_TZ  # noqa: E402
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+# Lunes 00:00 en hora de Argentina
+START = datetime(2025, 3, 3, tzinfo=LEAGUE_TZ).timestamp()
+
+
+def league(weeks: int, rng: random.Random) -> Tuple[List[float], List[float], List[float]]:
+    """Inicios de partidos y momentos en que cambian posiciones y fixture"""
+    matches, standings, fixtures = [], [], []
+    for week in range(weeks):
+        monday = START + week * WEEK
+        for day, hour in ((5, 20), (6, 18)):
+            start = monday + day * DAY + hour * HOUR
+            matches.append(start)
+            fixtures.append(start + 2 * HOUR)
+            standings.append(start + rng.uniform(1, 10) * HOUR)
+        # Fecha siguiente publicada el martes a la tarde
+        fixtures.append(monday + DAY + rng.uniform(14, 20) * HOUR)
+        # Corrección de la tabla entre semana, una de cada tres semanas
+        if rng.random() < 1 / 3:
+            standings.append(monday + rng.uniform(0, 4) * DAY + rng.uniform(10, 19) * HOUR)
+    return sorted(matches), sorted(standings), sorted(fixtures)
+
+
+def cron_times(weeks: int) -> List[float]:
+    return sorted(START + week * WEEK + day * DAY + 9 * HOUR for week in range(weeks) for day in (0, 2))
+
+
+def fixed_times(weeks: int, interval: float) -> List[float]:
+    return [START + i * interval for i in range(int(weeks * WEEK / interval))]
+
+
+def adaptive_times(weeks: int, changes: List[float], matches: List[float]) -> List[float]:
+    """Refrescos que lanzaría el scheduler adaptativo (un tick por minuto)"""
+    model = cadence.ChangeModel()
+
+    def lookup(start: float, end: float) -> bool:
+        return bisect_right(matches, end) > bisect_left(matches, start)
+
+    times = []
+    now, end = START, START + weeks * WEEK
+    while now < end:
+        times.append(now)
+        # El contenido del origen es la cantidad de cambios ocurridos hasta ahora
+        model.observe(str(bisect_right(changes, now)), now)
+        due = model.next_check(lookup)
+        now = max(now + cadence.TICK_SECONDS, -(-due // cadence.TICK_SECONDS) * cadence.TICK_SECONDS)
+    return times
+
+
+def evaluate(checks: List[float], changes: List[float], since: float, until: float) -> Tuple[float, List[float]]:
+    """Pedidos por semana y demoras (horas) desde cada cambio hasta el refresco que lo trae"""
+    delays = []
+    for change in changes:
+        if change < since:
+            continue
+        index = bisect_right(checks, change)
+        if index < len(checks):
+            delays.append((checks[index] - change) / HOUR)
+    counted = [t for t in checks if since <= t < until]
+    return len(counted) / ((until - since) / WEEK), delays
+
+
+def report(name: str, policies: List[Tuple[str, Callable[[], List[float]]]], changes: List[float],
+           since: float, until: float):
+    print(f"\n{name}")
+    print(f"{'estrategia':<22} {'pedidos/sem':>12} {'mediana':>9} {'p95':>8} {'máx':>8}")
+    for label, make in policies:
+        requests_per_week, delays = evaluate(make(), changes, since, until)
+        ordered = sorted(delays) or [0.0]
+        p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+        print(f"{label:<22} {requests_per_week:>12.1f} {statistics.median(ordered):>8.1f}h "
+              f"{p95:>7.1f}h {ordered[-1]:>7.1f}h")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--weeks', type=int, default=12)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    matches, standings, fixtures = league(args.weeks, random.Random(args.seed))
+    since = START + args.warmup * WEEK
+    start_day = datetime.fromtimestamp(START, LEAGUE_TZ).date()
+    print(f"{args.weeks} semanas desde el {start_day} ({args.warmup} de aprendizaje), "
+          f"{len(matches)} partidos, {len(standings)} cambios de posiciones, {len(fixtures)} de fixture")
+    for name, changes in (("Posiciones", standings), ("Fixture", fixtures)):
+        report(name, [
+            ("cron lun/mié 9:00", lambda: cron_times(args.weeks)),
+            ("cada 6 h", lambda: fixed_times(args.weeks, 6 * HOUR)),
+            ("cada 1 h", lambda: fixed_times(args.weeks, HOUR)),
+            ("adaptativo", lambda: adaptive_times(args.weeks, changes, matches)),
+        ], changes, since, START + args.weeks * WEEK)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark del historial de posiciones (`app/history.py`).
+
+Simula varias temporadas de tablas dos veces por semana para cada liga,
+las registra en un archivo temporal y mide:
+
+- tiempo de registro y de recarga desde disco
+- tamaño del archivo y memoria retenida por el historial en memoria
+- latencia de "tabla a una fecha" y de "trayectoria de un equipo"
+
+Uso:
+    python benchmarks/bench_history.py [--seasons 3] [--leagues 4] [--teams 12]
+"""
+import argparse
+import gc
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.history import HistoryStore  # noqa: E402
+
+SNAPSHOTS_PER_SEASON = 2 * 40  # lunes y miércoles, ~40 semanas de temporada
+
+
+def simulate_league(teams: int, snapshots: int, seed: int):
+    """Tablas sucesivas de una liga: cada fecha suma puntos y reordena"""
+    rng = random.Random(seed)
+    names = [f"Club {seed}-{i}" for i in range(teams)]
+    points = {name: 0 for name in names}
+    played = {name: 0 for name in names}
+    for snapshot in range(snapshots):
+        # Algunas tablas se repiten (no hubo partidos entre dos scrapings)
+        if snapshot and rng.random() < 0.3:
+            yield table
+            continue
+        for name in names:
+            played[name] += 1
+            points[name] += rng.choice((1, 2, 2, 3))
+        ordered = sorted(names, key=lambda n: -points[n])
+        table = [{"posicion": i + 1, "equipo": name, "puntos": points[name], "jugados": played[name],
+                  "ganados": points[name] // 2, "perdidos": played[name] - points[name] // 2}
+                 for i, name in enumerate(ordered)]
+        yield table
+
+
+def timed(fn, rounds: int = 200) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seasons', type=int, default=3)
+    parser.add_argument('--leagues', type=int, default=4)
+    parser.add_argument('--teams', type=int, default=12)
+    args = parser.parse_args()
+
+    snapshots = args.seasons * SNAPSHOTS_PER_SEASON
+    start_date = datetime(2023, 3, 1)
+    path = os.path.join(tempfile.mkdtemp(), 'history.jsonl')
+    sources = [f"liga-{i}" for i in range(args.leagues)]
+
+    store = HistoryStore(path)
+    started = time.perf_counter()
+    recorded = 0
+    for index, source in enumerate(sources):
+        for n, table in enumerate(simulate_league(args.teams, snapshots, index)):
+            at = start_date + timedelta(days=3.5 * n)
+            recorded += store.record(source, table, at.isoformat())
+    record_seconds = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    reloaded = HistoryStore(path)
+    reloaded.get(sources[0])
+    load_seconds = time.perf_counter() - started
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    source = sources[0]
+    team = f"Club 0-{args.teams // 2}"
+    middle = (start_date + timedelta(days=3.5 * snapshots / 2)).date().isoformat()
+    print(f"{args.leagues} ligas x {snapshots} scrapings ({args.seasons} temporadas), {recorded} tablas distintas")
+    print(f"  registro:            {record_seconds * 1000:.1f} ms en total")
+    print(f"  archivo:             {os.path.getsize(path) / 1024:.1f} KiB")
+    print(f"  recarga desde disco: {load_seconds * 1000:.1f} ms, {retained / 1024:.1f} KiB en memoria")
+    print(f"  tabla a una fecha:   {timed(lambda: reloaded.table_at(source, middle)):.3f} ms (mediana)")
+    print(f"  trayectoria equipo:  {timed(lambda: reloaded.trajectory(source, team)):.3f} ms (mediana)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Costo de loguear para quien loguea: handler directo en stderr contra la cola.
+
+Simula los logs de un scraping (mensajes INFO repetidos por cada iframe y
+fila, más algún error con traceback) y mide la latencia por llamada a
+`logger.info` / `logger.error` con:
+
+- `basicConfig`: el handler anterior, que arma el mensaje y escribe en stderr
+  en el thread que loguea
+- `cola`: `app.logs.setup_logging` (formato en el thread del listener y
+  muestreo de mensajes repetidos dentro de la traza)
+
+La salida de los logs va a un archivo temporal (o a `--output`) para que la
+terminal no distorsione la medición. Informa p50/p99/máximo por llamada y
+cuántas líneas se escribieron.
+
+Uso:
+    python benchmarks/bench_logging.py [--scrapes 200] [--messages 50] [--output /dev/null]
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app import logs, tracing  # noqa: E402
+
+logger = logging.getLogger('app.scraper.bench')
+
+
+def run_scrapes(scrapes: int, messages: int) -> List[float]:
+    """Loguea como un scraping y retorna la duración de cada llamada en µs"""
+    durations = []
+    for n in range(scrapes):
+        with tracing.trace('scrape', source='bench'):
+            for i in range(messages):
+                start = time.perf_counter()
+                logger.info("Probando iframe %d/%d: %s", i + 1, messages, f"https://example.com/{n}/{i}")
+                durations.append((time.perf_counter() - start) * 1e6)
+            try:
+                raise ValueError("tabla vacía")
+            except ValueError:
+                start = time.perf_counter()
+                logger.error("Error procesando la tabla %d", n, exc_info=True)
+                durations.append((time.perf_counter() - start) * 1e6)
+    return durations
+
+
+def report(label: str, durations: List[float], lines: int):
+    ordered = sorted(durations)
+    p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+    print(f"{label:<12} {statistics.median(ordered):>8.1f}µs {p99:>8.1f}µs {ordered[-1]:>9.1f}µs {lines:>8}")
+
+
+def count_lines(path: str) -> int:
+    if path == os.devnull:
+        return 0
+    with open(path, encoding='utf-8') as f:
+        return sum(1 for _ in f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scrapes', type=int, default=200)
+    parser.add_argument('--messages', type=int, default=50)
+    parser.add_argument('--output', help="Archivo donde escribir los logs (por defecto un temporal)")
+    args = parser.parse_args()
+
+    output = args.output or tempfile.mkstemp(suffix='.log')[1]
+    print(f"{args.scrapes} scrapings x {args.messages + 1} logs, salida en {output}")
+    print(f"{'handler':<12} {'p50':>10} {'p99':>10} {'máx':>11} {'líneas':>8}")
+    original_stderr = sys.stderr
+    with open(output, 'w', encoding='utf-8') as sink:
+        sys.stderr = sink
+        try:
+            logging.basicConfig(level=logging.INFO, format=logs.TEXT_FORMAT, force=True)
+            durations = run_scrapes(args.scrapes, args.messages)
+            sink.flush()
+            baseline_lines = count_lines(output)
+            report("basicConfig", durations, baseline_lines)
+
+            logs.setup_logging(level='INFO', fmt='json')
+            durations = run_scrapes(args.scrapes, args.messages)
+            logs.shutdown_logging()
+            sink.flush()
+            report("cola", durations, count_lines(output) - baseline_lines)
+        finally:
+            sys.stderr = original_stderr
+    if not args.output:
+        os.remove(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Benchmark offline de los parsers usando HTML grabado de los sitios de origen.
+
+Corre cada etapa del scraping (parse, detect, extract) de ambos scrapers
+contra las páginas de `benchmarks/fixtures/`, también con tablas y fixtures
+escalados sintéticamente a 10x y 100x filas, y mide por etapa:
+
+- tiempo (mínimo y mediana de varias rondas, al estilo pytest-benchmark)
+- memoria pico asignada durante la etapa (tracemalloc)
+
+El baseline es de cada máquina: los tiempos dependen del hardware, así que
+no se versiona. Se graba con `--save-baseline` en
+`benchmarks/results/baseline_parsers-<máquina>.json` y, si existe (y no se
+pasa `--no-compare`), las corridas siguientes fallan con código de salida 1
+cuando alguna etapa empeora más que la tolerancia. Para no fallar por ruido,
+el tiempo se compara por el mínimo de las rondas y una etapa que parece más
+lenta se vuelve a medir `--repeat` veces: es regresión sólo si empeora en
+todas. Regrabar el baseline después de cambios intencionales en los
+parsers o en los modelos.
+
+Uso:
+    python benchmarks/bench_parsers.py [--rounds 10] [--save-baseline]
+        [--time-tolerance 1.0] [--memory-tolerance 0.25] [--repeat 3] [--filter voley]
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.scraper.basketball_scraper import BasketballScraper  # noqa: E402
+from app.scraper.parsing import parse_html  # noqa: E402
+from app.scraper.voley_scraper import VoleyScraper  # noqa: E402
+
+FIXTURES_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'fixtures')
+RESULTS_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'results')
+SCALES = (1, 10, 100)
+
+
+def default_baseline_file() -> str:
+    """Baseline de esta máquina y versión de Python (fuera de git, en benchmarks/results/)"""
+    machine = re.sub(r'[^A-Za-z0-9_.-]+', '_', platform.node() or 'local')
+    return os.path.join(RESULTS_DIR, f"baseline_parsers-{machine}-py{sys.version_info[0]}{sys.version_info[1]}.json")
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def _scale_blocks(html: str, pattern: str, factor: int) -> str:
+    """Repite `factor` veces los bloques que coinciden con el patrón, a continuación del último"""
+    blocks = list(re.finditer(pattern, html, flags=re.DOTALL))
+    if factor <= 1 or not blocks:
+        return html
+    extra = ''.join(block.group(0) for block in blocks) * (factor - 1)
+    end = blocks[-1].end()
+    return html[:end] + extra + html[end:]
+
+
+def scale_table(html: str, factor: int) -> str:
+    """Multiplica las filas de datos (las de <tbody>) de la primera tabla"""
+    start = html.index('<tbody')
+    end = html.index('</tbody>', start)
+    body = _scale_blocks(html[start:end], r'<tr\b.*?</tr>', factor)
+    return html[:start] + body + html[end:]
+
+
+def scale_matches(html: str, factor: int) -> str:
+    """Multiplica los partidos de una página de fixture de metrovoley"""
+    return _scale_blocks(
+        html, r'\s*<div class="itinerary-match">.*?<div class="match-status">.*?</div>\s*</div>', factor)
+
+
+def build_cases():
+    """Lista de (nombre, etapa, función) a medir; cada etapa recibe la salida de la anterior"""
+    basquet = BasketballScraper()
+    voley = VoleyScraper("https://metrovoley.com.ar/tournament/188/standings", name="voley/bench")
+    cases = []
+
+    def add_pipeline(name, html, stages):
+        cases.append((name, html, stages))
+
+    for scale in SCALES:
+        html = scale_table(load_fixture('basquet_clasificacion_v2.html'), scale)
+        add_pipeline(f'basquet/posiciones/x{scale}', html, [
+            ('parse', parse_html),
+            ('detect', basquet._find_standings_table),
+            ('extract', basquet._extract_standings_data),
+        ])
+    add_pipeline('basquet/fixture/x1', load_fixture('basquet_liga.html'), [
+        ('parse', parse_html),
+        ('extract', basquet._extract_fixtures_data),
+    ])
+    for scale in SCALES:
+        html = scale_table(load_fixture('metrovoley_posiciones.html'), scale)
+        add_pipeline(f'voley/posiciones/x{scale}', html, [
+            ('parse', parse_html),
+            ('detect', voley._find_standings_table),
+            ('extract', voley._extract_standings_data),
+        ])
+    for scale in SCALES:
+        html = scale_matches(load_fixture('metrovoley_fixture.html'), scale)
+        add_pipeline(f'voley/fixture/x{scale}', html, [
+            ('parse', parse_html),
+            ('extract', voley._extract_fixtures_data),
+        ])
+    return cases
+
+
+def measure(fn, arg, rounds: int, max_seconds: float = 3.0):
+    """Tiempo (min/mediana en ms) y memoria pico (KiB) de fn(arg).
+
+    Las etapas lentas cortan antes de `rounds` si superan `max_seconds`
+    (siempre con al menos 3 rondas).
+    """
+    fn(arg)  # calentamiento
+    timings = []
+    deadline = time.perf_counter() + max_seconds
+    for i in range(rounds):
+        gc.collect()
+        start = time.perf_counter()
+        result = fn(arg)
+        timings.append((time.perf_counter() - start) * 1000)
+        if i >= 2 and time.perf_counter() > deadline:
+            break
+
+    # La memoria se mide en una corrida aparte: tracemalloc distorsiona los tiempos
+    gc.collect()
+    tracemalloc.start()
+    fn(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, {
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def run(rounds: int, name_filter: str = None, keys=None):
+    """Mide las etapas de los casos; con `keys` sólo los casos que tienen alguna de esas etapas"""
+    results = {}
+    for name, html, stages in build_cases():
+        if name_filter and name_filter not in name:
+            continue
+        if keys is not None and not any(key.startswith(f'{name}/') for key in keys):
+            continue
+        value = html
+        for stage, fn in stages:
+            value, stats = measure(fn, value, rounds)
+            if isinstance(value, list):
+                stats['rows'] = len(value)
+            results[f'{name}/{stage}'] = stats
+            if value is None:
+                print(f"  ! {name}/{stage} no devolvió resultado; se omiten las etapas siguientes")
+                break
+    return results
+
+
+def compare(results, baseline, time_tolerance: float, memory_tolerance: float):
+    """Etapas que empeoraron respecto del baseline más allá de la tolerancia: {etapa: motivo}"""
+    regressions = {}
+    for key, stats in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if stats['min_ms'] > base['min_ms'] * (1 + time_tolerance):
+            regressions[key] = f"{key}: mínimo {stats['min_ms']} ms vs {base['min_ms']} ms en el baseline"
+        elif stats['peak_kib'] > base['peak_kib'] * (1 + memory_tolerance):
+            regressions[key] = f"{key}: memoria pico {stats['peak_kib']} KiB vs {base['peak_kib']} KiB en el baseline"
+    return regressions
+
+
+def confirm(regressions, baseline, args):
+    """Vuelve a medir las etapas que empeoraron; quedan las que empeoran en todas las repeticiones"""
+    for _ in range(args.repeat - 1):
+        if not regressions:
+            break
+        results = run(args.rounds, args.filter, keys=set(regressions))
+        again = compare({key: stats for key, stats in results.items() if key in regressions},
+                        baseline, args.time_tolerance, args.memory_tolerance)
+        regressions = {key: again[key] for key in regressions if key in again}
+    return list(regressions.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--filter', default=None, help="Sólo casos cuyo nombre contenga este texto")
+    parser.add_argument('--baseline', default=None,
+                        help="Archivo del baseline (por defecto, el de esta máquina en benchmarks/results/)")
+    parser.add_argument('--save-baseline', action='store_true', help="Guardar los resultados como nuevo baseline")
+    parser.add_argument('--no-compare', action='store_true', help="No comparar contra el baseline")
+    parser.add_argument('--time-tolerance', type=float, default=1.0,
+                        help="Empeoramiento relativo del tiempo mínimo permitido (1.0 = 100%%)")
+    parser.add_argument('--memory-tolerance', type=float, default=0.25,
+                        help="Empeoramiento relativo de la memoria pico permitido")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Veces que una etapa tiene que empeorar para contar como regresión")
+    parser.add_argument('--json', default=None, help="Escribir los resultados en este archivo")
+    args = parser.parse_args()
+    baseline_file = args.baseline or default_baseline_file()
+
+    # Los logs INFO de los scrapers no aportan nada acá y ensucian la salida
+    logging.disable(logging.INFO)
+    results = run(args.rounds, args.filter)
+
+    print(f"{'caso/etapa':<36} {'min ms':>9} {'mediana ms':>11} {'pico KiB':>10} {'filas':>6}")
+    for key, stats in results.items():
+        print(f"{key:<36} {stats['min_ms']:>9.3f} {stats['median_ms']:>11.3f} "
+              f"{stats['peak_kib']:>10.1f} {stats.get('rows', ''):>6}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(baseline_file) or '.', exist_ok=True)
+        with open(baseline_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nBaseline guardado en {baseline_file}")
+        return 0
+
+    if args.no_compare:
+        return 0
+    if not os.path.exists(baseline_file):
+        print(f"\nNo hay baseline para esta máquina ({baseline_file}); grabarlo con --save-baseline")
+        return 0
+
+    with open(baseline_file, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = confirm(compare(results, baseline, args.time_tolerance, args.memory_tolerance), baseline, args)
+    if regressions:
+        print("\nREGRESIONES respecto del baseline:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print("\nSin regresiones respecto del baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
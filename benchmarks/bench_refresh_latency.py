@@ -0,0 +1,150 @@
+"""Latencia de la API mientras se refrescan todas las ligas, con y sin pool de extracción.
+
+Por cada modo (extracción en el proceso principal y con `EXTRACTION_PROCESSES`
+procesos) levanta en un subproceso la API con uvicorn, dentro del mismo
+event loop que corre `refresh_all_leagues()`, apuntada al simulador de sitios
+de origen con páginas escaladas (`--page-scale`) para que el parseo pese. Mide
+la latencia de una ruta en caché:
+
+- `reposo`: sin refrescos en curso
+- `refresco`: mientras se encadenan `--rounds` refrescos completos (con las
+  páginas compartidas vaciadas antes de cada uno, para que se vuelvan a parsear)
+
+e informa p50/p95/p99 por fase y la duración media de cada refresco.
+
+Uso:
+    python benchmarks/bench_refresh_latency.py [--processes 2] [--rounds 5]
+        [--page-scale 20] [--concurrency 8] [--route /api/standings/basquet]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+IDLE_SECONDS = 3.0
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "n": 0}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "n": len(ordered)}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def measure(args) -> Dict:
+    import httpx
+    import uvicorn
+
+    from app import main as api
+    from app.scraper.snapshots import page_snapshots
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(api.app, host='127.0.0.1', port=port, log_level='warning'))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    # Primer refresco: llena las cachés que sirve la ruta medida
+    await api.refresh_all_leagues()
+
+    latencies: Dict[str, List[float]] = {"reposo": [], "refresco": []}
+    phase = {"name": "reposo"}
+    stop = asyncio.Event()
+
+    async def client(http):
+        while not stop.is_set():
+            started = time.perf_counter()
+            await http.get(args.route)
+            latencies[phase["name"]].append(time.perf_counter() - started)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=30) as http:
+        clients = [asyncio.create_task(client(http)) for _ in range(args.concurrency)]
+        await asyncio.sleep(IDLE_SECONDS)
+        phase["name"] = "refresco"
+        refreshes = []
+        for _ in range(args.rounds):
+            page_snapshots.clear()
+            started = time.perf_counter()
+            await api.refresh_all_leagues()
+            refreshes.append(time.perf_counter() - started)
+        stop.set()
+        await asyncio.gather(*clients)
+
+    server.should_exit = True
+    await serving
+    return {
+        "latency": {name: percentiles(samples) for name, samples in latencies.items()},
+        "refresh_seconds": statistics.mean(refreshes),
+    }
+
+
+def run_child(args):
+    """Corre la medición de un modo y escribe el resultado como JSON en stdout"""
+    from upstream_simulator import start_simulator
+
+    logging.disable(logging.WARNING)
+    server = start_simulator(port=0, page_scale=args.page_scale)
+    os.environ['UPSTREAM_BASE_URL'] = f"http://127.0.0.1:{server.server_address[1]}"
+    result = asyncio.run(measure(args))
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=2)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--page-scale', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--route', default='/api/standings/basquet')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return run_child(args)
+
+    history_dir = tempfile.mkdtemp()
+    print(f"Ruta {args.route}, {args.concurrency} clientes, {args.rounds} refrescos completos, "
+          f"páginas x{args.page_scale}")
+    print(f"{'modo':<22} {'fase':<9} {'p50':>8} {'p95':>8} {'p99':>8} {'pedidos':>8} {'refresco':>9}")
+    for processes in (0, args.processes):
+        env = dict(os.environ, ENVIRONMENT='development', EXTRACTION_PROCESSES=str(processes),
+                   HISTORY_FILE=os.path.join(history_dir, f'history-{processes}.jsonl'),
+                   PYTHONPATH=ROOT_DIR)
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', '--rounds', str(args.rounds),
+             '--page-scale', str(args.page_scale), '--concurrency', str(args.concurrency),
+             '--route', args.route],
+            # En un directorio temporal para no pisar los HTML de depuración del repo
+            env=env, cwd=history_dir, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        mode = f"pool de {processes} procesos" if processes else "proceso principal"
+        for phase, stats in result["latency"].items():
+            refresh = f"{result['refresh_seconds'] * 1000:.0f}ms" if phase == 'refresco' else ''
+            print(f"{mode:<22} {phase:<9} {stats['p50']:>6.1f}ms {stats['p95']:>6.1f}ms "
+                  f"{stats['p99']:>6.1f}ms {stats['n']:>8} {refresh:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Memoria y costo de serialización por cada 1000 filas de posiciones y fixtures.
+
+Compara la representación anterior (un dict por fila; en voley los números
+quedaban como strings) con los registros compactos de `app/scraper/models.py`.
+Las filas se arman a partir de celdas de texto como las que devuelve el
+parser, y se mide la memoria que queda retenida (tracemalloc) y el tiempo de
+convertir los registros a la forma JSON de la API.
+
+Uso:
+    python benchmarks/bench_row_memory.py [--rows 1000]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.scraper.models import FixtureRow, StandingRow, fixtures_to_dicts, parse_int, standings_to_dicts  # noqa: E402
+
+NUMBER_FIELDS = ('jugados', 'ganados', 'perdidos', 'favor', 'contra', 'puntos')
+
+
+def make_cells(count: int):
+    """Celdas de texto (con espacios, como las entrega el parser) para `count` filas"""
+    standings = [[f" {i + 1} ", f"  Club Atlético {i}  "] + [f" {(i * 7 + j) % 90} " for j in range(6)]
+                 for i in range(count)]
+    fixtures = [[f" Club {i} ", f" Club {i + 1} ", f" {i % 28 + 1:02d}/05/2025 ", " 21:00 "]
+                for i in range(count)]
+    return standings, fixtures
+
+
+def voley_dicts(cells):
+    """Forma anterior de voley: todo como strings"""
+    rows = []
+    for cols in cells:
+        row = {'posicion': cols[0].strip(), 'equipo': cols[1].strip()}
+        for field, value in zip(NUMBER_FIELDS, cols[2:]):
+            row[field] = value.strip()
+        rows.append(row)
+    return rows
+
+
+def basquet_dicts(cells):
+    """Forma anterior de básquet: ints y `diferencia` calculada"""
+    rows = []
+    for cols in cells:
+        row = {'posicion': parse_int(cols[0]), 'equipo': cols[1].strip()}
+        for field, value in zip(NUMBER_FIELDS, cols[2:]):
+            row[field] = parse_int(value)
+        row['diferencia'] = row['favor'] - row['contra']
+        rows.append(row)
+    return rows
+
+
+def standing_rows(cells):
+    return [StandingRow.from_dict(row) for row in voley_dicts(cells)]
+
+
+def fixture_dicts(cells):
+    return [{"local": c[0].strip(), "visitante": c[1].strip(), "fecha": c[2].strip(), "hora": c[3].strip(),
+             "es_casa_local": 'padua' in c[0].lower()} for c in cells]
+
+
+def fixture_rows(cells):
+    return [FixtureRow(c[0].strip(), c[1].strip(), c[2].strip(), c[3].strip(), 'padua' in c[0].lower())
+            for c in cells]
+
+
+def retained_kib(build, cells) -> float:
+    """Memoria que sigue asignada después de construir las filas"""
+    gc.collect()
+    tracemalloc.start()
+    rows = build(cells)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return current / 1024
+
+
+def serialize_ms(fn, rows, rounds: int = 20) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(rows)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    args = parser.parse_args()
+
+    standings_cells, fixture_cells = make_cells(args.rows)
+    print(f"Memoria retenida por {args.rows} filas")
+    print(f"{'representación':<34} {'KiB':>9} {'bytes/fila':>11}")
+    for name, build, cells in [
+        ('posiciones voley (dict, strings)', voley_dicts, standings_cells),
+        ('posiciones básquet (dict, ints)', basquet_dicts, standings_cells),
+        ('posiciones StandingRow', standing_rows, standings_cells),
+        ('fixtures (dict)', fixture_dicts, fixture_cells),
+        ('fixtures FixtureRow', fixture_rows, fixture_cells),
+    ]:
+        kib = retained_kib(build, cells)
+        print(f"{name:<34} {kib:>9.1f} {kib * 1024 / args.rows:>11.0f}")
+
+    print(f"\nSerialización a la forma JSON de la API ({args.rows} filas, mínimo de 20 rondas)")
+    print(f"  standings_to_dicts: {serialize_ms(standings_to_dicts, standing_rows(standings_cells)):.3f} ms")
+    print(f"  fixtures_to_dicts:  {serialize_ms(fixtures_to_dicts, fixture_rows(fixture_cells)):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Benchmark del tiempo de arranque de la API basado en `python -X importtime`.
+
+Importa `app.main` en un proceso nuevo, suma los tiempos reportados por el
+intérprete y falla (código de salida 1) si:
+
+- el import acumulado de `app.main` supera el presupuesto en milisegundos, o
+- alguna dependencia pesada (Selenium, webdriver_manager, bs4, APScheduler)
+  se importa durante el arranque en lugar de en el primer uso.
+
+Uso:
+    python benchmarks/bench_startup.py [--budget-ms 1500] [--top 15] [--runs 3]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que no deben cargarse al importar la aplicación
+LAZY_MODULES = ['selenium', 'webdriver_manager', 'bs4', 'apscheduler']
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure_import(module: str = 'app.main'):
+    """Importa el módulo en un subproceso y devuelve las filas de -X importtime"""
+    env = dict(os.environ)
+    # Evitar que el arranque dependa del scheduler o de variables del entorno
+    env['ENVIRONMENT'] = 'development'
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {module}:\n{result.stderr}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append({
+                'module': name,
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us),
+                # El primer espacio es el separador; cada nivel suma dos espacios
+                'depth': (len(indent) - 1) // 2,
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default='app.main')
+    parser.add_argument('--budget-ms', type=float, default=1500.0,
+                        help="Tiempo máximo permitido para importar el módulo")
+    parser.add_argument('--top', type=int, default=15,
+                        help="Cantidad de imports más costosos a mostrar")
+    parser.add_argument('--runs', type=int, default=3,
+                        help="Repeticiones; se informa la mejor para reducir ruido")
+    args = parser.parse_args()
+
+    best_rows = None
+    best_total = None
+    for _ in range(max(1, args.runs)):
+        rows = measure_import(args.module)
+        total = next((r['cumulative_us'] for r in rows if r['module'] == args.module), 0)
+        if best_total is None or total < best_total:
+            best_rows, best_total = rows, total
+
+    print(f"Import de {args.module}: {best_total / 1000:.1f} ms (presupuesto {args.budget_ms:.0f} ms)")
+    print(f"\nTop {args.top} imports por tiempo acumulado:")
+    # -X importtime lista cada módulo después de sus dependencias: los imports
+    # directos del módulo medido son las filas de profundidad 1 que lo preceden
+    target_index = next(i for i, r in enumerate(best_rows) if r['module'] == args.module)
+    top_level = []
+    for row in reversed(best_rows[:target_index]):
+        if row['depth'] == 0:
+            break
+        if row['depth'] == 1:
+            top_level.append(row)
+    top_level.sort(key=lambda r: r['cumulative_us'], reverse=True)
+    for row in top_level[:args.top]:
+        print(f"  {row['cumulative_us'] / 1000:8.1f} ms  {row['module']}")
+
+    failures = []
+    if best_total / 1000 > args.budget_ms:
+        failures.append(f"el import tardó {best_total / 1000:.1f} ms (> {args.budget_ms:.0f} ms)")
+
+    imported = {r['module'].split('.')[0] for r in best_rows}
+    for module in LAZY_MODULES:
+        if module in imported:
+            failures.append(f"'{module}' se importa al arrancar y debería cargarse en el primer uso")
+
+    if failures:
+        print("\nFALLÓ:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+
+    print("\nOK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""Prueba de carga de la API con percentiles de latencia.
+
+Levanta la API con uvicorn apuntada al simulador de sitios de origen
+(`upstream_simulator.py`) y dispara peticiones concurrentes contra todas las
+rutas GET de lectura de `app.main`, en tres escenarios:
+
+- `cold`: servidor recién levantado, las primeras peticiones disparan scraping
+- `warm`: todas las rutas ya tienen datos en caché
+- `refreshing`: con caché caliente, mientras se fuerzan actualizaciones
+  (`/update`) en paralelo
+
+Por escenario y por ruta informa throughput y latencias p50/p95/p99, y
+escribe los resultados en JSON para comparar cambios en el camino de
+respuesta a lo largo del tiempo.
+
+Uso:
+    python benchmarks/loadtest.py [--concurrency 20] [--duration 10]
+        [--scenarios cold,warm,refreshing] [--upstream-latency-ms 300]
+        [--output benchmarks/results/loadtest.json]
+
+Sin Chrome instalado los standings de voley fallan en cada petición (no
+llegan a cachearse), así que esas rutas se comportan siempre como "cold".
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx  # noqa: E402
+
+from upstream_simulator import start_simulator  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'results')
+
+# Rutas que no se incluyen en la carga: las que fuerzan scraping se usan como
+# disparador del escenario "refreshing"; las de diagnóstico no son de lectura
+EXCLUDED_PREFIXES = ('/metrics', '/api/debug', '/api/status', '/docs', '/redoc', '/openapi.json')
+REFRESH_ROUTES = ['/api/standings/basquet/update', '/api/fixtures/basquet/update']
+
+
+def discover_routes() -> List[str]:
+    """Rutas GET sin parámetros de path de app.main, excepto las de actualización"""
+    os.environ.setdefault('ENVIRONMENT', 'development')
+    from app.main import app
+
+    routes = []
+    for route in app.routes:
+        path = getattr(route, 'path', '')
+        methods = getattr(route, 'methods', None) or set()
+        if 'GET' not in methods or '{' in path or path.endswith('/update'):
+            continue
+        if path.startswith(EXCLUDED_PREFIXES):
+            continue
+        routes.append(path)
+    return routes
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_api(port: int, upstream_url: str) -> subprocess.Popen:
+    env = dict(os.environ, ENVIRONMENT='development', UPSTREAM_BASE_URL=upstream_url)
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.main:app', '--host', '127.0.0.1',
+         '--port', str(port), '--log-level', 'warning'],
+        cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f'http://127.0.0.1:{port}/', timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("La API no arrancó en 30 segundos")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict:
+    values = sorted(latencies)
+    return {
+        "requests": len(values) + errors,
+        "errors": errors,
+        "throughput_rps": round((len(values) + errors) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+
+async def run_load(base_url: str, routes: List[str], concurrency: int, duration: float,
+                   refresh_interval: float = 0.0) -> Dict:
+    """Dispara peticiones round-robin durante `duration` segundos con `concurrency` workers"""
+    latencies: Dict[str, List[float]] = {route: [] for route in routes}
+    errors: Dict[str, int] = {route: 0 for route in routes}
+    stop_at = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency + 2, max_keepalive_connections=concurrency + 2)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        async def worker(offset: int):
+            i = offset
+            while time.perf_counter() < stop_at:
+                route = routes[i % len(routes)]
+                i += 1
+                start = time.perf_counter()
+                try:
+                    response = await client.get(route)
+                    ok = response.status_code < 500
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies[route].append(time.perf_counter() - start)
+                else:
+                    errors[route] += 1
+
+        async def refresher():
+            # Forzar actualizaciones una tras otra para que siempre haya un scraping en curso
+            while time.perf_counter() < stop_at:
+                for route in REFRESH_ROUTES:
+                    try:
+                        await client.get(route)
+                    except httpx.HTTPError:
+                        pass
+                await asyncio.sleep(refresh_interval)
+
+        start = time.perf_counter()
+        tasks = [worker(i) for i in range(concurrency)]
+        if refresh_interval > 0:
+            tasks.append(refresher())
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "overall": summarize(all_latencies, sum(errors.values()), elapsed),
+        "routes": {route: summarize(latencies[route], errors[route], elapsed) for route in routes},
+    }
+
+
+async def warm_up(base_url: str, routes: List[str]):
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        for route in routes:
+            try:
+                await client.get(route)
+            except httpx.HTTPError:
+                pass
+
+
+def run_scenario(name: str, routes: List[str], upstream_url: str, args) -> Dict:
+    port = free_port()
+    process = start_api(port, upstream_url)
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        if name != 'cold':
+            asyncio.run(warm_up(base_url, routes))
+        refresh_interval = 0.05 if name == 'refreshing' else 0.0
+        return asyncio.run(run_load(base_url, routes, args.concurrency, args.duration, refresh_interval))
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=10.0, help="Segundos de carga por escenario")
+    parser.add_argument('--scenarios', default='cold,warm,refreshing')
+    parser.add_argument('--routes', default=None, help="Lista de rutas separadas por coma (por defecto, todas)")
+    parser.add_argument('--upstream-latency-ms', type=float, default=300.0,
+                        help="Latencia del simulador de sitios de origen")
+    parser.add_argument('--simulator-port', type=int, default=0, help="0 = puerto libre cualquiera")
+    parser.add_argument('--output', default=None, help="Archivo JSON de resultados")
+    args = parser.parse_args()
+
+    # Importar app.main para descubrir las rutas configura logging en INFO;
+    # los logs de cada petición de httpx ensucian la salida
+    logging.disable(logging.INFO)
+    routes = args.routes.split(',') if args.routes else discover_routes()
+    simulator_port = args.simulator_port or free_port()
+    simulator = start_simulator(port=simulator_port, latency_ms=args.upstream_latency_ms,
+                                jitter_ms=args.upstream_latency_ms / 3)
+    upstream_url = f'http://127.0.0.1:{simulator_port}'
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "upstream_latency_ms": args.upstream_latency_ms,
+            "routes": routes,
+        },
+        "scenarios": {},
+    }
+    try:
+        for scenario in args.scenarios.split(','):
+            print(f"\n== Escenario {scenario} ({args.concurrency} conexiones, {args.duration:.0f}s) ==")
+            result = run_scenario(scenario, routes, upstream_url, args)
+            results["scenarios"][scenario] = result
+            overall = result["overall"]
+            print(f"{'ruta':<36} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errores':>8}")
+            for route, stats in list(result["routes"].items()) + [("TOTAL", overall)]:
+                print(f"{route:<36} {stats['throughput_rps']:>8} {stats['p50_ms']:>9} "
+                      f"{stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['errors']:>8}")
+    finally:
+        simulator.shutdown()
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"loadtest-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResultados guardados en {output}")
+
+
+if __name__ == "__main__":
+    main()
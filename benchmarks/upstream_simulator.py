@@ -0,0 +1,256 @@
+"""Simulador local de los sitios de origen para pruebas de carga offline.
+
+Sirve las páginas grabadas en `benchmarks/fixtures/` en lugar de
+argentina.basketball, gesdeportiva y metrovoley, con latencia, errores,
+timeouts y cambios de contenido configurables. Los scrapers se apuntan al
+simulador con la variable `UPSTREAM_BASE_URL`: cada URL original
+`https://<host>/<path>` se pide como `<UPSTREAM_BASE_URL>/<host>/<path>`.
+
+    python benchmarks/upstream_simulator.py --port 8081 --latency-ms 300 --error-rate 0.05
+    UPSTREAM_BASE_URL=http://127.0.0.1:8081 ENVIRONMENT=development \\
+        python -m uvicorn app.main:app --port 8000
+
+Endpoints de control (para cambiar el escenario en medio de una prueba):
+
+- `GET  /_sim/config`  configuración actual
+- `POST /_sim/config`  actualiza parámetros, p.ej. {"down_hosts": ["metrovoley.com.ar"]}
+- `GET  /_sim/stats`   peticiones recibidas por host, ruta y código
+- `POST /_sim/reset`   reinicia contadores y versiones de contenido
+
+Nota: los standings de voley se obtienen con Chrome, que también respeta
+`UPSTREAM_BASE_URL`, pero las páginas de metrovoley grabadas son estáticas.
+"""
+import argparse
+import fnmatch
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# (host, patrón del path, versiones del contenido). Cuando hay varias
+# versiones, el contenido cambia cada `change_every` peticiones a esa ruta.
+ROUTES = [
+    ('www.argentina.basketball', '/liga-federal/fixture-posiciones/conferencia-metropolitana-zona-*',
+     ['basquet_liga.html']),
+    ('widgetscab.gesdeportiva.es', '/widget/informacion/clasificacion/*',
+     ['basquet_clasificacion_v1.html', 'basquet_clasificacion_v2.html']),
+    ('metrovoley.com.ar', '/tournament/*/standings',
+     ['metrovoley_posiciones.html', 'metrovoley_posiciones.html#swap']),
+    ('metrovoley.com.ar', '/tournament/*/schedule',
+     ['metrovoley_fixture.html']),
+]
+
+DEFAULT_CONFIG = {
+    "latency_ms": 0.0,        # latencia media de cada respuesta
+    "jitter_ms": 0.0,         # variación uniforme +/- sobre la latencia
+    "error_rate": 0.0,        # proporción de respuestas 503
+    "timeout_rate": 0.0,      # proporción de respuestas que se cuelgan `hang_seconds`
+    "hang_seconds": 30.0,     # más que el timeout de 15 s de los scrapers
+    "change_every": 0,        # cada cuántas peticiones rota la versión del contenido (0 = nunca)
+    "page_scale": 1,          # multiplica las filas de las tablas y los partidos de cada página
+    "down_hosts": [],         # hosts que responden siempre 503
+}
+
+
+def _swap_first_rows(html: str) -> str:
+    """Variante de una tabla con las dos primeras filas de datos intercambiadas"""
+    start = html.index('<tbody')
+    rows = list(re.finditer(r'<tr\b.*?</tr>', html[start:], flags=re.DOTALL))
+    if len(rows) < 2:
+        return html
+    first, second = rows[0], rows[1]
+    body = html[start:]
+    body = (body[:first.start()] + second.group(0) + body[first.end():second.start()]
+            + first.group(0) + body[second.end():])
+    return html[:start] + body
+
+
+def _scale_page(html: str, factor: int) -> str:
+    """Página con las filas de cada tabla y los partidos repetidos `factor` veces (páginas más pesadas)"""
+    if factor <= 1:
+        return html
+
+    def repeat_rows(match):
+        rows = re.findall(r'<tr\b.*?</tr>', match.group(2), flags=re.DOTALL)
+        return match.group(1) + match.group(2) + ''.join(rows) * (factor - 1) + match.group(3)
+
+    html = re.sub(r'(<tbody[^>]*>)(.*?)(</tbody>)', repeat_rows, html, flags=re.DOTALL)
+    matches = list(re.finditer(
+        r'\s*<div class="itinerary-match">.*?<div class="match-status">.*?</div>\s*</div>', html, flags=re.DOTALL))
+    if matches:
+        end = matches[-1].end()
+        html = html[:end] + ''.join(m.group(0) for m in matches) * (factor - 1) + html[end:]
+    return html
+
+
+class SimulatorState:
+    def __init__(self, config: Dict):
+        self.config = dict(DEFAULT_CONFIG, **config)
+        self.stats = Counter()
+        self.route_hits = Counter()
+        self._pages: Dict[str, str] = {}
+        self.lock = threading.Lock()
+
+    def page(self, name: str) -> str:
+        scale = int(self.config["page_scale"])
+        key = f"{name}@{scale}"
+        if key not in self._pages:
+            filename, _, variant = name.partition('#')
+            with open(os.path.join(FIXTURES_DIR, filename), encoding='utf-8') as f:
+                html = f.read()
+            if variant == 'swap':
+                html = _swap_first_rows(html)
+            self._pages[key] = _scale_page(html, scale)
+        return self._pages[key]
+
+    def resolve(self, host: str, path: str) -> Optional[str]:
+        """Página a servir para host+path según la versión de contenido vigente"""
+        for index, (route_host, pattern, versions) in enumerate(ROUTES):
+            if host == route_host and fnmatch.fnmatch(path, pattern):
+                with self.lock:
+                    hits = self.route_hits[index]
+                    self.route_hits[index] += 1
+                    change_every = int(self.config["change_every"])
+                version = (hits // change_every) % len(versions) if change_every > 0 else 0
+                return self.page(versions[version])
+        return None
+
+    def record(self, host: str, path: str, status):
+        with self.lock:
+            self.stats[(host, path, str(status))] += 1
+
+    def stats_as_list(self) -> List[Dict]:
+        with self.lock:
+            return [{"host": host, "path": path, "status": status, "count": count}
+                    for (host, path, status), count in sorted(self.stats.items())]
+
+
+def make_handler(state: SimulatorState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: str, content_type: str = 'text/html; charset=utf-8'):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_json(self, payload, status: int = 200):
+            self._send(status, json.dumps(payload, indent=2), 'application/json')
+
+        def do_GET(self):
+            if self.path.startswith('/_sim/'):
+                return self._control_get()
+
+            # /<host>/<path>?<query>
+            _, host, rest = (self.path.split('/', 2) + [''])[:3]
+            path = '/' + rest.split('?', 1)[0]
+
+            with state.lock:
+                config = dict(state.config)
+            delay = max(0.0, config["latency_ms"] + random.uniform(-1, 1) * config["jitter_ms"]) / 1000
+            roll = random.random()
+
+            if host in config["down_hosts"]:
+                time.sleep(delay)
+                state.record(host, path, 503)
+                return self._send(503, 'Service Unavailable')
+            if roll < config["timeout_rate"]:
+                state.record(host, path, 'hang')
+                time.sleep(config["hang_seconds"])
+                return self._send(504, 'Gateway Timeout')
+            time.sleep(delay)
+            if roll < config["timeout_rate"] + config["error_rate"]:
+                state.record(host, path, 503)
+                return self._send(503, 'Service Unavailable')
+
+            page = state.resolve(host, path)
+            if page is None:
+                state.record(host, path, 404)
+                return self._send(404, 'Not Found')
+            state.record(host, path, 200)
+            self._send(200, page)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b'{}'
+            if self.path == '/_sim/config':
+                try:
+                    changes = json.loads(body or b'{}')
+                except ValueError:
+                    return self._send_json({"error": "JSON inválido"}, 400)
+                unknown = set(changes) - set(DEFAULT_CONFIG)
+                if unknown:
+                    return self._send_json({"error": f"Parámetros desconocidos: {sorted(unknown)}"}, 400)
+                with state.lock:
+                    state.config.update(changes)
+                    config = dict(state.config)
+                return self._send_json(config)
+            if self.path == '/_sim/reset':
+                with state.lock:
+                    state.stats.clear()
+                    state.route_hits.clear()
+                return self._send_json({"ok": True})
+            self._send_json({"error": "No encontrado"}, 404)
+
+        def _control_get(self):
+            if self.path == '/_sim/config':
+                with state.lock:
+                    return self._send_json(dict(state.config))
+            if self.path == '/_sim/stats':
+                return self._send_json({"requests": state.stats_as_list()})
+            self._send_json({"error": "No encontrado"}, 404)
+
+    return Handler
+
+
+def start_simulator(host: str = '127.0.0.1', port: int = 8081, **config) -> ThreadingHTTPServer:
+    """Levanta el simulador en un thread (útil desde otros scripts de benchmark)"""
+    server = ThreadingHTTPServer((host, port), make_handler(SimulatorState(config)))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency-ms', type=float, default=DEFAULT_CONFIG["latency_ms"])
+    parser.add_argument('--jitter-ms', type=float, default=DEFAULT_CONFIG["jitter_ms"])
+    parser.add_argument('--error-rate', type=float, default=DEFAULT_CONFIG["error_rate"])
+    parser.add_argument('--timeout-rate', type=float, default=DEFAULT_CONFIG["timeout_rate"])
+    parser.add_argument('--hang-seconds', type=float, default=DEFAULT_CONFIG["hang_seconds"])
+    parser.add_argument('--change-every', type=int, default=DEFAULT_CONFIG["change_every"])
+    parser.add_argument('--page-scale', type=int, default=DEFAULT_CONFIG["page_scale"])
+    parser.add_argument('--down-host', action='append', default=[], dest='down_hosts',
+                        help="Host que responde siempre 503 (se puede repetir)")
+    args = parser.parse_args()
+
+    config = {key: value for key, value in vars(args).items() if key in DEFAULT_CONFIG}
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(SimulatorState(config)))
+    server.daemon_threads = True
+    print(f"Simulador escuchando en http://{args.host}:{args.port}")
+    print(f"Apuntar los scrapers con UPSTREAM_BASE_URL=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
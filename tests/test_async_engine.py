@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.scraper.async_engine import AsyncScrapeEngine
+from app.scraper.resilience import FetchError, RetryPolicy
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+def use_handler(engine: AsyncScrapeEngine, handler):
+    """Cliente del motor con un transporte falso (sin red), en el loop actual"""
+    engine._ensure_loop_state()
+    engine._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_gather_returns_errors_and_cancels_what_times_out():
+    async def ok():
+        return 'ok'
+
+    async def broken():
+        raise ValueError('sin tabla')
+
+    async def slow():
+        await asyncio.sleep(5)
+
+    started = time.monotonic()
+    results = asyncio.run(AsyncScrapeEngine().gather(ok(), broken(), slow(), timeout=0.1))
+    assert time.monotonic() - started < 2
+    assert results[0] == 'ok'
+    assert isinstance(results[1], ValueError)
+    assert isinstance(results[2], asyncio.TimeoutError)
+
+
+def test_fetch_text_returns_the_body(monkeypatch):
+    monkeypatch.delenv('UPSTREAM_BASE_URL', raising=False)
+
+    async def scenario():
+        engine = AsyncScrapeEngine()
+        use_handler(engine, lambda request: httpx.Response(200, text=f"<p>{request.url.host}</p>"))
+        try:
+            return await engine.fetch_text('https://engine-ok.test/tabla', retry_policy=NO_RETRY)
+        finally:
+            await engine.aclose()
+
+    assert asyncio.run(scenario()) == '<p>engine-ok.test</p>'
+
+
+def test_http_errors_raise_fetch_error_with_status(monkeypatch):
+    monkeypatch.delenv('UPSTREAM_BASE_URL', raising=False)
+
+    async def scenario():
+        engine = AsyncScrapeEngine()
+        use_handler(engine, lambda request: httpx.Response(404))
+        try:
+            await engine.fetch_text('https://engine-404.test/tabla', retry_policy=NO_RETRY)
+        finally:
+            await engine.aclose()
+
+    with pytest.raises(FetchError) as error:
+        asyncio.run(scenario())
+    assert error.value.status_code == 404
+
+
+def test_concurrency_per_host_is_limited(monkeypatch):
+    monkeypatch.delenv('UPSTREAM_BASE_URL', raising=False)
+    active, peak = [0], [0]
+
+    async def handler(request):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.02)
+        active[0] -= 1
+        return httpx.Response(200, text='ok')
+
+    async def scenario():
+        engine = AsyncScrapeEngine(max_per_host=2)
+        use_handler(engine, handler)
+        try:
+            return await engine.gather(*(engine.fetch_text(f'https://engine-limit.test/{i}', retry_policy=NO_RETRY)
+                                         for i in range(6)))
+        finally:
+            await engine.aclose()
+
+    assert asyncio.run(scenario()) == ['ok'] * 6
+    assert peak[0] == 2
+
+
+def test_requests_per_second_spaces_requests_to_a_host():
+    async def scenario():
+        engine = AsyncScrapeEngine(requests_per_second=20)
+        started = time.monotonic()
+        for _ in range(4):
+            await engine._wait_host_slot('engine-rate.test')
+        return time.monotonic() - started
+
+    # El primero sale enseguida y los otros tres cada 50 ms
+    assert asyncio.run(scenario()) >= 0.14
+
+
+def test_client_is_rebuilt_for_a_new_event_loop():
+    engine = AsyncScrapeEngine()
+
+    async def semaphore():
+        return engine._host_semaphore('https://engine-loop.test/')
+
+    first = asyncio.run(semaphore())
+    second = asyncio.run(semaphore())
+    assert first is not second
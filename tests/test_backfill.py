@@ -0,0 +1,116 @@
+import asyncio
+import os
+
+import pytest
+
+from app import backfill
+from app.backfill import DONE, FAILED, MISSING, BackfillCheckpoint, BackfillPipeline
+from app.history import HistoryStore
+from app.scraper.async_engine import AsyncScrapeEngine
+from app.scraper.basketball_scraper import ALTERNATIVE_URLS, league_url
+from app.scraper.resilience import FetchError
+from app.scraper.snapshots import page_snapshots
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+class PagesEngine(AsyncScrapeEngine):
+    """Motor que responde con páginas fijas por URL en lugar de ir a la red"""
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = pages
+        self.requested = []
+
+    async def fetch_text(self, url, headers=None, timeout=None, retry_policy=None):
+        self.requested.append(url)
+        page = self.pages.get(url)
+        if isinstance(page, Exception):
+            raise page
+        if page is None:
+            raise FetchError(f"HTTP 404 para {url}", status_code=404)
+        return page
+
+
+@pytest.fixture(autouse=True)
+def clear_snapshots():
+    page_snapshots.clear()
+    yield
+    page_snapshots.clear()
+
+
+def test_parse_seasons_and_tournaments():
+    assert backfill.parse_seasons("2019-2021,2023") == [2019, 2020, 2021, 2023]
+    assert backfill.parse_tournaments("60-61,75:482") == [(60, None), (61, None), (75, 482)]
+
+
+def test_checkpoint_resume_rules(tmp_path):
+    checkpoint = BackfillCheckpoint(str(tmp_path / 'checkpoint.json'))
+    checkpoint.mark('done', DONE, None, 1)
+    checkpoint.mark('missing', MISSING, "Sin tabla", 0)
+    checkpoint.mark('failed', FAILED, "timeout", 0)
+    checkpoint.save()
+
+    restored = BackfillCheckpoint(checkpoint.path)
+    assert not restored.should_run('done', max_attempts=2)
+    assert not restored.should_run('missing', max_attempts=2)
+    assert restored.should_run('failed', max_attempts=2)
+    restored.mark('failed', FAILED, "timeout", 0)
+    assert not restored.should_run('failed', max_attempts=2)
+    assert restored.should_run('new', max_attempts=2)
+
+
+def run_pipeline(tmp_path, engine, targets):
+    checkpoint = BackfillCheckpoint(str(tmp_path / 'checkpoint.json'))
+    store = HistoryStore(str(tmp_path / 'history.jsonl'))
+    stats = asyncio.run(BackfillPipeline(targets, engine, checkpoint, store, concurrency=2).run())
+    return stats, checkpoint, store
+
+
+def test_pipeline_marks_missing_seasons_without_falling_back_to_current_pages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    table = load_fixture('basquet_clasificacion_v2.html')
+    pages = {
+        league_url('a', 2023): table,
+        league_url('a', 2019): "<html><body><p>Temporada sin datos</p></body></html>",
+        league_url('a', 2020): FetchError("HTTP 503", status_code=503),
+    }
+    # Si el backfill usara las páginas generales, guardaría la tabla en curso como si fuera de 2019
+    pages.update({url: table for url in ALTERNATIVE_URLS})
+    engine = PagesEngine(pages)
+    targets = backfill.basketball_targets([2019, 2020, 2023], ['a'])
+
+    stats, checkpoint, store = run_pipeline(tmp_path, engine, targets)
+
+    assert (stats[DONE], stats[MISSING], stats[FAILED]) == (1, 1, 1)
+    assert set(checkpoint.done) == {'basquet/zona-a-2023'}
+    assert set(checkpoint.missing) == {'basquet/zona-a-2019'}
+    assert set(checkpoint.failed) == {'basquet/zona-a-2020'}
+    assert not any(url in engine.requested for url in ALTERNATIVE_URLS)
+    assert store.sources() == ['basquet/zona-a-2023']
+    assert store.table_at('basquet/zona-a-2023')["meta"] == {"origin": "backfill", "season": 2023, "zone": "a"}
+    # Sin HTML de depuración en el directorio actual
+    assert sorted(os.listdir(tmp_path)) == ['checkpoint.json', 'history.jsonl']
+
+
+def test_pipeline_resume_only_retries_failed_targets(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    table = load_fixture('basquet_clasificacion_v2.html')
+    pages = {league_url('a', 2023): table, league_url('a', 2020): FetchError("HTTP 503", status_code=503)}
+    targets = backfill.basketball_targets([2020, 2023], ['a'])
+    run_pipeline(tmp_path, PagesEngine(pages), targets)
+
+    page_snapshots.clear()
+    pages[league_url('a', 2020)] = table
+    engine = PagesEngine(pages)
+    stats, checkpoint, store = run_pipeline(tmp_path, engine, targets)
+
+    assert stats["skipped"] == 1 and stats[DONE] == 1
+    assert engine.requested == [league_url('a', 2020)]
+    assert set(checkpoint.done) == {'basquet/zona-a-2020', 'basquet/zona-a-2023'}
+    assert not checkpoint.failed
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import threading
+
+from app import broadcaster as broadcaster_module
+from app.broadcaster import Broadcaster
+
+
+def event_data(event: bytes) -> dict:
+    lines = event.decode('utf-8').splitlines()
+    return json.loads(next(line[len('data: '):] for line in lines if line.startswith('data: ')))
+
+
+def test_new_subscribers_get_the_latest_state():
+    async def scenario():
+        hub = Broadcaster()
+        hub.bind_loop(asyncio.get_running_loop())
+        hub.publish('basquet/standings', {"standings": [1]}, 7)
+        stream = hub.stream('basquet/standings')
+        events = [await stream.__anext__(), await stream.__anext__()]
+        await stream.aclose()
+        return events, hub.subscriber_counts()
+
+    (retry, latest), counts = asyncio.run(scenario())
+    assert retry == b"retry: 10000\n\n"
+    assert latest.startswith(b"id: 7\nevent: update\n")
+    assert event_data(latest) == {"standings": [1], "version": 7}
+    # Al desconectarse el cliente deja de contar
+    assert counts == []
+
+
+def test_clients_with_the_current_version_do_not_get_it_again():
+    async def scenario():
+        hub = Broadcaster()
+        hub.bind_loop(asyncio.get_running_loop())
+        hub.publish('t', {"n": 1}, 3)
+        stream = hub.stream('t', last_event_id='3')
+        await stream.__anext__()
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.01)
+        assert not pending.done()
+        hub.publish('t', {"n": 2}, 4)
+        event = await asyncio.wait_for(pending, 1)
+        await stream.aclose()
+        return event
+
+    assert event_data(asyncio.run(scenario()))["n"] == 2
+
+
+def test_publishing_from_a_thread_reaches_every_subscriber():
+    async def scenario():
+        hub = Broadcaster()
+        hub.bind_loop(asyncio.get_running_loop())
+        streams = [hub.stream('t') for _ in range(3)]
+        for stream in streams:
+            await stream.__anext__()
+        receivers = [asyncio.ensure_future(stream.__anext__()) for stream in streams]
+        await asyncio.sleep(0)
+        thread = threading.Thread(target=hub.publish, args=('t', {"n": 1}, 1))
+        thread.start()
+        events = await asyncio.wait_for(asyncio.gather(*receivers), 1)
+        thread.join()
+        for stream in streams:
+            await stream.aclose()
+        return events
+
+    events = asyncio.run(scenario())
+    assert len(set(events)) == 1 and event_data(events[0])["n"] == 1
+
+
+def test_slow_clients_drop_the_oldest_events(monkeypatch):
+    monkeypatch.setattr(broadcaster_module, 'SUBSCRIBER_QUEUE_SIZE', 2)
+
+    async def scenario():
+        hub = Broadcaster()
+        hub.bind_loop(asyncio.get_running_loop())
+        hub.publish('t', {}, 0)
+        stream = hub.stream('t')
+        await stream.__anext__()
+        await stream.__anext__()
+        for version in range(1, 5):
+            hub.publish('t', {}, version)
+        events = [await stream.__anext__(), await stream.__anext__()]
+        await stream.aclose()
+        return events
+
+    assert [event_data(event)["version"] for event in asyncio.run(scenario())] == [3, 4]
+
+
+def test_idle_streams_send_heartbeats(monkeypatch):
+    monkeypatch.setattr(broadcaster_module, 'HEARTBEAT_SECONDS', 0.01)
+
+    async def scenario():
+        hub = Broadcaster()
+        stream = hub.stream('t')
+        await stream.__anext__()
+        event = await asyncio.wait_for(stream.__anext__(), 1)
+        await stream.aclose()
+        return event
+
+    assert asyncio.run(scenario()) == b": ping\n\n"
@@ -0,0 +1,106 @@
+from app import cadence
+from app.cadence import HOUR, MAX_INTERVAL, MIN_INTERVAL, AdaptiveScheduler, ChangeModel, RefreshCadence
+from app.jobs import RateLimited
+
+# Un lunes a las 00:00 (UTC)
+START = 1_700_438_400.0
+
+
+def interval(model: ChangeModel) -> float:
+    return model.next_check() - model.last_check
+
+
+def test_never_checked_is_due_immediately():
+    assert ChangeModel().next_check() == 0.0
+
+
+def train(changing: bool, weeks: int = 2) -> ChangeModel:
+    """Modelo chequeado cada hora durante `weeks` semanas, con o sin cambios"""
+    model = ChangeModel()
+    for i in range(weeks * 7 * 24):
+        model.observe(str(i) if changing else 'a', START + i * HOUR)
+    return model
+
+
+def test_quiet_content_backs_off_to_the_max_interval():
+    assert interval(train(changing=False)) == MAX_INTERVAL
+
+
+def test_changes_shorten_the_interval():
+    busy = interval(train(changing=True))
+    assert MIN_INTERVAL <= busy < MAX_INTERVAL / 2
+
+
+def test_interval_never_goes_below_the_minimum():
+    model = ChangeModel()
+    model.observe('a', START)
+    model.changes = [1000.0] * cadence.HOURS_PER_WEEK
+    assert interval(model) == MIN_INTERVAL
+
+
+def test_match_boost_brings_next_check_forward():
+    model = ChangeModel()
+    model.observe('a', START)
+    model.observe('a', START + HOUR)
+    assert model.next_check(lambda start, end: True) < model.next_check()
+
+
+def test_model_survives_serialization():
+    model = ChangeModel()
+    model.observe('a', START)
+    model.observe('b', START + 3 * HOUR)
+    restored = ChangeModel.from_dict(model.to_dict())
+    assert restored.next_check() == model.next_check()
+    assert restored.detected == 1
+
+
+def scheduler(submit, stagger=120.0) -> AdaptiveScheduler:
+    targets = [('basquet', 'standings'), ('basquet', 'fixtures'), ('voley/tira-a', 'standings')]
+    return AdaptiveScheduler(targets, submit, matches=None, cadence=RefreshCadence(path=None),
+                             first_check_stagger=stagger)
+
+
+def test_first_checks_are_staggered_on_boot():
+    launched = []
+    adaptive = scheduler(lambda source, kind: launched.append((source, kind)) or (None, 'encolado'))
+    adaptive.stagger_due(START)
+    assert adaptive.run_once(START) == 1
+    assert adaptive.run_once(START + 120) == 1
+    assert adaptive.run_once(START + 239) == 0
+    assert adaptive.run_once(START + 240) == 1
+    assert len(set(launched)) == 3
+
+
+def test_rate_limited_refresh_waits_for_retry_after():
+    attempts = []
+
+    def submit(source, kind):
+        attempts.append(source)
+        raise RateLimited(300)
+
+    adaptive = scheduler(submit)
+    assert adaptive.run_once(START) == 0
+    assert len(attempts) == 3
+    assert adaptive.run_once(START + 299) == 0
+    assert len(attempts) == 3
+
+
+def test_launched_refresh_is_not_repeated_before_min_interval():
+    adaptive = scheduler(lambda source, kind: (None, 'encolado'))
+    assert adaptive.run_once(START) == 3
+    assert adaptive.run_once(START + cadence.MIN_INTERVAL - 1) == 0
+    assert adaptive.run_once(START + cadence.MIN_INTERVAL) == 3
+
+
+def test_observations_are_saved_at_most_once_per_interval(tmp_path):
+    path = tmp_path / 'cadence.json'
+    cadence = RefreshCadence(str(path), save_interval=3600)
+    cadence.observe('basquet', 'standings', [{"equipo": "Padua"}], now=START)
+    path.write_text('{}')
+    cadence.observe('basquet', 'standings', [{"equipo": "Morón"}], now=START + HOUR)
+    # La segunda observación no reescribió el archivo...
+    assert path.read_text() == '{}'
+    cadence.flush()
+    # ...pero al apagar se guarda lo pendiente
+    restored = RefreshCadence(str(path))
+    assert restored.describe('basquet', 'standings')["checks"] == 2
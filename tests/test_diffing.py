@@ -0,0 +1,73 @@
+from app.diffing import VERSIONS_PER_EPOCH, SnapshotHistory, content_hash, diff_rows, fixture_key
+
+EPOCH = 42
+FIRST = EPOCH * VERSIONS_PER_EPOCH + 1
+
+
+def standings(*teams):
+    return [{"posicion": i + 1, "equipo": team, "puntos": points} for i, (team, points) in enumerate(teams)]
+
+
+def test_content_hash_ignores_key_order():
+    assert content_hash({"a": 1, "b": 2}) == content_hash({"b": 2, "a": 1})
+    assert content_hash({"a": 1}) != content_hash({"a": 2})
+
+
+def test_diff_rows_added_removed_changed():
+    old = [{"local": "A", "visitante": "B", "fecha": "5/4", "hora": "20:00"},
+           {"local": "C", "visitante": "D", "fecha": "5/4", "hora": "21:00"}]
+    new = [{"local": "A", "visitante": "B", "fecha": "5/4", "hora": "21:30"},
+           {"local": "E", "visitante": "F", "fecha": "6/4", "hora": "19:00"}]
+    changes = diff_rows(old, new, fixture_key)
+    assert changes["added"] == [new[1]]
+    assert changes["removed"] == [old[1]]
+    assert changes["changed"] == [{"row": new[0], "fields": {"hora": ["20:00", "21:30"]}}]
+
+
+def test_repeated_pairings_are_different_fixtures():
+    first_leg = {"local": "A", "visitante": "B", "fecha": "5/4", "hora": "20:00"}
+    second_leg = {"local": "A", "visitante": "B", "fecha": "19/4", "hora": "20:00"}
+    changes = diff_rows([first_leg, second_leg], [second_leg], fixture_key)
+    assert changes == {"added": [], "removed": [first_leg], "changed": []}
+
+
+def test_record_only_bumps_version_when_content_changes():
+    history = SnapshotHistory('standings', epoch=EPOCH)
+    assert history.version == 0
+    rows = standings(("Padua", 10), ("Morón", 8))
+    assert history.record(rows, "t1") is not None
+    assert history.version == FIRST
+    assert history.record(standings(("Padua", 10), ("Morón", 8)), "t2") is None
+    assert history.version == FIRST
+
+
+def test_delta_since_reports_changes_and_moves():
+    history = SnapshotHistory('standings', epoch=EPOCH)
+    history.record(standings(("Padua", 10), ("Morón", 8)), "t1")
+    history.record(standings(("Morón", 12), ("Padua", 10)), "t2")
+    delta = history.delta_since(FIRST)
+    assert delta["version"] == FIRST + 1 and delta["full"] is False
+    moves = {move["equipo"]: move["cambio"] for move in delta["changes"]["moves"]}
+    assert moves == {"Morón": 1, "Padua": -1}
+    assert history.delta_since(FIRST + 1)["changes"]["changed"] == []
+
+
+def test_delta_since_unknown_version_returns_full_data():
+    history = SnapshotHistory('standings', max_versions=2, epoch=EPOCH)
+    for points in (1, 2, 3):
+        history.record(standings(("Padua", points)), None)
+    delta = history.delta_since(FIRST)
+    assert delta["full"] is True
+    assert delta["standings"] == standings(("Padua", 3))
+
+
+def test_versions_from_another_process_return_full_data():
+    before_restart = SnapshotHistory('standings', epoch=EPOCH)
+    after_restart = SnapshotHistory('standings', epoch=EPOCH + 1)
+    for history in (before_restart, after_restart):
+        history.record(standings(("Padua", 1)), None)
+        history.record(standings(("Padua", 2)), None)
+    # El mismo contador, pero otra época: no se arma un delta contra otro contenido
+    delta = after_restart.delta_since(before_restart.version - 1)
+    assert delta["full"] is True
+    assert after_restart.delta_since(after_restart.version - 1)["full"] is False
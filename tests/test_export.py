@@ -0,0 +1,68 @@
+import gzip
+import hashlib
+import json
+import os
+
+from app.export import StaticExport, endpoint_path
+
+
+def read_json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_export_writes_latest_immutable_and_manifest(tmp_path):
+    export = StaticExport(str(tmp_path))
+    rows = [{"posicion": 1, "equipo": "Padua"}]
+    assert export.export('voley/tira-a', 'standings', rows, '2025-05-01T10:00:00', 5)
+
+    manifest = read_json(tmp_path / 'manifest.json')
+    entry = manifest["endpoints"][endpoint_path('voley/tira-a', 'standings')]
+    assert entry["version"] == 5 and entry["latest"] == 'api/standings/voley/tira-a.json'
+
+    latest = tmp_path / 'api' / 'standings' / 'voley' / 'tira-a.json'
+    body = latest.read_bytes()
+    assert json.loads(body) == {"error": None, "last_update": '2025-05-01T10:00:00',
+                                "standings": rows, "version": 5}
+    assert entry["sha256"] == hashlib.sha256(body).hexdigest() and entry["bytes"] == len(body)
+    assert (tmp_path / entry["immutable"]).read_bytes() == body
+    assert gzip.decompress((tmp_path / f"{entry['latest']}.gz").read_bytes()) == body
+    assert not [name for name in os.listdir(latest.parent) if name.endswith('.tmp')]
+
+
+def test_same_content_keeps_its_immutable_file(tmp_path):
+    export = StaticExport(str(tmp_path))
+    rows = [{"posicion": 1, "equipo": "Padua"}]
+    export.export('basquet', 'standings', rows, None, 1)
+    first = read_json(tmp_path / 'manifest.json')["endpoints"]['/api/standings/basquet']["immutable"]
+    export.export('basquet', 'standings', rows, None, 2)
+    entry = read_json(tmp_path / 'manifest.json')["endpoints"]['/api/standings/basquet']
+    assert entry["immutable"] == first
+    # El archivo inmutable conserva la primera respuesta de ese contenido; el último, la actual
+    assert read_json(tmp_path / first)["version"] == 1
+    assert read_json(tmp_path / entry["latest"])["version"] == 2
+
+
+def test_old_immutable_versions_are_pruned(tmp_path):
+    export = StaticExport(str(tmp_path), max_versions=2)
+    for version in range(4):
+        export.export('basquet', 'fixtures', [{"local": f"Equipo {version}"}], None, version)
+    directory = tmp_path / 'api' / 'fixtures'
+    immutable = sorted(name for name in os.listdir(directory) if name.count('.') == 2 and name.endswith('.json'))
+    assert len(immutable) == 2
+    current = read_json(tmp_path / 'manifest.json')["endpoints"]['/api/fixtures/basquet']["immutable"]
+    assert os.path.basename(current) in immutable
+
+
+def test_manifest_keeps_endpoints_written_by_previous_runs(tmp_path):
+    StaticExport(str(tmp_path)).export('basquet', 'standings', [], None, 1)
+    StaticExport(str(tmp_path)).export('voley/tira-a', 'fixtures', [], None, 1)
+    endpoints = read_json(tmp_path / 'manifest.json')["endpoints"]
+    assert sorted(endpoints) == ['/api/fixtures/voley/tira-a', '/api/standings/basquet']
+
+
+def test_disabled_or_failing_exports_return_false(tmp_path):
+    assert not StaticExport('').export('basquet', 'standings', [], None, 1)
+    blocker = tmp_path / 'archivo'
+    blocker.write_text('no es un directorio')
+    assert not StaticExport(str(blocker)).export('basquet', 'standings', [], None, 1)
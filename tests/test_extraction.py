@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+from app import tracing
+from app.scraper.basketball_scraper import BasketballScraper
+from app.scraper.extraction import ExtractionPool, PageExtraction
+from app.scraper.snapshots import page_snapshots
+from app.scraper.voley_scraper import VoleyScraper
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture(autouse=True)
+def clear_snapshots():
+    page_snapshots.clear()
+    yield
+    page_snapshots.clear()
+
+
+class CountingScraper(BasketballScraper):
+    """Scraper de básquet que cuenta cuántas veces se extrae una página"""
+
+    def __init__(self):
+        super().__init__(name='basquet-test', debug_dumps=False)
+        self.extractions = 0
+
+    def _extract_page(self, html, kind):
+        self.extractions += 1
+        return super()._extract_page(html, kind)
+
+
+def test_in_process_extraction_returns_rows_and_iframes():
+    pool = ExtractionPool(processes=0)
+    assert not pool.enabled
+    scraper = BasketballScraper(name='basquet-test', debug_dumps=False)
+    page = pool.extract(scraper, load_fixture('basquet_clasificacion_v1.html'), 'standings')
+    assert isinstance(page, PageExtraction)
+    assert page.rows and page.rows[0].posicion == 1
+    assert isinstance(page.iframes, list)
+
+
+def test_pages_without_the_table_return_none():
+    pool = ExtractionPool(processes=0)
+    scraper = BasketballScraper(name='basquet-test', debug_dumps=False)
+    page = pool.extract(scraper, '<html><body><iframe src="/tabla"></iframe></body></html>', 'standings')
+    assert page == PageExtraction(None, ['/tabla'])
+
+
+def test_stored_pages_are_extracted_once_per_kind():
+    pool = ExtractionPool(processes=0)
+    scraper = CountingScraper()
+    html = load_fixture('basquet_clasificacion_v1.html')
+    page_snapshots.fetch('https://liga', lambda: html)
+
+    first = pool.extract(scraper, html, 'standings')
+    assert pool.extract(scraper, html, 'standings') is first
+    assert scraper.extractions == 1
+    pool.extract(scraper, html, 'fixtures')
+    assert scraper.extractions == 2
+
+
+def test_pages_not_downloaded_through_snapshots_are_not_memoized():
+    pool = ExtractionPool(processes=0)
+    scraper = CountingScraper()
+    html = load_fixture('basquet_clasificacion_v1.html')
+    pool.extract(scraper, html, 'standings')
+    pool.extract(scraper, html, 'standings')
+    assert scraper.extractions == 2
+
+
+def test_process_pool_matches_in_process_extraction():
+    html = load_fixture('metrovoley_posiciones.html')
+    scraper = VoleyScraper('https://metrovoley.com.ar/tournament/1/standings', name='voley/test')
+    expected = scraper._extract_page(html, 'standings')
+
+    pool = ExtractionPool(processes=1)
+    try:
+        pool.start(warmup=True)
+        with tracing.trace('scrape', source='voley/test'):
+            page = pool.extract(scraper, html, 'standings')
+            trace_id = tracing.current_trace().id
+    finally:
+        pool.shutdown()
+
+    assert expected.rows and page == expected
+    # Los spans medidos en el proceso hijo quedan bajo el span `extract_pool`
+    root = tracing.get_trace(trace_id)["root"]
+    extract_pool = next(child for child in root["children"] if child["name"] == 'extract_pool')
+    assert extract_pool["children"]
@@ -0,0 +1,58 @@
+from datetime import date, datetime
+
+from app.fixture_calendar import FixtureCalendar
+from app.scraper.dates import LEAGUE_TZ, parse_match_datetime
+
+REFERENCE = date(2025, 4, 30)
+
+
+def at(day: int, hour: int = 0, minute: int = 0, month: int = 5) -> datetime:
+    return datetime(2025, month, day, hour, minute, tzinfo=LEAGUE_TZ)
+
+
+def test_parse_match_datetime_formats():
+    assert parse_match_datetime("02/05/2025", "21:00", REFERENCE) == at(2, 21)
+    assert parse_match_datetime("9 de mayo", "21h", REFERENCE) == at(9, 21)
+    assert parse_match_datetime("Sáb 10/05", "21.30 hs", REFERENCE) == at(10, 21, 30)
+    assert parse_match_datetime("2025-05-16", "", REFERENCE) == at(16)
+    assert parse_match_datetime("a confirmar", "21:00", REFERENCE) is None
+
+
+def test_year_is_inferred_around_the_reference():
+    assert parse_match_datetime("05/01", "", date(2025, 12, 20)) == datetime(2026, 1, 5, tzinfo=LEAGUE_TZ)
+
+
+def fixture(local: str, visitante: str, start: datetime):
+    return {"local": local, "visitante": visitante, "inicio": start.isoformat()}
+
+
+def calendar() -> FixtureCalendar:
+    result = FixtureCalendar()
+    result.update('basquet', [fixture("CASA de Padua", "Morón", at(9, 21)),
+                              fixture("Escobar", "Policial", at(2, 21))])
+    result.update('voley/tira-a', [fixture("Ciudad", "CASA de Padua", at(3, 18)),
+                                   fixture("Boca", "River", at(10, 18))])
+    return result
+
+
+def test_between_and_upcoming_across_leagues():
+    fixtures = calendar()
+    assert [f["local"] for f in fixtures.between(at(2), at(3, 23))] == ["Escobar", "Ciudad"]
+    assert [f["local"] for f in fixtures.upcoming(2, now=at(3, 0))] == ["Ciudad", "CASA de Padua"]
+    assert [f["source"] for f in fixtures.upcoming(10, source='basquet', now=at(1))] == ['basquet', 'basquet']
+
+
+def test_casa_index_and_weekend():
+    fixtures = calendar()
+    assert [f["inicio"] for f in fixtures.upcoming(10, casa=True, now=at(1))] == \
+        [at(3, 18).isoformat(), at(9, 21).isoformat()]
+    start, end, weekend = fixtures.weekend(now=at(7, 12))
+    assert (start, end.date()) == (at(9), date(2025, 5, 11))
+    assert [f["local"] for f in weekend] == ["CASA de Padua", "Boca"]
+
+
+def test_update_replaces_league_fixtures():
+    fixtures = calendar()
+    fixtures.update('basquet', [])
+    assert fixtures.upcoming(10, source='basquet', now=at(1)) == []
+    assert len(fixtures.upcoming(10, now=at(1))) == 2
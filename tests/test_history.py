@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from app.history import HistoryStore, StandingsHistory, query_time
+
+
+def table(*teams):
+    """Tabla con los equipos en el orden dado y puntos decrecientes"""
+    return [{"posicion": i + 1, "equipo": team, "puntos": 10 - i} for i, team in enumerate(teams)]
+
+
+def test_unchanged_tables_are_not_recorded_twice():
+    league = StandingsHistory('basquet')
+    assert league.add(table('Padua', 'Hindú'), 100.0) == (True, True)
+    assert league.add(table('Padua', 'Hindú'), 200.0) == (False, False)
+    # Volver a una tabla anterior agrega un punto en el tiempo pero no un bloque
+    assert league.add(table('Hindú', 'Padua'), 300.0) == (True, True)
+    assert league.add(table('Padua', 'Hindú'), 400.0) == (True, False)
+    assert len(league) == 3
+    assert len(league.block_starts) == 2
+
+
+def test_table_at_picks_the_table_in_force():
+    league = StandingsHistory('basquet')
+    league.add(table('Padua', 'Hindú'), 100.0)
+    league.add(table('Hindú', 'Padua'), 300.0)
+    assert league.table_at(50.0) is None
+    since, rows = league.table_at(299.0)
+    assert since == 100.0 and rows[0] == {"posicion": 1, "equipo": "Padua", "puntos": 10}
+    assert league.table_at(300.0)[1][0]["equipo"] == "Hindú"
+
+
+def test_out_of_order_loads_keep_the_timeline_sorted():
+    league = StandingsHistory('basquet')
+    league.add(table('Hindú', 'Padua'), 300.0)
+    league.add(table('Padua', 'Hindú'), 100.0)
+    assert list(league.times) == [100.0, 300.0]
+    assert league.table_at(200.0)[1][0]["equipo"] == "Padua"
+
+
+def test_trajectory_follows_a_team_by_normalized_name():
+    league = StandingsHistory('basquet')
+    league.add(table('Padua', 'Hindú'), query_time('2025-05-01'))
+    league.add(table('Hindú', 'Padua'), query_time('2025-05-08'))
+    league.add(table('Hindú', 'Regatas'), query_time('2025-05-15'))
+    points = league.trajectory('PADUA')
+    assert [(point["posicion"], point["puntos"]) for point in points] == [(1, 10), (2, 9)]
+    assert points[0]["at"].startswith('2025-05-01')
+    assert league.trajectory('Padua', start=query_time('2025-05-02')) == points[1:]
+    assert league.trajectory('Otro') is None
+
+
+def test_missing_numbers_stay_missing():
+    league = StandingsHistory('voley')
+    league.add([{"posicion": 1, "equipo": "Padua"}], 100.0)
+    assert league.table_at(100.0)[1] == [{"posicion": 1, "equipo": "Padua"}]
+
+
+def test_store_persists_blocks_once_and_reloads(tmp_path):
+    path = str(tmp_path / 'history.jsonl')
+    store = HistoryStore(path)
+    assert store.record('basquet', table('Padua', 'Hindú'), '2025-05-01T10:00:00')
+    assert not store.record('basquet', table('Padua', 'Hindú'), '2025-05-02T10:00:00')
+    assert store.record('basquet', table('Hindú', 'Padua'), '2025-05-08T10:00:00')
+    assert store.record('basquet', table('Padua', 'Hindú'), '2025-05-15T10:00:00')
+    assert not store.record('basquet', [], None)
+
+    with open(path, encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f]
+    assert len(entries) == 3
+    assert ['standings' in entry for entry in entries] == [True, True, False]
+
+    reloaded = HistoryStore(path)
+    assert reloaded.sources() == ['basquet']
+    assert reloaded.table_at('basquet', '2025-05-09')["standings"][0]["equipo"] == "Hindú"
+    trajectory = reloaded.trajectory('basquet', 'Padua', start='2025-05-01', end='2025-05-08')
+    assert [point["posicion"] for point in trajectory["points"]] == [1, 2]
+
+
+def test_invalid_lines_are_skipped_on_load(tmp_path):
+    path = tmp_path / 'history.jsonl'
+    store = HistoryStore(str(path))
+    store.record('basquet', table('Padua'), '2025-05-01T10:00:00')
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{roto\n')
+    assert HistoryStore(str(path)).table_at('basquet', '2025-05-02')["standings"] == table('Padua')
+
+
+def test_record_many_keeps_backfill_metadata(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.jsonl'))
+    added = store.record_many([
+        ('basquet-2019', table('Padua', 'Hindú'), '2019-06-01T00:00:00', {"origin": "backfill", "season": 2019}),
+        ('basquet-2019', table('Padua', 'Hindú'), '2019-07-01T00:00:00', {"origin": "backfill", "season": 2019}),
+        ('basquet-2019', [], None, None),
+    ])
+    assert added == 1
+    result = HistoryStore(store.path).table_at('basquet-2019', '2019-12-31')
+    assert result["meta"] == {"origin": "backfill", "season": 2019}
+
+
+def test_invalid_query_dates_raise_value_error():
+    store = HistoryStore(None)
+    store.record('basquet', table('Padua'), None)
+    with pytest.raises(ValueError):
+        store.table_at('basquet', 'ayer')
+    assert store.table_at('otra') is None
@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+
+from app.jobs import BROWSER_COST, FETCH_COST, RateLimited, RefreshQueue, TokenBucket
+
+
+def test_token_bucket_rejects_with_retry_after():
+    bucket = TokenBucket(capacity=2, refill_per_second=0.5)
+    bucket.take(FETCH_COST)
+    bucket.take(FETCH_COST)
+    with pytest.raises(RateLimited) as error:
+        bucket.take(FETCH_COST)
+    assert 0 < error.value.retry_after <= 2
+
+
+def test_token_bucket_refills_up_to_capacity():
+    bucket = TokenBucket(capacity=2, refill_per_second=1)
+    bucket.take(2)
+    # Como si hubieran pasado 10 s
+    bucket._updated -= 10
+    bucket.take(2)
+    with pytest.raises(RateLimited):
+        bucket.take(1)
+
+
+def make_queue(release: asyncio.Event, calls: list, **kwargs) -> RefreshQueue:
+    async def runner(source, kind):
+        calls.append((source, kind))
+        await release.wait()
+        return {"error": None, "last_update": "ahora", kind: []}
+
+    return RefreshQueue(runner, lambda source, kind: kind == 'standings', **kwargs)
+
+
+def test_identical_requests_share_one_job():
+    async def scenario():
+        release, calls = asyncio.Event(), []
+        queue = make_queue(release, calls)
+        job, outcome = queue.submit('basquet', 'fixtures')
+        same, joined = queue.submit('basquet', 'fixtures')
+        assert (outcome, joined) == ('encolado', 'unido')
+        assert same is job and job.requests == 2
+        release.set()
+        await job.done.wait()
+        reused, again = queue.submit('basquet', 'fixtures')
+        await queue.aclose()
+        return calls, job, reused, again
+
+    calls, job, reused, outcome = asyncio.run(scenario())
+    assert calls == [('basquet', 'fixtures')]
+    assert job.status == 'completado'
+    assert reused is job and outcome == 'reutilizado'
+
+
+def test_browser_jobs_cost_more_and_are_rate_limited():
+    async def scenario():
+        release, calls = asyncio.Event(), []
+        queue = make_queue(release, calls, bucket=TokenBucket(capacity=BROWSER_COST + FETCH_COST,
+                                                              refill_per_second=0.01))
+        queue.submit('voley/tira-a', 'standings')
+        queue.submit('voley/tira-a', 'fixtures')
+        with pytest.raises(RateLimited):
+            queue.submit('voley/tira-b', 'fixtures')
+        release.set()
+        await queue.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_scheduled_refreshes_do_not_spend_user_credit():
+    async def scenario():
+        release, calls = asyncio.Event(), []
+        queue = make_queue(release, calls, bucket=TokenBucket(capacity=FETCH_COST, refill_per_second=0.01),
+                           scheduled_bucket=TokenBucket(capacity=10, refill_per_second=0.01))
+        for source in ('a', 'b', 'c'):
+            queue.submit(source, 'fixtures', scheduled=True)
+        _, outcome = queue.submit('d', 'fixtures')
+        release.set()
+        await queue.aclose()
+        return outcome
+
+    assert asyncio.run(scenario()) == 'encolado'
+
+
+def test_browser_jobs_do_not_hold_up_fetch_jobs():
+    async def scenario():
+        release, calls = asyncio.Event(), []
+        queue = make_queue(release, calls, max_workers=1, max_browser_jobs=1)
+
+        async def runner(source, kind):
+            calls.append((source, kind))
+            if kind == 'standings':
+                await release.wait()
+            return {"error": None, "last_update": "ahora", kind: []}
+
+        queue._runner = runner
+        chrome_a, _ = queue.submit('a', 'standings')
+        chrome_b, _ = queue.submit('b', 'standings')
+        fetch, _ = queue.submit('a', 'fixtures')
+        await asyncio.wait_for(fetch.done.wait(), 1)
+        # Un solo Chrome a la vez; el segundo sigue en su fila
+        assert chrome_a.status == 'en_curso' and chrome_b.status == 'pendiente'
+        release.set()
+        await asyncio.wait_for(chrome_b.done.wait(), 1)
+        await queue.aclose()
+        return calls
+
+    calls = asyncio.run(scenario())
+    assert sorted(calls) == [('a', 'fixtures'), ('a', 'standings'), ('b', 'standings')]
+    assert calls.index(('b', 'standings')) == 2
+
+
+def test_closing_the_queue_releases_waiters():
+    async def scenario():
+        release, calls = asyncio.Event(), []
+        queue = make_queue(release, calls, max_browser_jobs=1)
+        waiters = [asyncio.create_task(queue.refresh_and_wait(source, 'standings')) for source in ('a', 'b')]
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        await queue.aclose()
+        return await asyncio.wait_for(asyncio.gather(*waiters), 1), queue.jobs()
+
+    results, jobs = asyncio.run(scenario())
+    assert [r["error"] for r in results] == ["Refresco cancelado"] * 2
+    assert {job.status for job in jobs} == {'error'}
+
+
+def test_refresh_and_wait_shares_the_job():
+    async def scenario():
+        release, calls = asyncio.Event(), []
+        queue = make_queue(release, calls)
+        waiters = [asyncio.create_task(queue.refresh_and_wait('a', 'fixtures')) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+        await queue.aclose()
+        return calls, results
+
+    calls, results = asyncio.run(scenario())
+    assert calls == [('a', 'fixtures')]
+    assert all(r["last_update"] == "ahora" for r in results)
+
+
+def test_cold_cache_reads_go_through_the_queue(monkeypatch):
+    from app import main
+    from app.scraper.cache import ScraperCache
+
+    class Scraper:
+        name = 'voley/tira-a'
+        browser_kinds = ('standings',)
+        cache = ScraperCache('voley/tira-a')
+
+    async def scenario():
+        release, calls = asyncio.Event(), []
+        queue = make_queue(release, calls)
+        monkeypatch.setattr(main, 'refresh_queue', queue)
+        reads = [asyncio.create_task(main.cached_or_refresh(Scraper, 'standings')) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*reads)
+        await queue.aclose()
+        return calls, results
+
+    calls, results = asyncio.run(scenario())
+    assert calls == [('voley/tira-a', 'standings')]
+    assert len(results) == 3
@@ -0,0 +1,78 @@
+import json
+import logging
+import queue
+
+from app import tracing
+from app.logs import JsonFormatter, LOG_RECORDS_DROPPED, NonBlockingQueueHandler, ScrapeSampler
+
+
+class Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def make_logger(name, *handlers):
+    logger = logging.getLogger(name)
+    logger.handlers = list(handlers)
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    return logger
+
+
+def test_queued_records_keep_the_message_as_it_was_logged():
+    records = queue.Queue()
+    logger = make_logger('test.logs.snapshot', NonBlockingQueueHandler(records))
+    teams = ['Padua']
+    logger.info("Equipos: %s", teams)
+    teams.append('Ferro')
+    record = records.get_nowait()
+    assert record.getMessage() == "Equipos: ['Padua']"
+    assert record.args is None
+
+
+def test_full_queue_drops_records_without_blocking():
+    records = queue.Queue(maxsize=1)
+    logger = make_logger('test.logs.full', NonBlockingQueueHandler(records))
+    before = LOG_RECORDS_DROPPED.value()
+    logger.info("uno")
+    logger.info("dos")
+    assert records.qsize() == 1
+    assert LOG_RECORDS_DROPPED.value() == before + 1
+
+
+def test_repeated_messages_are_sampled_within_a_scrape():
+    collect = Collect()
+    sampler = ScrapeSampler(first=2)
+    collect.addFilter(sampler)
+    logger = make_logger('test.logs.sampling', collect)
+    with tracing.trace('scrape', source='basquet'):
+        current = tracing.current_trace()
+        for i in range(5):
+            logger.info("Probando iframe %d", i)
+        logger.warning("Sin tabla en %s", 'iframe')
+    sampler.flush_trace(current)
+    messages = [r.getMessage() for r in collect.records]
+    assert messages[:3] == ["Probando iframe 0", "Probando iframe 1", "Sin tabla en iframe"]
+    assert "repetido 3 veces" in messages[3]
+    assert all(r.trace_id == current.id and r.source == 'basquet' for r in collect.records)
+
+
+def test_messages_outside_a_scrape_are_not_sampled():
+    collect = Collect()
+    collect.addFilter(ScrapeSampler(first=1))
+    logger = make_logger('test.logs.unsampled', collect)
+    for _ in range(3):
+        logger.info("Refresco %s", 'basquet')
+    assert len(collect.records) == 3
+
+
+def test_json_formatter_includes_extra_fields():
+    record = logging.LogRecord('app', logging.INFO, __file__, 1, "Datos nuevos en %s", ('basquet',), None)
+    record.trace_id = 'abc'
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Datos nuevos en basquet"
+    assert entry["trace_id"] == 'abc' and entry["level"] == 'INFO'
@@ -0,0 +1,100 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import metrics, tracing
+from app.metrics import Counter, GaugeCallback, Histogram
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Registro vacío: las métricas de los tests no aparecen en /metrics"""
+    monkeypatch.setattr(metrics, '_registry', [])
+    return metrics._registry
+
+
+def test_counter_renders_labels_escaped(registry):
+    counter = Counter('test_total', 'Pedidos', ['route'])
+    counter.inc(route='/a"b')
+    counter.inc(2, route='/a"b')
+    assert counter.value(route='/a"b') == 3
+    assert metrics.render() == ('# HELP test_total Pedidos\n# TYPE test_total counter\n'
+                                'test_total{route="/a\\"b"} 3\n')
+
+
+def test_labels_must_match(registry):
+    counter = Counter('test_total', 'Pedidos', ['route'])
+    with pytest.raises(ValueError):
+        counter.inc(host='x')
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = Histogram('test_seconds', 'Duración', ['op'], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, op='x')
+    lines = histogram.samples()
+    assert lines == [
+        'test_seconds_bucket{op="x",le="0.1"} 1',
+        'test_seconds_bucket{op="x",le="1"} 2',
+        'test_seconds_bucket{op="x",le="+Inf"} 3',
+        'test_seconds_sum{op="x"} 5.55',
+        'test_seconds_count{op="x"} 3',
+    ]
+
+
+def test_gauge_callback_is_read_when_rendering(registry):
+    values = [({'status': 'pendiente'}, 1)]
+    GaugeCallback('test_jobs', 'Trabajos', ['status'], lambda: values)
+    values.append(({'status': 'en_curso'}, 2))
+    assert 'test_jobs{status="en_curso"} 2' in metrics.render()
+
+
+def test_cache_reads_are_classified_by_age():
+    source = 'test-metrics'
+    now = datetime.now()
+    metrics.record_cache_read(source, 'standings', False, None)
+    metrics.record_cache_read(source, 'standings', True, now.isoformat())
+    old = now - timedelta(seconds=metrics.CACHE_STALE_AFTER_SECONDS + 60)
+    metrics.record_cache_read(source, 'standings', True, old.isoformat())
+    for result in ('miss', 'hit', 'stale'):
+        assert metrics.CACHE_REQUESTS.value(source=source, kind='standings', result=result) == 1
+
+
+class Scraper:
+    name = 'test-metrics-scraper'
+
+    @metrics.timed_phase('parse')
+    def parse(self, html):
+        return [1, 2, 3]
+
+    @metrics.timed_scrape('standings')
+    async def scrape(self):
+        self.parse('<p></p>')
+        return {"error": "Sin tabla", "standings": None}
+
+
+def test_timed_decorators_measure_and_trace():
+    def count(phase):
+        return metrics.SCRAPE_PHASE_DURATION._values.get((Scraper.name, phase), [0, 0, 0])[2]
+
+    before = count('parse')
+    asyncio.run(Scraper().scrape())
+    assert count('parse') == before + 1
+    trace = tracing.get_trace(tracing.recent_traces(1, source=Scraper.name)[0]["id"])
+    assert trace["root"]["status"] == 'error'
+    parse = trace["root"]["children"][0]
+    assert parse["name"] == 'parse' and parse["attributes"]["rows"] == 3
+
+
+def test_phases_captured_in_another_process_are_recorded():
+    def count():
+        return metrics.SCRAPE_PHASE_DURATION._values.get(('test-metrics-pool', 'extract'), [0, 0, 0])[2]
+
+    with metrics.capture_phases() as captured:
+        with metrics._phase_timer('test-metrics-pool', 'extract'):
+            pass
+    assert [(source, phase) for source, phase, _ in captured] == [('test-metrics-pool', 'extract')]
+    before = count()
+    metrics.record_phases(captured)
+    assert count() == before + 1
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from app.scraper.dates import LEAGUE_TZ
+from app.scraper.models import (FixtureRow, StandingRow, fixtures_to_dicts, parse_int, standings_to_dicts,
+                                to_rows)
+
+
+def test_parse_int_reads_table_cells():
+    assert parse_int("12") == 12
+    assert parse_int(" 1,5 ") == 1
+    assert parse_int("+3 pts") == 3
+    assert parse_int("-") == 0
+    assert parse_int(None) == 0
+    assert parse_int(7.9) == 7
+
+
+def test_standing_row_from_scraped_strings():
+    row = StandingRow.from_dict({"posicion": "1", "equipo": " CASA de Padua ", "puntos": "12",
+                                 "jugados": "6", "diferencia": "-4"})
+    assert row == StandingRow(1, "CASA de Padua", puntos=12, jugados=6, diferencia=-4)
+    # Los campos que no vinieron en la tabla quedan en None y no salen en el JSON
+    assert row.ganados is None
+    assert standings_to_dicts([row]) == [
+        {"posicion": 1, "equipo": "CASA de Padua", "puntos": 12, "jugados": 6, "diferencia": -4}]
+
+
+def test_standing_row_round_trips_through_json_shape():
+    rows = [StandingRow(2, "Morón", 10, 6, 5, 1, 480, 400, 80)]
+    assert to_rows(StandingRow, standings_to_dicts(rows)) == rows
+
+
+def test_team_names_are_interned():
+    first = StandingRow.from_dict({"posicion": 1, "equipo": "".join(["Pa", "dua"])})
+    second = StandingRow.from_dict({"posicion": 2, "equipo": "".join(["Pad", "ua"])})
+    assert first.equipo is second.equipo
+
+
+def test_fixture_row_normalizes_the_start():
+    row = FixtureRow.create("CASA de Padua", "Ferro", "10/05/2025", "21:30", True)
+    assert row.inicio == datetime(2025, 5, 10, 21, 30, tzinfo=LEAGUE_TZ)
+    data = fixtures_to_dicts([row])[0]
+    assert data["inicio"] == row.inicio.isoformat()
+    assert FixtureRow.from_dict(data) == row
+
+
+def test_fixture_row_without_a_readable_date():
+    row = FixtureRow.from_dict({"local": "A", "visitante": "B", "fecha": "a confirmar", "hora": ""})
+    assert row.inicio is None and row.es_casa_local is False
+    assert to_rows(FixtureRow, None) is None
@@ -0,0 +1,80 @@
+import pytest
+
+from app.query import ListQuery, QueryError, SnapshotIndex, parse_list_query
+
+STANDINGS = [
+    {"posicion": 1, "equipo": "Círculo Policial", "puntos": 20},
+    {"posicion": 2, "equipo": "CASA de Padua", "puntos": 18},
+    {"posicion": 3, "equipo": "Club Social Morón", "puntos": None},
+    {"posicion": 4, "equipo": "Sportivo Escobar", "puntos": 12},
+]
+FIXTURES = [
+    {"local": "CASA de Padua", "visitante": "Morón", "fecha": "02/05/2025"},
+    {"local": "Escobar", "visitante": "Policial", "fecha": "03/05/2025"},
+    {"local": "Policial", "visitante": "CASA de Padua", "fecha": "09/05/2025"},
+]
+
+
+def run(rows, kind='standings', **params):
+    return SnapshotIndex(kind, rows).run(ListQuery(**params))
+
+
+def test_filter_by_team_is_partial_and_case_insensitive():
+    total, page = run(STANDINGS, equipo="MORÓN")
+    assert total == 1 and page[0]["equipo"] == "Club Social Morón"
+
+
+def test_casa_filter_in_fixtures_matches_home_or_away():
+    total, page = run(FIXTURES, 'fixtures', casa=True)
+    assert total == 2
+    assert [row["fecha"] for row in page] == ["02/05/2025", "09/05/2025"]
+
+
+def test_team_filter_in_fixtures_combines_with_casa():
+    total, page = run(FIXTURES, 'fixtures', casa=True, equipo="policial")
+    assert total == 1 and page[0]["fecha"] == "09/05/2025"
+
+
+def test_sort_descending_keeps_missing_values_last():
+    _, page = run(STANDINGS, sort="-puntos")
+    assert [row["puntos"] for row in page] == [20, 18, 12, None]
+    _, page = run(STANDINGS, sort="puntos")
+    assert [row["puntos"] for row in page] == [12, 18, 20, None]
+
+
+def test_pagination_and_projection():
+    total, page = run(STANDINGS, limit=2, offset=1, fields="equipo,puntos")
+    assert total == 4
+    assert page == [{"equipo": "CASA de Padua", "puntos": 18}, {"equipo": "Club Social Morón", "puntos": None}]
+
+
+def test_repeated_query_is_served_from_cache():
+    index = SnapshotIndex('standings', STANDINGS)
+    first = index.run(ListQuery(sort="-puntos", limit=2))
+    assert index.run(ListQuery(sort="-puntos", limit=2)) is first
+
+
+def test_invalid_parameters():
+    with pytest.raises(QueryError):
+        ListQuery(limit=-1)
+    with pytest.raises(QueryError):
+        ListQuery(offset=-1)
+    with pytest.raises(QueryError):
+        ListQuery(fields="equipo,goles").validate('standings')
+    with pytest.raises(QueryError):
+        ListQuery(sort="-goles").validate('standings')
+
+
+def test_requests_without_query_parameters_skip_the_query():
+    assert parse_list_query() is None
+    assert parse_list_query(casa=True).casa is True
+
+
+def test_invalid_parameters_answer_400():
+    from fastapi import HTTPException
+
+    from app.main import list_query
+
+    with pytest.raises(HTTPException) as error:
+        list_query(limit=-1)
+    assert error.value.status_code == 400
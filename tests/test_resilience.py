@@ -0,0 +1,111 @@
+import time
+
+import pytest
+import requests
+
+from app.scraper import resilience
+from app.scraper.resilience import (CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, FetchError,
+                                    RetryPolicy, call_with_resilience, classify_error)
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+def open_breaker(reset_timeout: float = 0.01) -> CircuitBreaker:
+    breaker = CircuitBreaker('host.test', failure_threshold=2, reset_timeout=reset_timeout)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def half_open_breaker() -> CircuitBreaker:
+    breaker = open_breaker()
+    time.sleep(0.02)
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    return breaker
+
+
+def test_classify_error():
+    assert classify_error(requests.Timeout()) == 'timeout'
+    assert classify_error(FetchError("timeout", is_timeout=True)) == 'timeout'
+    assert classify_error(requests.ConnectionError()) == 'transient'
+    assert classify_error(FetchError("HTTP 503", status_code=503)) == 'transient'
+    assert classify_error(FetchError("HTTP 429", status_code=429)) == 'transient'
+    assert classify_error(FetchError("HTTP 404", status_code=404)) == 'permanent'
+    assert classify_error(CircuitOpenError()) == 'permanent'
+
+
+def test_breaker_opens_after_threshold_and_short_circuits():
+    breaker = CircuitBreaker('host.test', failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    assert breaker.short_circuited == 1
+
+
+def test_half_open_allows_a_single_probe_per_window():
+    breaker = half_open_breaker()
+    assert not breaker.allow_request()
+
+
+def test_half_open_probe_success_closes():
+    breaker = half_open_breaker()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 0
+
+
+def test_half_open_probe_transient_failure_reopens():
+    breaker = half_open_breaker()
+    resilience._handle_error(breaker, 'http://host.test/', requests.ConnectionError(), 0, NO_RETRY)
+    assert breaker.state == OPEN
+
+
+def test_half_open_probe_permanent_error_without_status_reopens():
+    breaker = half_open_breaker()
+    resilience._handle_error(breaker, 'http://host.test/', requests.TooManyRedirects(), 0, NO_RETRY)
+    assert breaker.state == OPEN
+    # Y en la ventana siguiente vuelve a dejar probar
+    time.sleep(0.02)
+    assert breaker.allow_request()
+
+
+def test_http_error_status_counts_as_healthy_host():
+    breaker = half_open_breaker()
+    resilience._handle_error(breaker, 'http://host.test/', FetchError("HTTP 404", status_code=404), 0, NO_RETRY)
+    assert breaker.state == CLOSED
+
+
+def test_permanent_error_without_status_does_not_open_closed_breaker():
+    breaker = CircuitBreaker('host.test', failure_threshold=1)
+    resilience._handle_error(breaker, 'http://host.test/', requests.TooManyRedirects(), 0, NO_RETRY)
+    assert breaker.state == CLOSED
+
+
+def test_call_with_resilience_retries_transient_errors():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise requests.ConnectionError("reset")
+        return "ok"
+
+    policy = RetryPolicy(max_attempts=2, base_delay=0, max_delay=0)
+    assert call_with_resilience('http://retry.resilience.test/', flaky, policy) == "ok"
+    assert len(calls) == 2
+    assert resilience.get_breaker('http://retry.resilience.test/').state == CLOSED
+
+
+def test_call_with_resilience_does_not_retry_permanent_errors():
+    calls = []
+
+    def missing():
+        calls.append(1)
+        raise FetchError("HTTP 404", status_code=404)
+
+    with pytest.raises(FetchError):
+        call_with_resilience('http://permanent.resilience.test/', missing, RetryPolicy(max_attempts=3))
+    assert len(calls) == 1
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+
+from app.scraper.snapshots import PageSnapshots, plan_refresh
+
+
+def counting_download(calls: list, delay: float = 0.0):
+    async def download():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return f"html-{len(calls)}"
+    return download
+
+
+def test_concurrent_requests_share_one_download():
+    async def scenario():
+        snapshots, calls = PageSnapshots(), []
+        results = await asyncio.gather(*(snapshots.afetch('u', counting_download(calls, 0.05)) for _ in range(3)))
+        return results, calls
+
+    results, calls = asyncio.run(scenario())
+    assert results == ['html-1'] * 3 and len(calls) == 1
+
+
+def test_waiters_retry_when_the_owner_is_cancelled():
+    async def scenario():
+        snapshots, calls = PageSnapshots(), []
+        owner = asyncio.ensure_future(snapshots.afetch('u', counting_download(calls, 0.2)))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(snapshots.afetch('u', counting_download(calls, 0.01)))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        return await waiter, owner.cancelled(), calls
+
+    html, owner_cancelled, calls = asyncio.run(scenario())
+    assert owner_cancelled
+    assert html == 'html-2' and len(calls) == 2
+
+
+def test_fresh_only_skips_pages_cached_before_the_refresh():
+    async def scenario():
+        snapshots, calls = PageSnapshots(), []
+        first = await snapshots.afetch('u', counting_download(calls))
+        cached = await snapshots.afetch('u', counting_download(calls))
+        with snapshots.fresh_only():
+            refreshed = await snapshots.afetch('u', counting_download(calls))
+            again = await snapshots.afetch('u', counting_download(calls))
+        return first, cached, refreshed, again
+
+    assert asyncio.run(scenario()) == ('html-1', 'html-1', 'html-2', 'html-2')
+
+
+def test_expired_pages_are_downloaded_again():
+    snapshots, calls = PageSnapshots(ttl=0), []
+    snapshots.fetch('u', lambda: calls.append(1) or "a")
+    snapshots.fetch('u', lambda: calls.append(1) or "b")
+    assert len(calls) == 2
+
+
+def test_memo_computes_once_per_cached_page():
+    snapshots, computed = PageSnapshots(), []
+    html = snapshots.fetch('u', lambda: "<html></html>")
+    for _ in range(3):
+        snapshots.memo(html, 'rows', lambda: computed.append(1) or ['fila'])
+    # Otra cadena con el mismo contenido también encuentra la página
+    snapshots.memo("".join(["<html>", "</html>"]), 'rows', lambda: computed.append(1) or ['fila'])
+    assert len(computed) == 1
+
+
+def test_memo_does_not_mix_pages_with_different_content():
+    snapshots, computed = PageSnapshots(), []
+    snapshots.fetch('u', lambda: "<p>vieja</p>")
+    snapshots.memo("<p>vieja</p>", 'rows', lambda: computed.append('vieja'))
+    # La página se reemplaza: lo extraído de la versión anterior ya no se usa
+    with snapshots.fresh_only():
+        html = snapshots.fetch('u', lambda: "<p>nueva</p>")
+    snapshots.memo(html, 'rows', lambda: computed.append('nueva'))
+    snapshots.memo("<p>vieja</p>", 'rows', lambda: computed.append('vieja otra vez'))
+    assert computed == ['vieja', 'nueva', 'vieja otra vez']
+
+
+def test_html_that_was_not_downloaded_is_not_memoized():
+    snapshots, computed = PageSnapshots(), []
+    for _ in range(2):
+        snapshots.memo("<p>suelta</p>", 'rows', lambda: computed.append(1))
+    assert len(computed) == 2
+
+
+def test_sync_and_async_requests_share_one_download():
+    snapshots, calls = PageSnapshots(), []
+    started, release = threading.Event(), threading.Event()
+
+    def slow_download():
+        calls.append('sync')
+        started.set()
+        release.wait(5)
+        return "html"
+
+    thread_result = []
+    thread = threading.Thread(target=lambda: thread_result.append(snapshots.fetch('u', slow_download)))
+    thread.start()
+    started.wait(5)
+
+    async def scenario():
+        async def download():
+            calls.append('async')
+            return "otra"
+
+        waiter = asyncio.ensure_future(snapshots.afetch('u', download))
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.wait_for(waiter, 5)
+
+    assert asyncio.run(scenario()) == "html"
+    thread.join(5)
+    assert thread_result == ["html"] and calls == ['sync']
+
+
+def test_failed_download_is_shared_with_waiters_and_not_cached():
+    async def scenario():
+        snapshots, calls = PageSnapshots(), []
+
+        async def failing():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            raise RuntimeError("sin conexión")
+
+        results = await asyncio.gather(*(snapshots.afetch('u', failing) for _ in range(3)),
+                                       return_exceptions=True)
+        retry = await snapshots.afetch('u', counting_download(calls))
+        return results, retry, calls
+
+    results, retry, calls = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert retry == 'html-2' and len(calls) == 2
+
+
+def test_at_most_max_pages_are_kept():
+    snapshots = PageSnapshots(max_pages=2)
+    for url in ('a', 'b', 'c'):
+        snapshots.fetch(url, lambda: f"<p>{time.monotonic()}</p>")
+    assert list(snapshots._pages) == ['b', 'c']
+    assert len(snapshots._by_digest) == 2
+
+
+def test_plan_refresh_groups_extractions_by_url():
+    plan = plan_refresh([('basquet', 'standings', 'https://liga'), ('basquet', 'fixtures', 'https://liga'),
+                         ('voley/tira-a', 'standings', None), ('voley/tira-a', 'fixtures', 'https://voley')])
+    assert plan == {'https://liga': [('basquet', 'standings'), ('basquet', 'fixtures')],
+                    'https://voley': [('voley/tira-a', 'fixtures')]}
@@ -0,0 +1,121 @@
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+import pytest
+
+from app.scraper.supervisor import PROC_DIR, BrowserSupervisor
+
+needs_proc = pytest.mark.skipif(not os.path.isdir(PROC_DIR), reason="requiere /proc")
+
+
+class FakeDriver:
+    def __init__(self, track=None):
+        pass
+
+    def quit(self):
+        pass
+
+
+def test_watchdog_forgets_itself_when_idle():
+    supervisor = BrowserSupervisor(interval=0.01)
+    with supervisor.session('test', FakeDriver):
+        watchdog = supervisor._watchdog
+        assert watchdog is not None and watchdog.is_alive()
+    watchdog.join(timeout=2)
+    assert not watchdog.is_alive()
+    assert supervisor._watchdog is None
+
+
+def test_sessions_opened_while_the_watchdog_exits_are_supervised():
+    supervisor = BrowserSupervisor(interval=0.001)
+    for _ in range(200):
+        with supervisor.session('test', FakeDriver):
+            with supervisor._lock:
+                watchdog = supervisor._watchdog
+            # Mientras haya una sesión registrada hay un vigía vivo que la va a revisar
+            assert watchdog is not None and watchdog.is_alive()
+
+
+def test_deadline_kills_a_session():
+    supervisor = BrowserSupervisor(deadline=0.05, interval=0.01)
+    with supervisor.session('test', FakeDriver) as driver:
+        session = supervisor.active_sessions()[0]
+        time.sleep(0.2)
+        assert session.killed == 'deadline'
+    assert driver is not None
+
+
+@needs_proc
+def test_deadline_covers_a_hung_driver_start(tmp_path):
+    sleep = shutil.which('sleep')
+    if sleep is None:
+        pytest.skip("sin el comando sleep")
+    # Un "chromedriver" que nunca termina de arrancar
+    fake_driver = tmp_path / 'chromedriver'
+    fake_driver.symlink_to(sleep)
+    supervisor = BrowserSupervisor(deadline=0.3, interval=0.05)
+
+    def create_driver(track):
+        process = subprocess.Popen([str(fake_driver), '30'])
+        track(process.pid)
+        process.wait()
+        raise RuntimeError(f"chromedriver terminó con {process.returncode}")
+
+    start = time.monotonic()
+    with pytest.raises(RuntimeError):
+        with supervisor.session('test', create_driver):
+            pass
+    assert time.monotonic() - start < 5
+    assert supervisor.active_sessions() == []
+
+
+class ProcessDriver:
+    """Driver falso cuyo "chromedriver" es un proceso real"""
+
+    def __init__(self, process: subprocess.Popen):
+        self.service = type('Service', (), {'process': process})()
+
+    def quit(self):
+        self.service.process.terminate()
+        self.service.process.wait()
+
+
+@needs_proc
+def test_concurrent_sessions_only_close_their_own_processes():
+    sleep = shutil.which('sleep')
+    if sleep is None:
+        pytest.skip("sin el comando sleep")
+    supervisor = BrowserSupervisor(interval=0.01)
+    # Las dos sesiones arrancan a la vez y el vigía las ve a las dos en curso
+    starting, open_ = threading.Barrier(2), threading.Barrier(2)
+    processes, errors = {}, []
+
+    def create_driver(name, track):
+        process = subprocess.Popen([sleep, '30'])
+        track(process.pid)
+        processes[name] = process
+        starting.wait(timeout=5)
+        time.sleep(0.05)
+        return ProcessDriver(process)
+
+    def run(name):
+        try:
+            with supervisor.session(name, lambda track: create_driver(name, track)):
+                open_.wait(timeout=5)
+                if name == 'b':
+                    # Cerrar la sesión 'a' no tiene que tocar el navegador de 'b'
+                    time.sleep(0.3)
+                    assert processes['b'].poll() is None
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in ('a', 'b')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert errors == []
+    assert all(process.poll() is not None for process in processes.values())
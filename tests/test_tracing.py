@@ -0,0 +1,124 @@
+import logging
+import sys
+from collections import deque
+
+import pytest
+
+from app import tracing
+
+
+@pytest.fixture(autouse=True)
+def isolated_traces(monkeypatch):
+    monkeypatch.setattr(tracing, '_traces', deque(maxlen=3))
+    monkeypatch.setattr(tracing, '_otel_tracer', None)
+    monkeypatch.setattr(tracing, '_otel_disabled', False)
+    monkeypatch.delenv('OTEL_EXPORTER_OTLP_ENDPOINT', raising=False)
+
+
+def last_trace():
+    return tracing.get_trace(tracing.recent_traces(1)[0]["id"])
+
+
+def test_spans_nest_under_the_active_span():
+    with tracing.trace('scrape', source='basquet'):
+        with tracing.span('fetch', url='https://liga') as fetch:
+            fetch.set(bytes=120)
+        with tracing.span('parse'):
+            with tracing.span('detect_table'):
+                tracing.annotate(outcome='found')
+        tracing.annotate_trace(path='main_page')
+
+    trace = last_trace()
+    root = trace["root"]
+    assert trace["attributes"] == {"source": "basquet", "path": "main_page"}
+    assert trace["span_count"] == 3
+    assert [child["name"] for child in root["children"]] == ['fetch', 'parse']
+    assert root["children"][0]["attributes"] == {"url": "https://liga", "bytes": 120}
+    detect = root["children"][1]["children"][0]
+    assert (detect["name"], detect["attributes"], detect["children"]) == ('detect_table', {"outcome": "found"}, [])
+    assert root["duration_ms"] >= root["children"][1]["duration_ms"] >= 0
+
+
+def test_nested_trace_behaves_as_a_span():
+    with tracing.trace('refresh'):
+        with tracing.trace('scrape', source='voley/tira-a'):
+            pass
+    assert len(tracing.recent_traces()) == 1
+    assert last_trace()["root"]["children"][0]["name"] == 'scrape'
+
+
+def test_spans_outside_a_trace_record_nothing():
+    with tracing.span('fetch') as current:
+        tracing.annotate(url='x')
+        tracing.annotate_trace(path='x')
+    assert current is None
+    assert tracing.recent_traces() == []
+
+
+def test_errors_mark_the_span_and_trace():
+    with pytest.raises(ValueError):
+        with tracing.trace('scrape'):
+            with tracing.span('parse'):
+                raise ValueError("tabla vacía")
+    trace = last_trace()
+    assert trace["status"] == 'error'
+    assert trace["root"]["children"][0]["status"] == 'error'
+    assert trace["root"]["children"][0]["attributes"]["error"] == "ValueError: tabla vacía"
+
+
+def test_ring_buffer_keeps_the_most_recent_traces():
+    for i in range(5):
+        with tracing.trace('scrape', source='voley' if i % 2 else 'basquet', n=i):
+            pass
+    recent = tracing.recent_traces()
+    assert [summary["attributes"]["n"] for summary in recent] == [4, 3, 2]
+    assert [summary["attributes"]["n"] for summary in tracing.recent_traces(source='basquet')] == [4, 2]
+    assert len(tracing.recent_traces(limit=1)) == 1
+    assert tracing.get_trace('no-existe') is None
+
+
+def test_finish_hooks_receive_each_trace(monkeypatch):
+    finished = []
+    monkeypatch.setattr(tracing, '_finish_hooks', [])
+    tracing.on_trace_finished(finished.append)
+    tracing.on_trace_finished(finished.append)
+    with tracing.trace('scrape'):
+        pass
+    assert len(finished) == 1 and finished[0].root.name == 'scrape'
+
+
+def test_describe_result():
+    assert tracing.describe_result(None) == {"outcome": "not_found"}
+    assert tracing.describe_result("<html>") == {"bytes": 6}
+    assert tracing.describe_result([1, 2]) == {"rows": 2}
+    assert tracing.describe_result(object()) == {"outcome": "found"}
+
+
+def test_exporter_is_disabled_without_endpoint():
+    assert tracing._get_otel_tracer() is None
+    assert tracing._otel_disabled is True
+    with tracing.trace('scrape'):
+        pass
+    assert len(tracing.recent_traces()) == 1
+
+
+def test_exporter_without_sdk_warns_once_and_keeps_traces_in_memory(monkeypatch, caplog):
+    monkeypatch.setenv('OTEL_EXPORTER_OTLP_ENDPOINT', 'http://localhost:4318/v1/traces')
+    monkeypatch.setitem(sys.modules, 'opentelemetry', None)
+    with caplog.at_level(logging.WARNING, logger='app.tracing'):
+        for _ in range(2):
+            with tracing.trace('scrape'):
+                pass
+    assert tracing._otel_disabled is True
+    assert len([r for r in caplog.records if 'OpenTelemetry no está instalado' in r.getMessage()]) == 1
+    assert len(tracing.recent_traces()) == 2
+
+
+def test_capture_and_adopt_move_spans_between_traces():
+    with tracing.capture() as root:
+        with tracing.span('parse'):
+            pass
+    assert [span.name for span in root.children] == ['parse']
+    with tracing.trace('scrape'):
+        tracing.adopt(root.children)
+    assert last_trace()["root"]["children"][0]["name"] == 'parse'